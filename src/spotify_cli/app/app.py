@@ -1,10 +1,10 @@
+import time
 from typing import Optional
 
 from spotipy import SpotifyOauthError
 from textual import on
 from textual.app import App
 from spotify_cli.app.screens.main import Main, ScreenChange
-from spotify_cli.app.screens.setup_env import SetupEnv
 from spotify_cli.core.config import Config
 from spotify_cli.core.spotify import SpotifyClient
 
@@ -20,8 +20,11 @@ class SpotifyApp(App):
     show_config_setup = False
     service: SpotifyClient
 
-    def __init__(self):
+    def __init__(self, started_at: Optional[float] = None):
         super().__init__()
+        # perf_counter at process start, for time to first paint
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.first_paint_ms: float | None = None
         self._debug_mode = True
         try:
             cfg = Config()
@@ -33,6 +36,8 @@ class SpotifyApp(App):
     def on_mount(self) -> None:
         self.theme = "tokyo-night"
         if self.show_config_setup:
+            # only needed on the first run, not worth importing on every start
+            from spotify_cli.app.screens.setup_env import SetupEnv
             self.push_screen(SetupEnv(), self.on_setup_finished)
         else:
             self.push_screen(Main())
@@ -44,6 +49,16 @@ class SpotifyApp(App):
     def action_quit(self):
         self.exit()
 
+    def on_unmount(self) -> None:
+        service = getattr(self, "service", None)
+        if service is not None:
+            service.transport.close()
+            try:
+                # to look into a slow session after it ended
+                service.dump_metrics()
+            except OSError:
+                pass
+
     @on(ScreenChange)
     def handle_screen_change(self, message: ScreenChange):
         self.push_screen(
@@ -1,6 +1,7 @@
-from spotipy import Spotify
+from textual import work
 from textual.app import ComposeResult
 from textual.binding import Binding
+from textual.reactive import reactive
 from textual.screen import Screen
 from textual.widgets import RadioSet, RadioButton, Footer, Static
 
@@ -12,16 +13,19 @@ class ChooseDevice(Screen):
         Binding("escape", "pop_screen", "Close"),
     ]
 
-    devices: list[Device]
+    # None until the first list arrives, the screen is rebuilt whenever it changes
+    devices: reactive[list[Device] | None] = reactive(None, recompose=True)
 
     def __init__(self, active_device: Device | None):
         super().__init__()
         self.active_device = active_device
+        # open with the last known devices, they are refreshed in the background
+        self.set_reactive(ChooseDevice.devices, self.app.service.device_registry.peek())
 
     def compose(self) -> ComposeResult:
-        self.devices = self.app.service.get_devices()
-
-        if len(self.devices) > 0:
+        if self.devices is None:
+            yield Static("Loading devices...")
+        elif len(self.devices) > 0:
             with RadioSet(id="devices"):
                 for device in self.devices:
                     yield RadioButton(
@@ -34,6 +38,19 @@ class ChooseDevice(Screen):
 
         yield Footer()
 
+    def on_mount(self):
+        self._refresh_devices_worker()
+
+    @work(exclusive=True, group="io-devices")
+    async def _refresh_devices_worker(self):
+        try:
+            devices = await self.app.service.get_devices_async(fresh=True)
+        except Exception:
+            if self.devices is None:
+                self.devices = []
+            return
+        self.devices = devices
+
     def action_pop_screen(self):
         self.dismiss()
 
@@ -1,22 +1,21 @@
 import asyncio
 import datetime
+import time
 from typing import Optional, Any, Callable
 
 from pydantic import ValidationError
-from spotipy import SpotifyException
-from textual import work
+from textual import work, log, on
 from textual.app import ComposeResult
 from textual.containers import Container, Vertical
 from textual.message import Message
 from textual.reactive import reactive
 from textual.screen import Screen
-from textual.widgets import Footer, Pretty
+from textual.widgets import Footer, Pretty, Static
 
-from spotify_cli.app.screens.choose_device import ChooseDevice
 from spotify_cli.app.widgets.active_device import ActiveDevice
-from spotify_cli.app.widgets.library import Library
-from spotify_cli.app.screens.search import SearchScreen
+from spotify_cli.app.widgets.library import Library, AlbumPlayed
 from spotify_cli.app.widgets.track_details import TrackDetail
+from spotify_cli.core.playback_clock import PlaybackClock
 from spotify_cli.schemas.device import Device
 from spotify_cli.schemas.playback import PlaybackState
 from spotify_cli.schemas.search import TracksSearchItems
@@ -40,10 +39,17 @@ class Main(Screen):
 
     #### Playback Polling config ####
     # in seconds
-    POLL_PLAYING = 5.0
+    # the local clock predicts track ends, polling while playing only catches seeks/skips made elsewhere
+    POLL_PLAYING = 10.0
+    # poll this long after the predicted end of the track so the next one has started
+    TRACK_BOUNDARY_MARGIN = 0.5
     POLL_PAUSED = 10.0
     POLL_IDLE = 25.0
     MAX_POLL_IDLE_OR_PAUSED_TIME = 3600
+    # drift (ms) between the local clock and a poll worth reporting
+    DRIFT_REPORT_MS = 2000
+    # how often the debug gutter shows the request metrics again
+    METRICS_REFRESH_SEC = 2.0
 
     active_device: reactive[Device | None] = reactive(default=None)
     cur_track: Track | None
@@ -60,12 +66,24 @@ class Main(Screen):
         self._last: PlaybackState | None = None
         self._stop = False
 
-        self.active_device = self.app.service.get_first_active_device()
-        playback_state = self.app.service.get_playback_state()
-        self.cur_track = playback_state.track if playback_state else playback_state
+        # paint the last known session right away, it is shown as stale until the first poll reconciles it
+        snapshot = self.app.service.load_snapshot()
+        playback_state = snapshot.playback if snapshot else None
+        self._stale = snapshot is not None
+        self.active_device = snapshot.device if snapshot else None
+        self.cur_track = playback_state.track if playback_state else None
+        self._library_head = snapshot.library_head if snapshot else []
+        # not seeded from the snapshot, its progress is long outdated
+        self.clock = PlaybackClock()
 
     def on_mount(self) -> None:
-        self.run_worker(self._poll_loop, thread=True, exclusive=True, group="pollers")
+        self.call_after_refresh(self._record_first_paint)
+        self.run_worker(self._poll_loop, exclusive=True, group="pollers")
+        self._reconcile_active_device_worker()
+        # progress ticks from the local clock, no requests
+        self.set_interval(1, self._tick_progress)
+        if self._debug_mode:
+            self.set_interval(self.METRICS_REFRESH_SEC, self._refresh_metrics)
 
     async def on_unmount(self) -> None:
         self._stop = True
@@ -77,23 +95,31 @@ class Main(Screen):
         with Container(id="main"):
             with Vertical(id="track_details"):
                 yield TrackDetail(track=self.cur_track)
-                yield Library()
+                yield Library(head=self._library_head)
 
             with Container(id="devices"):
                 yield ActiveDevice(active_device_name=self.active_device.name if self.active_device else None)
+                yield Static(
+                    "Showing your last session, reconnecting...",
+                    id="stale_notice",
+                    classes="" if self._stale else "invisible",
+                )
 
         if self._debug_mode:
             yield Pretty(
                 self._debug_message,
                 id="debug_gutter"
             )
+            yield Pretty([], id="debug_metrics")
         yield Footer()
 
     # region #### Actions ####
-    def action_pause_start_playback(self):
-        self.app.service.play_or_pause_track(active_device=self.active_device)
+    async def action_pause_start_playback(self):
+        await self.app.service.play_or_pause_track_async(active_device=self.active_device)
 
     def action_show_search(self):
+        # screens are imported when first pushed, keeps them (and what they import) off the startup path
+        from spotify_cli.app.screens.search import SearchScreen
         self.post_message(
             ScreenChange(
                 SearchScreen,
@@ -104,12 +130,19 @@ class Main(Screen):
             )
         )
 
+    @on(AlbumPlayed)
+    def _handle_album_played(self, message: AlbumPlayed):
+        if message.error:
+            self.print_error_text_to_gutter([message.error])
+            return
+        self._after_search(message.track)
+
     def _after_search(self, track: TracksSearchItems):
         if track is None:
             return
         self.get_and_update_track_after_search_dismiss(track)
 
-    @work(exclusive=True, thread=True, exit_on_error=True)
+    @work(exclusive=True, exit_on_error=True)
     async def get_and_update_track_after_search_dismiss(self, track: TracksSearchItems):
         try:
             _track = Track(
@@ -126,9 +159,12 @@ class Main(Screen):
             self.print_error_text_to_gutter([str(e)])
             return
 
+        # the clock knows nothing about this track yet, the next poll seeds it
+        self.clock.sync(None)
         self.update_track(_track)
 
     def action_show_change_device_screen(self):
+        from spotify_cli.app.screens.choose_device import ChooseDevice
         self.post_message(
             ScreenChange(
                 ChooseDevice,
@@ -137,8 +173,8 @@ class Main(Screen):
             )
         )
 
-    def check_choose_device(self, device: Device | None):
-        self.change_active_device(device)
+    async def check_choose_device(self, device: Device | None):
+        await self.change_active_device(device)
 
     # endregion
 
@@ -150,13 +186,39 @@ class Main(Screen):
         track_details = self.query_one(TrackDetail)
         track_details.track = track
 
-    def change_active_device(self, device: Device):
+    async def change_active_device(self, device: Device):
         if not device:
             return
 
         self.active_device = device
         self.query_one(ActiveDevice).active_device_name = device.name
-        self.app.service.play_or_pause_track(active_device=device)
+        await self.app.service.play_or_pause_track_async(active_device=device)
+
+    def _record_first_paint(self):
+        first_paint_ms = (time.perf_counter() - self.app.started_at) * 1000
+        self.app.first_paint_ms = first_paint_ms
+        log(f"time to first paint: {first_paint_ms:.1f} ms (stale snapshot: {self._stale})")
+
+    @work(exclusive=True, group="io-active-device")
+    async def _reconcile_active_device_worker(self):
+        try:
+            device = await self.app.service.get_first_active_device_async()
+        except Exception as e:
+            self.print_error_text_to_gutter([str(e)])
+            return
+
+        self.active_device = device
+        self.query_one(ActiveDevice).active_device_name = device.name if device else None
+
+    def _mark_reconciled(self, state: PlaybackState | None):
+        self._stale = False
+        self.query_one("#stale_notice", Static).add_class("invisible")
+        if state is None:
+            # the snapshot track isn't playing anymore, update_track ignores None
+            self.query_one(TrackDetail).track = None
+
+    def _tick_progress(self):
+        self.query_one(TrackDetail).update_progress(self.clock.progress_ms(), self.clock.duration_ms)
 
     def print_error_text_to_gutter(self, errors: list[str]):
         if self._debug_mode:
@@ -164,29 +226,38 @@ class Main(Screen):
             gutter = self.query_one("#debug_gutter", Pretty)
             gutter.update(errors)
 
+    def _refresh_metrics(self):
+        self.query_one("#debug_metrics", Pretty).update(self.app.service.metrics.summary())
+
     async def _poll_loop(self) -> None:
         _is_idle_or_paused = False
 
         while not self._stop:
-            state, retry_after = self._safe_fetch_playback()
+            state, backoff = await self._safe_fetch_playback()
 
-            if retry_after is not None:
-                await asyncio.sleep(retry_after)
+            if backoff is not None:
+                await asyncio.sleep(backoff)
                 continue
 
+            if self._stale:
+                self._mark_reconciled(state)
+
+            drift = self.clock.sync(state)
+            if drift is not None and abs(drift) >= self.DRIFT_REPORT_MS:
+                self.print_error_text_to_gutter([f"Playback drifted {drift} ms from the local clock, resynced"])
+
             if state:
                 if state != self._last:
                     self._last = state
                     self.update_track(state.track)
+                self._tick_progress()
 
                 # adaptive sleep based on current state
-                if state.is_playing and state.progress_ms and state.duration_ms:
-                    remaining = (state.duration_ms - state.progress_ms) / 1000.0
-                    base = self.POLL_PLAYING
+                remaining = self.clock.remaining_sec()
+                if state.is_playing and remaining is not None:
                     self._first_instance_of_paused_or_idle_playback_poll = None
-
-                    # poll faster near track end to catch seamless transitions
-                    delay = max(0.8, min(base, remaining - 0.3)) if remaining > 1 else 0.8
+                    # next poll right at the predicted track boundary, unless that is further than POLL_PLAYING
+                    delay = min(self.POLL_PLAYING, remaining + self.TRACK_BOUNDARY_MARGIN)
                 elif state.device_id:
                     delay = self.POLL_PAUSED
                     _is_idle_or_paused = True
@@ -203,28 +274,21 @@ class Main(Screen):
             # This is calling a custom task with sleep so it could be canceled on unmount and clear the terminal
             # right away instead of waiting for the sleep timer to run out
             self._cancelable_sleep = asyncio.create_task(self._cancelable_asyncio_sleep(delay))
+            try:
+                await self._cancelable_sleep
+            except asyncio.CancelledError:
+                break
 
     @staticmethod
     async def _cancelable_asyncio_sleep(delay: float):
         await asyncio.sleep(delay)
 
-    def _safe_fetch_playback(self):
-        def _safe_get_retry_after(e: Exception) -> float | None:
-            if isinstance(e, SpotifyException) and e.http_status == 429:
-                retry = e.headers.get("Retry-After") if hasattr(e, "headers") and e.headers else None
-                try:
-                    return float(retry)
-                except Exception:
-                    return 2.0
-            return None
-
+    async def _safe_fetch_playback(self):
         try:
-            return self.app.service.get_playback_state(), None
-        except Exception as e:
-            retry_after = _safe_get_retry_after(e)
-            if retry_after is not None:
-                return None, retry_after
-            # network hiccup—back off a bit
+            return await self.app.service.get_playback_state_async(), None
+        except Exception:
+            # network hiccup—back off a bit. a 429 was already retried by the transport session, whose limiter
+            # holds the next request back until Retry-After has passed
             return None, 2.0
 
     def _cancel_polling_if_long_pause_or_idle(self):
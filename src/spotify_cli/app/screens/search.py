@@ -1,13 +1,14 @@
 import asyncio
-from functools import lru_cache
 
-from textual import on
+from textual import on, work
 from textual.binding import Binding
 from textual.reactive import reactive
 from textual.screen import Screen
 from textual.suggester import Suggester
-from textual.widgets import Input, Label, RadioSet, RadioButton, Footer
+from textual.widgets import Input, Label, RadioSet, RadioButton, Footer, OptionList
+from textual.widgets.option_list import Option
 
+from spotify_cli.core.library_index import LibraryIndex
 from spotify_cli.core.spotify import SearchElementTypes, SpotifyClient
 from spotify_cli.schemas.search import TracksSearchItems, SearchResult
 
@@ -23,11 +24,14 @@ class SearchScreen(Screen):
     sp: SpotifyClient
     print_error_text_to_gutter: callable
     mode = reactive("artist")
+    LIBRARY_MATCHES = 5
 
     def __init__(self, print_error_text_to_gutter: callable):
         super().__init__()
         self.input: Input | None = None
         self.print_error_text_to_gutter = print_error_text_to_gutter
+        self._library_index: LibraryIndex | None = None
+        self._suggesters: dict[str, SearchSuggester] = {}
 
     def compose(self):
         yield Label("Search")
@@ -42,10 +46,14 @@ class SearchScreen(Screen):
             type="text",
         )
         yield self.input
+        library_matches = OptionList(id="library_matches", classes="invisible")
+        library_matches.border_title = "In your library"
+        yield library_matches
         yield Footer()
 
     def on_mount(self):
         self._apply_mode()
+        self._load_library_index_worker()
 
     def watch_mode(self):
         self._apply_mode()
@@ -74,6 +82,20 @@ class SearchScreen(Screen):
         # todo instead of callback, publish a "play" message and handle in main
         self.dismiss(track)
 
+    @on(Input.Changed, "#search")
+    def handle_search_changed(self, event: Input.Changed):
+        self._show_library_matches(event.value)
+
+    @on(OptionList.OptionSelected, "#library_matches")
+    async def handle_library_match_selected(self, event: OptionList.OptionSelected):
+        track = None
+        try:
+            track = await self.app.service.play_library_album(event.option.id)
+        except Exception as e:
+            self.print_error_text_to_gutter([str(e)])
+
+        self.dismiss(track)
+
     # endregion
 
     # region #### Utils ####
@@ -86,16 +108,40 @@ class SearchScreen(Screen):
 
         self.input.placeholder = placeholders[self.mode]
 
-        self.input.suggester = {
-            "artist": SearchSuggester(self.app.service, delay=0.3, search_element_type=SearchElementTypes.ARTIST),
-            "track": SearchSuggester(self.app.service, delay=0.3, search_element_type=SearchElementTypes.TRACK),
-            "album": SearchSuggester(self.app.service, delay=0.3, search_element_type=SearchElementTypes.ALBUM),
-        }[self.mode]
+        if self.mode not in self._suggesters:
+            self._suggesters[self.mode] = SearchSuggester(
+                self.app.service, delay=0.3, search_element_type=SearchElementTypes(self.mode)
+            )
+        self.input.suggester = self._suggesters[self.mode]
 
         picker = self.query_one("#mode_picker", RadioSet)
         picker.value = self.mode
+        self._show_library_matches(self.input.value)
         self.input.focus()
 
+    @work(exclusive=True, group="io-library-index")
+    async def _load_library_index_worker(self):
+        try:
+            self._library_index = await self.app.service.get_library_index_async()
+        except Exception:
+            # library matches are a nice to have, the spotify search works without them
+            return
+        self._show_library_matches(self.input.value)
+
+    def _show_library_matches(self, value: str):
+        """Albums from the local library matching the query, answered by the index without a request"""
+        matches_list = self.query_one("#library_matches", OptionList)
+        matches = []
+        # tracks aren't indexed, only album and artist names
+        if self._library_index is not None and self.mode != "track":
+            matches = self._library_index.search(value, limit=self.LIBRARY_MATCHES)
+
+        matches_list.clear_options()
+        matches_list.add_options(
+            Option(f"{match.name} - {match.artists}", id=match.id) for match in matches
+        )
+        matches_list.set_class(not matches, "invisible")
+
     # endregion
 
     # region #### Actions ####
@@ -144,10 +190,10 @@ class SearchSuggester(Suggester):
         if my_id != self._call_id:
             return None
 
-        # run blocking Spotipy call off the event loop
+        # the shared suggestion cache answers repeats and longer prefixes, the rest runs on the client transport
         try:
             res: SearchResult | None = await asyncio.wait_for(
-                asyncio.to_thread(self._search_spotify_cached, v, self.search_element_type),
+                self.sp.get_search_suggestions_async(v, self.search_element_type),
                 timeout=2.5,
             )
         except Exception as e:
@@ -163,9 +209,3 @@ class SearchSuggester(Suggester):
 
         top_result = max(res.items, key=lambda i: getattr(i, 'popularity', 0))
         return top_result.name
-
-    @lru_cache(maxsize=256)
-    def _search_spotify_cached(self, v: str, element_type: SearchElementTypes) -> SearchResult | None:
-        # in results album have no popularity so there is no way to get the top result as in spotify app
-        search_limit = 1 if element_type is SearchElementTypes.ALBUM else 10
-        return self.sp.search_spotify_suggestions(query=v, search_element=element_type, limit=search_limit)
@@ -1,16 +1,33 @@
+import asyncio
+from functools import partial
+from typing import Callable
+
 from textual import work, log, on
+from textual.binding import Binding
 from textual.containers import Container
-
-from spotipy import Spotify
 from textual.message import Message
+from textual.timer import Timer
 from textual.widget import Widget
-from textual.widgets import DataTable, LoadingIndicator, Static
+from textual.widgets import DataTable, Input, LoadingIndicator, Static
+from textual.widgets.data_table import RowKey
 
-from spotify_cli.schemas.search import AlbumSearchItem
+from spotify_cli.core.library_index import LibraryIndex
+from spotify_cli.core.library_record import LibraryAlbum
+from spotify_cli.schemas.search import TracksSearchItems
 
 
 class AlbumsLoaded(Message):
-    def __init__(self, albums: list[AlbumSearchItem]) -> None:
+    def __init__(self, albums: list[LibraryAlbum], index: int | None = None) -> None:
+        self.albums = albums
+        # where in the table the albums go, None appends them
+        self.index = index
+        super().__init__()
+
+
+class AlbumsSynced(Message):
+    """Full, ordered library snapshot from a background refresh, applied to the table as a keyed diff"""
+
+    def __init__(self, albums: list[LibraryAlbum]) -> None:
         self.albums = albums
         super().__init__()
 
@@ -21,47 +38,343 @@ class AlbumsFailed(Message):
         super().__init__()
 
 
+class AlbumPlayed(Message):
+    """An album was started from the library, with its first track for the track details"""
+
+    def __init__(self, track: TracksSearchItems | None, error: str | None = None) -> None:
+        self.track = track
+        self.error = error
+        super().__init__()
+
+
+class LibraryTable(DataTable):
+    """
+    DataTable with its rows patched by key, `patch_rows` adds only the new rows, removes only the missing ones and
+    sorts the rest into place, so a sync that changes a handful of albums costs a handful of row changes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (key, cells) of every row in table order
+        self._shown: list[tuple[str, tuple]] = []
+
+    async def patch_rows(self, rows: list[tuple[str, tuple]], rows_per_slice: int):
+        """
+        Makes the table match `rows` (key, cells). Rows that are gone are removed, changed cells are updated and
+        new rows are added at the bottom `rows_per_slice` at a time with the event loop let through in between, so a
+        big library never blocks a frame, then every row is sorted into the order of `rows` in one go. A patch
+        cancelled halfway leaves rows the next one diffs against.
+        Removing a row re-indexes all the others, so when most rows are gone the table is cleared and filled again.
+        The cursor stays on the same row and the viewport is shifted by the rows added/removed above it,
+        so nothing on screen jumps during a background refresh.
+        """
+        wanted = dict(rows)
+        removed = [key for key, _ in self._shown if key not in wanted]
+        if len(removed) * 2 > len(self._shown):
+            await self._rebuild_rows(rows, rows_per_slice)
+            return
+
+        restore_cursor = self._keep_cursor()
+        for key in removed:
+            self.remove_row(key)
+        self._shown = [(key, cells) for key, cells in self._shown if key in wanted]
+        self._update_rows(wanted)
+
+        shown = {key for key, _ in self._shown}
+        await self.append_rows([(key, cells) for key, cells in rows if key not in shown], rows_per_slice)
+
+        moved = [key for key, _ in self._shown] != [key for key, _ in rows]
+        if moved:
+            self._sort_rows(rows)
+        if removed or moved:
+            restore_cursor()
+
+    def _update_rows(self, rows: dict[str, tuple]):
+        columns = [column.key for column in self.ordered_columns]
+        for index, (key, old) in enumerate(self._shown):
+            new = rows[key]
+            if old == new:
+                continue
+            for column_key, old_cell, new_cell in zip(columns, old, new):
+                if old_cell != new_cell:
+                    self.update_cell(key, column_key, new_cell, update_width=True)
+            self._shown[index] = (key, new)
+
+    def _sort_rows(self, rows: list[tuple[str, tuple]]):
+        positions = {key: position for position, (key, _) in enumerate(rows)}
+        # sort hands the key function only the cells, once per row in the order the rows were added, which is the
+        # order of `self.rows`, the row keys are taken from there
+        row_keys = iter(list(self.rows))
+        self.sort(key=lambda _: positions[next(row_keys).value])
+        self._shown.sort(key=lambda row: positions[row[0]])
+
+    async def append_rows(self, rows: list[tuple[str, tuple]], rows_per_slice: int,
+                          on_slice: Callable[[], bool] | None = None):
+        """Adds the rows at the bottom a slice at a time, `on_slice` runs after each until it returns True"""
+        for start in range(0, len(rows), rows_per_slice):
+            for key, cells in rows[start:start + rows_per_slice]:
+                self.add_row(*cells, key=key)
+                self._shown.append((key, cells))
+            if on_slice is not None and on_slice():
+                on_slice = None
+            # let the slice paint (and input through) before adding the next one
+            await asyncio.sleep(0)
+
+    async def _rebuild_rows(self, rows: list[tuple[str, tuple]], rows_per_slice: int):
+        restore_cursor = self._keep_cursor()
+        self.clear()
+        self._shown = []
+        # the cursor goes back to its row as soon as that row is added
+        await self.append_rows(rows, rows_per_slice, on_slice=restore_cursor)
+
+    def _keep_cursor(self) -> Callable[[], bool]:
+        """
+        Remembers the cursor row, the returned function moves the cursor back to it and the viewport along with it,
+        True once the row (or no row, when there was no cursor) is in the table
+        """
+        cursor_key = self._cursor_row_key()
+        cursor_index, scroll_y = self.cursor_row, self.scroll_y
+
+        def restore_cursor() -> bool:
+            if cursor_key is None or cursor_key not in self.rows:
+                return cursor_key is None
+            index = self.get_row_index(cursor_key)
+            self.move_cursor(row=index, scroll=False)
+            # by the rows added and removed above it, a clear also scrolled to the top
+            self.call_after_refresh(self.scroll_to, y=scroll_y + index - cursor_index, animate=False)
+            return True
+
+        return restore_cursor
+
+    def _cursor_row_key(self) -> RowKey | None:
+        if not self.row_count or not self.is_valid_row_index(self.cursor_row):
+            return None
+        return self.coordinate_to_cell_key(self.cursor_coordinate).row_key
+
+
 class Library(Widget):
+    BINDINGS = [
+        Binding("slash", "filter", "Filter"),
+        Binding("escape", "clear_filter", "Clear filter", show=False),
+    ]
+
     TABLE_COL = ("artist", "album")
+    # rows added before yielding back to the event loop, keeps every frame short while big libraries load
+    ROWS_PER_SLICE = 100
+    # background refresh interval in seconds, same as the library cache ttl
+    REFRESH_INTERVAL = 900
+    # seconds the cursor rests on a row before its tracklist is prefetched, scrolling past rows fetches nothing
+    PREFETCH_DELAY = 0.3
+    # rows above and below the cursor whose covers are prefetched once it rests
+    ART_PREFETCH_RADIUS = 2
+    # best ranked matches a filter shows, every change to a DataTable costs time linear in its rows so a short
+    # query matching most of a big library would make every frame slow
+    FILTER_LIMIT = 500
 
-    def __init__(self):
+    def __init__(self, head: list[LibraryAlbum] = ()):
         super().__init__()
+        # newest albums from the session snapshot, shown before the library store is read
+        self._head = list(head)
+        # every album in table order, the albums table shows all of them and the filtered table the matching ones
+        self._albums: list[LibraryAlbum] = []
+        self._albums_by_uri: dict[str, LibraryAlbum] = {}
+        self._filter = ""
+        self._index: LibraryIndex | None = None
+        self._prefetch_timer: Timer | None = None
+        # created on the first prefetch, it loads the imaging libraries
+        self._art_prefetcher = None
 
     def compose(self):
         with Container(id="album_table"):
+            yield Input(id="library_filter", placeholder="Filter by album or artist", classes="invisible")
             yield LoadingIndicator(id="albums_loading")
-            yield DataTable()
+            yield LibraryTable(id="library_albums")
+            # a filter never touches the full table, which can take seconds to rebuild for a big library
+            yield LibraryTable(id="library_filtered", classes="invisible")
             yield Static("", id="albums_error")
 
     def on_mount(self):
-        self.query_one(DataTable).cursor_type = "row"
+        for dt in self.query(LibraryTable):
+            dt.cursor_type = "row"
+            dt.add_columns(*self.TABLE_COL)
+        if self._head:
+            self.post_message(AlbumsLoaded(self._head))
         self._load_albums_worker()
+        self.set_interval(self.REFRESH_INTERVAL, self._refresh_albums_worker)
 
     async def on_data_table_row_selected(self, event: DataTable.RowSelected):
-        await self.app.service.play_by_uris_or_context_uri(context_uri=event.row_key.value)
+        album = self._albums_by_uri.get(event.row_key.value)
+        if album is None:
+            return
+        try:
+            # the tracklist is usually prefetched by now, playing needs no extra request for the track details
+            track = await self.app.service.play_library_album(album.id)
+        except Exception as e:
+            self.post_message(AlbumPlayed(None, error=str(e)))
+            return
+        self.post_message(AlbumPlayed(track))
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted):
+        if self._prefetch_timer is not None:
+            self._prefetch_timer.stop()
+        if self._art_prefetcher is not None:
+            # the cursor moved away, covers not started yet aren't wanted anymore
+            self._art_prefetcher.prefetch("library", [])
+
+        album = self._albums_by_uri.get(event.row_key.value)
+        if album is not None:
+            self._prefetch_timer = self.set_timer(
+                self.PREFETCH_DELAY, lambda: self._prefetch_around_cursor(event.data_table, album, event.cursor_row)
+            )
+
+    def _prefetch_around_cursor(self, dt: DataTable, album: LibraryAlbum, cursor_row: int):
+        self._prefetch_tracks_worker(album.id)
+
+        # the cursor row first, then outwards
+        rows = sorted(
+            range(max(cursor_row - self.ART_PREFETCH_RADIUS, 0),
+                  min(cursor_row + self.ART_PREFETCH_RADIUS + 1, dt.row_count)),
+            key=lambda row: abs(row - cursor_row),
+        )
+        neighbours = [self._albums_by_uri.get(dt.ordered_rows[row].key.value) for row in rows]
+        if self._art_prefetcher is None:
+            from spotify_cli.utils.pixelate_images import get_album_art_prefetcher
+            self._art_prefetcher = get_album_art_prefetcher()
+            self.app.service.metrics.add_cache("album art", self._art_prefetcher.cache.disk.stats)
+        # at the size the track details currently show covers at
+        self._art_prefetcher.prefetch("library", [neighbour.image_url for neighbour in neighbours if neighbour])
+
+    @work(exclusive=True, group="io-album-tracks")
+    async def _prefetch_tracks_worker(self, album_id: str):
+        try:
+            await self.app.service.prefetch_album_tracks_async(album_id)
+        except Exception:
+            # only a prefetch, playing the album fetches the tracklist again
+            return
 
-    @work(thread=True, exclusive=True, group="io-albums")
-    def _load_albums_worker(self):
+    @work(exclusive=True, group="io-albums")
+    async def _load_albums_worker(self):
         try:
-            albums = self.app.service.get_library_albums_cached()
-            self.post_message(AlbumsLoaded(albums))
+            async for chunk in self.app.service.stream_library_albums():
+                self.post_message(AlbumsLoaded(chunk.albums, index=chunk.index))
         except Exception:
             self.post_message(AlbumsFailed("Failed loading albums, try again later"))
+        else:
+            # an empty library never sends a chunk
+            self.post_message(AlbumsLoaded([]))
+            self._reconcile_albums_worker()
 
-    @on(AlbumsLoaded)
-    def _handle_albums_loaded(self, message: AlbumsLoaded):
-        dt = self.query_one(DataTable)
-        dt.clear()
+    @work(exclusive=True, group="io-albums-refresh")
+    async def _refresh_albums_worker(self):
+        try:
+            albums = await self.app.service.get_library_albums_cached_async()
+        except Exception:
+            # the table still shows the last good library, try again on the next interval
+            return
+        self.post_message(AlbumsSynced(albums))
+        self._reconcile_albums_worker()
 
-        dt.add_columns(*self.TABLE_COL)
+    @work(exclusive=True, group="io-albums-reconcile")
+    async def _reconcile_albums_worker(self):
+        # the sync only sees newly saved albums, removals made elsewhere are found here (at most once per its ttl)
+        try:
+            result = await self.app.service.reconcile_library_async()
+            if not result.changed:
+                return
+            albums = await self.app.service.get_library_albums_cached_async()
+        except Exception:
+            return
+        self.post_message(AlbumsSynced(albums))
 
-        for album in message.albums:
-            dt.add_row(album.get_albums_artists(), album.name, key=album.uri)
+    @on(AlbumsLoaded)
+    async def _handle_albums_loaded(self, message: AlbumsLoaded):
+        self._add_albums(message.albums, message.index)
+        self._show_albums()
+        if self._filter:
+            # the filtered rows are rebuilt from the index, which the sync keeps up to date
+            await self._apply_filter()
 
         self.query_one("#albums_loading", LoadingIndicator).display = False
         self.query_one("#albums_error", Static).update("")
 
+    @on(AlbumsSynced)
+    async def _handle_albums_synced(self, message: AlbumsSynced):
+        self._albums = list(message.albums)
+        self._albums_by_uri = {album.uri: album for album in self._albums}
+        self._show_albums()
+        if self._filter:
+            await self._apply_filter()
+
     @on(AlbumsFailed)
     def _handle_albums_failed(self, message: AlbumsFailed):
         self.query_one("#albums_loading", LoadingIndicator).display = False
         self.query_one("#albums_error", Static).update(f"Error: {message.error}")
+
+    # region #### Filter ####
+    def action_filter(self):
+        library_filter = self.query_one("#library_filter", Input)
+        library_filter.remove_class("invisible")
+        library_filter.focus()
+
+    async def action_clear_filter(self):
+        library_filter = self.query_one("#library_filter", Input)
+        if library_filter.has_class("invisible"):
+            return
+
+        library_filter.add_class("invisible")
+        # changing the value posts Input.Changed, which shows the full library again
+        library_filter.value = ""
+        self.query_one("#library_albums", LibraryTable).focus()
+
+    @on(Input.Changed, "#library_filter")
+    async def _handle_filter_changed(self, event: Input.Changed):
+        self._filter = event.value.strip()
+        await self._apply_filter()
+
+    @on(Input.Submitted, "#library_filter")
+    def _handle_filter_submitted(self, event: Input.Submitted):
+        filtered = len(self._filter) >= LibraryIndex.MIN_QUERY_LENGTH
+        self.query_one("#library_filtered" if filtered else "#library_albums", LibraryTable).focus()
+
+    async def _apply_filter(self):
+        albums = self.query_one("#library_albums", LibraryTable)
+        filtered = self.query_one("#library_filtered", LibraryTable)
+        if len(self._filter) < LibraryIndex.MIN_QUERY_LENGTH:
+            filtered.add_class("invisible")
+            albums.remove_class("invisible")
+            return
+
+        if self._index is None:
+            self._index = await self.app.service.get_library_index_async()
+
+        uris = {album.uri for album in self._index.search(self._filter, limit=self.FILTER_LIMIT)}
+        self._show_rows(filtered, [self._row(album) for album in self._albums if album.uri in uris])
+        albums.add_class("invisible")
+        filtered.remove_class("invisible")
+
+    # endregion
+
+    def _add_albums(self, albums: list[LibraryAlbum], index: int | None):
+        albums = [album for album in albums if album.uri not in self._albums_by_uri]
+        self._albums_by_uri.update((album.uri, album) for album in albums)
+        if index is None:
+            self._albums.extend(albums)
+        else:
+            self._albums[index:index] = albums
+
+    def _show_albums(self):
+        self._show_rows(self.query_one("#library_albums", LibraryTable), [self._row(album) for album in self._albums])
+
+    def _show_rows(self, dt: LibraryTable, rows: list[tuple[str, tuple]]):
+        self.run_worker(
+            # a newer chunk, sync or filter key cancels the rows still being added, the next patch continues
+            # from there
+            partial(dt.patch_rows, rows, self.ROWS_PER_SLICE),
+            exclusive=True,
+            group=f"rows-{dt.id}",
+            thread=False,
+        )
+
+    @staticmethod
+    def _row(album: LibraryAlbum) -> tuple[str, tuple]:
+        return album.uri, (album.get_albums_artists(), album.name)
@@ -1,71 +1,156 @@
+import time
+from collections import deque
+from functools import partial
+
+from textual import work, log
 from textual.containers import Container, Vertical
 from textual.reactive import reactive
 from textual.widget import Widget
 from textual.widgets import Static
 
 from spotify_cli.schemas.track import Track
-from spotify_cli.utils.pixelate_images import get_image_from_url
+from spotify_cli.utils.cover_sizes import cover_size_for, neighbour_sizes
+from spotify_cli.utils.date_time_helpers import format_progress
 
 
 class TrackDetail(Widget):
-    track: reactive[Track] = reactive(None, recompose=True)
-    album_image: reactive[str] = reactive(None, recompose=True)
-    pixel_view = Static()
+    # cover size (pixels) before the layout is known
+    COVER_SIZE = (23, 23)
+    # update timings kept for the debug view
+    MAX_TIMINGS = 100
+
+    # updated in place, the poll sends a new Track for every change (is_playing, device, ...) and rebuilding the
+    # whole subtree for each of them is most of the app's idle cpu
+    track: reactive[Track | None] = reactive(None)
 
     def __init__(self, *children: Widget, track: Track | None = None):
         super().__init__(*children)
-        self.track = track
+        self._cover_url: str | None = None
+        # until the layout is known, then fitted to the cover container
+        self._cover_size: tuple[int, int] = self.COVER_SIZE
+        # ms per in place update of the details and per cover render (start to shown), newest last
+        self.update_timings: deque[float] = deque(maxlen=self.MAX_TIMINGS)
+        self.cover_timings: deque[float] = deque(maxlen=self.MAX_TIMINGS)
+        # composed from it, the watcher only runs for changes after that
+        self.set_reactive(TrackDetail.track, track)
 
     def compose(self):
-        if not self.track:
-            yield Static("No track selected")
-            return
+        yield Static("No track selected", id="no_track", classes="invisible" if self.track else "")
 
-        yield Vertical(
-            Container(
-                Static(f"Track: {self.track.name}"),
-                Static(f"Album: {self.track.album.name}"),
-                Static(f"Artist: {self.track.artist}"),
-                id="track_text_details"
-            ),
-            Container(
-                self.pixel_view,
-                id="album_cover"
-            ),
-            id="track_layout"
-        )
+        with Vertical(id="track_layout", classes="" if self.track else "invisible"):
+            with Container(id="track_text_details"):
+                for static_id, text in self._details(self.track).items():
+                    yield Static(text, id=static_id)
+                yield Static("", id="track_progress")
+            with Container(id="album_cover"):
+                yield Static(id="album_art")
+
+    @staticmethod
+    def _details(track: Track | None) -> dict[str, str]:
+        if track is None:
+            return {"track_name": "", "track_album": "", "track_artist": ""}
+        return {
+            "track_name": f"Track: {track.name}",
+            "track_album": f"Album: {track.album.name}",
+            "track_artist": f"Artist: {track.artist}",
+        }
+
+    def update_progress(self, progress_ms: int | None, duration_ms: int | None):
+        for progress in self.query("#track_progress").results(Static):
+            progress.update(format_progress(progress_ms, duration_ms))
 
     async def on_mount(self):
         if self.track:
             self._start_service_call(self.track)
 
     def watch_track(self, old: "Track | None", new: "Track | None"):
-        if new is None or (old and old.name == new.name):
-            return
-        self._start_service_call(new)
+        started = time.perf_counter()
+        # showing or hiding the details is the only structural change, a class toggle instead of a recompose
+        self.query_one("#no_track").set_class(new is not None, "invisible")
+        self.query_one("#track_layout").set_class(new is None, "invisible")
+
+        old_details = self._details(old)
+        for static_id, text in self._details(new).items():
+            if text != old_details[static_id]:
+                self.query_one(f"#{static_id}", Static).update(text)
+
+        if new is None:
+            self._cover_url = None
+            self.query_one("#album_art", Static).update("")
+        elif old is None or (old.name, old.album.id) != (new.name, new.album.id):
+            self._start_service_call(new)
+        self.update_timings.append((time.perf_counter() - started) * 1000)
 
     def _start_service_call(self, track: "Track"):
         """Start/replace a background job for the current track."""
-        # Cancel/replace any in-flight job for previous tracks
+        album_image = track.album.get_album_image()
+        self._cover_url = album_image.url if album_image else None
+        if self._cover_url is None:
+            self.query_one("#album_art", Static).update("")
+        # the size is known once the new track is laid out
+        self.call_after_refresh(self._fit_cover, render=True)
+        self._prefetch_next_cover_worker()
+
+    def _start_cover_render(self, name: str):
+        # Cancel/replace any in-flight job for previous tracks (or sizes)
         self.run_worker(
-            self._fetch_track_album_image(track),
+            # started lazily, a render replaced before it starts never creates its coroutine
+            partial(self._render_cover, self._cover_url, self._cover_size),
             exclusive=True,
             group="track-service",
             thread=False,
-            name=f"track-service:{track.name}",
+            name=name,
         )
 
-    async def _fetch_track_album_image(self, track: "Track"):
-        if self.pixel_view is None:
+    @work(exclusive=True, group="io-next-cover")
+    async def _prefetch_next_cover_worker(self):
+        try:
+            album = await self.app.service.get_next_queued_album_async()
+        except Exception:
+            return
+        image = album.get_album_image() if album else None
+        if image is None:
             return
 
-        album_image = track.album.get_album_image()
-        if album_image is None:
+        from spotify_cli.utils.pixelate_images import get_album_art_prefetcher
+        prefetcher = get_album_art_prefetcher()
+        self.app.service.metrics.add_cache("album art", prefetcher.cache.disk.stats)
+        prefetcher.prefetch("queue", [image.url])
+
+    async def _render_cover(self, image_url: str | None, size: tuple[int, int]):
+        if image_url is None:
             return
+        started = time.perf_counter()
 
-        # todo - maybe do the size dynmicly to the terminal size
-        img = get_image_from_url(
-            album_image.url,
-            (23, 23)
-        )
-        self.pixel_view.update(img)
+        # PIL and rich_pixels are only loaded once there is art to show
+        from spotify_cli.utils.pixelate_images import get_album_art_cache, render_cover_async
+
+        cache = get_album_art_cache()
+        cache.shown_size = size
+        pixels = cache.peek(image_url, size)
+        if pixels is None:
+            try:
+                # download, decode and resize run on the art executor, the neighbouring sizes come from the same
+                # decode so a resize usually has its size ready
+                pixels = (await render_cover_async(image_url, neighbour_sizes(size)))[size]
+            except Exception as e:
+                log(f"failed rendering the album cover: {e}")
+                return
+        self.query_one("#album_art", Static).update(pixels)
+        self.cover_timings.append((time.perf_counter() - started) * 1000)
+
+    def on_resize(self):
+        # the cover container is laid out after this widget
+        self.call_after_refresh(self._fit_cover)
+
+    def _fit_cover(self, render: bool = False):
+        """Fits the cover size to its container, renders the cover again when it changed (or `render`)"""
+        covers = self.query("#album_cover")
+        region = covers.first().content_region if covers else None
+        if region and region.width > 0 and region.height > 0:
+            size = cover_size_for(region.width, region.height)
+            render = render or size != self._cover_size
+            self._cover_size = size
+
+        if render and self._cover_url is not None:
+            self._start_cover_render(name=f"track-service:{self._cover_url}:{self._cover_size[0]}")
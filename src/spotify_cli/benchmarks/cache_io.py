@@ -0,0 +1,86 @@
+"""
+Load time of the json caches with the garbage collector running during the load, like every load did before it was
+paused, against the paused load, for saved album caches of increasing size.
+Then save/load time and file size of every available codec, for the saved albums cache and the library index.
+
+    python -m spotify_cli.benchmarks.cache_io --sizes 1000 10000 50000 --runs 5
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from spotify_cli.benchmarks.simulator import SpotifySimulator, SimulatorConfig
+from spotify_cli.core.caching import JsonCacheBase, SavedAlbumsCache, SavedAlbumsModel
+from spotify_cli.core.codecs import COMPRESSORS, JSON, MARSHAL, Codec
+from spotify_cli.core.library_index import LibraryIndex, LibraryIndexCache
+from spotify_cli.core.library_record import LibraryAlbum
+
+
+def _median_ms(fn: Callable[[], object], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _saved_albums(size: int) -> SavedAlbumsModel:
+    with SpotifySimulator(SimulatorConfig(library_size=size)) as simulator:
+        items = [simulator.library.saved_album(i) for i in range(size)]
+    return SavedAlbumsModel.model_validate({
+        "entries": json.loads(json.dumps(items)),
+        "album_ids": [item["album"]["id"] for item in items],
+    })
+
+
+def _codecs() -> list[Codec]:
+    codecs = [Codec(JSON), Codec(MARSHAL)]
+    for compressor in COMPRESSORS.values():
+        codecs += [Codec(JSON, compressor), Codec(MARSHAL, compressor)]
+    return codecs
+
+
+def _compare_codecs(title: str, cache_type: Callable[..., JsonCacheBase], payload, path: Path, runs: int):
+    print(f"\n{title}")
+    print(f"{'codec':<16}{'save ms':>10}{'load ms':>10}{'size MB':>10}")
+    for codec in _codecs():
+        cache = cache_type(path, codec=codec)
+        save_ms = _median_ms(lambda: cache.save(payload), runs)
+        load_ms = _median_ms(cache.load, runs)
+        print(f"{codec.name:<16}{save_ms:>10.1f}{load_ms:>10.1f}{path.stat().st_size / 1024 / 1024:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cache loads with and without the garbage collector")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'entries':>8}{'gc running ms':>16}{'gc paused ms':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            cache = SavedAlbumsCache(Path(tmp) / f"saved_albums_{size}.json")
+            cache.save(_saved_albums(size))
+
+            running_ms = _median_ms(cache._load, args.runs)
+            paused_ms = _median_ms(cache.load, args.runs)
+            print(f"{size:>8}{running_ms:>16.1f}{paused_ms:>15.1f}")
+
+        size = max(args.sizes)
+        saved_albums = _saved_albums(size)
+        _compare_codecs(f"saved albums cache, {size} entries", SavedAlbumsCache, saved_albums,
+                        Path(tmp) / "saved_albums.bin", args.runs)
+
+        index = LibraryIndex()
+        index.add(LibraryAlbum.from_album(entry.album, entry.added_at) for entry in saved_albums.entries)
+        _compare_codecs(f"library index, {size} albums", LibraryIndexCache, index,
+                        Path(tmp) / "library_index.bin", args.runs)
+
+
+if __name__ == "__main__":
+    main()
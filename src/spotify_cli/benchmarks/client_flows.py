@@ -0,0 +1,134 @@
+"""
+Times the SpotifyClient flows the app runs (startup, cold/warm library sync, suggestion bursts, playback
+commands, library reconciliation) against the local simulator and prints wall time plus the upstream requests each flow made.
+
+    python -m spotify_cli.benchmarks.client_flows --library-size 5000 --latency-ms 120 --rate-limit 100
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from spotify_cli.benchmarks.simulator import SpotifySimulator, SimulatorConfig
+from spotify_cli.core.library_store import LibraryStore
+from spotify_cli.core.spotify import SpotifyClient, SearchElementTypes
+
+
+async def _startup(client: SpotifyClient, simulator: SpotifySimulator):
+    await asyncio.gather(client.get_first_active_device_async(), client.get_playback_state_async())
+
+
+async def _device_switch_burst(client: SpotifyClient, simulator: SpotifySimulator):
+    # the device picker, the poll worker and a playback toggle all reading at once
+    await asyncio.gather(
+        client.get_devices_async(),
+        client.get_first_active_device_async(),
+        client.get_first_active_device_async(),
+        client.get_playback_state_async(),
+        client.get_playback_state_async(),
+    )
+
+
+async def _library_sync(client: SpotifyClient, simulator: SpotifySimulator):
+    await client.get_library_albums_cached_async()
+
+
+async def _library_sync_after_ttl(client: SpotifyClient, simulator: SpotifySimulator):
+    # force the freshness peek path instead of the ttl short circuit
+    await client.transport.run(client.get_library_albums_cached, ttl_sec=0)
+
+
+async def _suggestion_burst(client: SpotifyClient, simulator: SpotifySimulator):
+    # what a fast typist produces with the suggester debounce defeated, one keystroke after the other
+    queries = ["al", "alb", "albu", "album", "album 1", "album 12"]
+    for q in queries:
+        await client.get_search_suggestions_async(query=q, search_element=SearchElementTypes.ALBUM)
+
+
+async def _play_album_and_toggle(client: SpotifyClient, simulator: SpotifySimulator):
+    await client.play_by_uris_or_context_uri(context_uri=client.library.albums(limit=1)[0].uri)
+    await client.play_or_pause_track_async()
+    await client.play_or_pause_track_async()
+
+
+async def _reconcile_after_removals(client: SpotifyClient, simulator: SpotifySimulator):
+    # three albums unsaved on another device, spread over the library
+    saved = simulator.library.saved
+    simulator.library.unsave([saved[len(saved) // 10], saved[len(saved) // 2], saved[-5]])
+    await client.transport.run(client.reconcile_library, ttl_sec=0)
+
+
+async def _reconcile_unchanged(client: SpotifyClient, simulator: SpotifySimulator):
+    await client.transport.run(client.reconcile_library, ttl_sec=0)
+
+
+async def _play_library_album(client: SpotifyClient, simulator: SpotifySimulator):
+    await client.play_library_album(client.library.albums(offset=3, limit=1)[0].id)
+
+
+SCENARIOS: list[tuple[str, Callable[[SpotifyClient, SpotifySimulator], Awaitable]]] = [
+    ("startup", _startup),
+    ("device switch burst", _device_switch_burst),
+    ("cold library sync", _library_sync),
+    ("warm library sync (ttl)", _library_sync),
+    ("warm library sync (peek)", _library_sync_after_ttl),
+    ("reconcile (unchanged)", _reconcile_unchanged),
+    ("reconcile (3 removed)", _reconcile_after_removals),
+    ("suggestion burst", _suggestion_burst),
+    ("play album + toggle twice", _play_album_and_toggle),
+    ("play library album", _play_library_album),
+    # the tracklist is cached now, like after a hover prefetch
+    ("play library album again", _play_library_album),
+]
+
+
+async def run(config: SimulatorConfig) -> list[tuple[str, float, int, int]]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, SpotifySimulator(config) as simulator:
+        client = simulator.client(library=LibraryStore(Path(tmp) / "library.sqlite3"))
+        try:
+            for name, scenario in SCENARIOS:
+                requests_before = simulator.stats.total_requests
+                limited_before = simulator.stats.rate_limited
+                started = time.perf_counter()
+                await scenario(client, simulator)
+                elapsed = time.perf_counter() - started
+                results.append((
+                    name,
+                    elapsed * 1000,
+                    simulator.stats.total_requests - requests_before,
+                    simulator.stats.rate_limited - limited_before,
+                ))
+        finally:
+            client.transport.close()
+            client.library.close()
+            client.tracklists.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SpotifyClient flows against the local simulator")
+    parser.add_argument("--latency-ms", type=float, default=SimulatorConfig.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=SimulatorConfig.jitter_ms)
+    parser.add_argument("--library-size", type=int, default=SimulatorConfig.library_size)
+    parser.add_argument("--rate-limit", type=int, default=None, help="requests allowed per rate limit window")
+    parser.add_argument("--rate-limit-window", type=float, default=SimulatorConfig.rate_limit_window_sec)
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        library_size=args.library_size,
+        rate_limit=args.rate_limit,
+        rate_limit_window_sec=args.rate_limit_window,
+    )
+
+    print(f"{'flow':<28}{'wall ms':>10}{'requests':>10}{'429s':>8}")
+    for name, elapsed_ms, requests, limited in asyncio.run(run(config)):
+        print(f"{name:<28}{elapsed_ms:>10.1f}{requests:>10}{limited:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Memory and disk footprint of the saved albums library, full `AlbumSearchItem` models (the json cache and the v1 store
+kept every album as json) against the compact `LibraryAlbum` records of the current store.
+
+    python -m spotify_cli.benchmarks.library_footprint --library-size 20000
+"""
+import argparse
+import gc
+import json
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from spotify_cli.benchmarks.simulator import SpotifySimulator, SimulatorConfig
+from spotify_cli.core.caching import EntryModel, SavedAlbumsCache, SavedAlbumsModel
+from spotify_cli.core.library_store import LibraryStore
+
+
+def _allocated(build: Callable[[], list]) -> tuple[list, int]:
+    """Builds the list and returns it with the bytes still allocated for it"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def _file_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in (path, path.with_name(f"{path.name}-wal")) if p.exists())
+
+
+def _write_v1_store(path: Path, rows: list[tuple[str, str, str, str]]):
+    """The v1 layout, one json document per album"""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE albums (id TEXT PRIMARY KEY, added_at TEXT NOT NULL, artist TEXT NOT NULL, album TEXT NOT NULL);
+        CREATE INDEX albums_added_at ON albums (added_at DESC, id);
+        CREATE INDEX albums_artist ON albums (artist COLLATE NOCASE);
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        PRAGMA user_version = 1;
+    """)
+    conn.executemany("INSERT INTO albums VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory and disk size of the library representations")
+    parser.add_argument("--library-size", type=int, default=20000)
+    args = parser.parse_args()
+
+    with SpotifySimulator(SimulatorConfig(library_size=args.library_size)) as simulator:
+        saved = [json.dumps(simulator.library.saved_album(i)) for i in range(args.library_size)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        # what the store used to hand out, every album parsed from its json
+        entries, models_bytes = _allocated(lambda: [EntryModel.model_validate_json(item) for item in saved])
+
+        legacy = SavedAlbumsCache(tmp / "saved_albums.json")
+        legacy.save(SavedAlbumsModel(entries=entries, album_ids=[entry.album.id for entry in entries]))
+
+        store_path = tmp / "library.sqlite3"
+        _write_v1_store(store_path, [
+            (entry.album.id, entry.added_at, entry.album.get_albums_artists(), entry.album.model_dump_json())
+            for entry in entries
+        ])
+        v1_bytes = _file_size(store_path)
+        del entries
+
+        store = LibraryStore(store_path)
+        started = time.perf_counter()
+        store.count()
+        migration_sec = time.perf_counter() - started
+        records, records_bytes = _allocated(store.albums)
+        store.close()
+        v2_bytes = _file_size(store_path)
+
+        print(f"{args.library_size} albums")
+        print(f"{'':<30}{'before':>12}{'after':>12}")
+        print(f"{'memory':<30}{_mb(models_bytes):>12}{_mb(records_bytes):>12}")
+        print(f"{'saved_albums.json / store':<30}{_mb(_file_size(legacy.path)):>12}{_mb(v2_bytes):>12}")
+        print(f"{'library.sqlite3 v1 / v2':<30}{_mb(v1_bytes):>12}{_mb(v2_bytes):>12}")
+        print(f"v1 -> v2 migration: {migration_sec:.2f} s, {len(records)} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,567 @@
+"""
+Local stand-in for the parts of the Spotify Web API that SpotifyClient uses.
+
+Latency, jitter, 429 rate limiting and the library size are configurable, so client behaviour under realistic
+network timing can be measured (and slow-library / rate-limit incidents reproduced) with no network at all:
+
+    python -m spotify_cli.benchmarks.simulator --library-size 20000 --latency-ms 150 --rate-limit 60
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+from spotipy import Spotify
+
+from spotify_cli.core.library_store import LibraryStore
+from spotify_cli.core.spotify import SpotifyClient
+from spotify_cli.core.transport import SpotifyTransport
+
+MARKETS = Spotify.country_codes
+
+
+@dataclass
+class SimulatorConfig:
+    # every response is delayed by latency_ms +- jitter_ms (uniform)
+    latency_ms: float = 80.0
+    jitter_ms: float = 20.0
+    library_size: int = 1000
+    tracks_per_album: int = 10
+    devices: int = 2
+    # the first device starts active, like a desktop app that is already open
+    active_device: bool = True
+    # None disables rate limiting, otherwise at most `rate_limit` requests per `rate_limit_window_sec`
+    rate_limit: Optional[int] = None
+    rate_limit_window_sec: float = 30.0
+    retry_after_sec: int = 2
+    seed: int = 0
+
+
+@dataclass
+class SimulatorStats:
+    requests: Counter = field(default_factory=Counter)
+    rate_limited: int = 0
+    not_modified: int = 0
+    # the server handles every request on its own thread
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def add_request(self, request: str):
+        with self._lock:
+            self.requests[request] += 1
+
+    def add_rate_limited(self):
+        with self._lock:
+            self.rate_limited += 1
+
+    def add_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+
+class _Library:
+    """Deterministic fake catalog, album 0 is the most recently saved one"""
+
+    def __init__(self, config: SimulatorConfig, base_url: str):
+        self.config = config
+        self.base_url = base_url
+        self._newest_added_at = datetime(2025, 1, 1, 12, 0, 0)
+        self.saved: list[str] = [self.album_id(i) for i in range(config.library_size)]
+        self._index = {album_id: i for i, album_id in enumerate(self.saved)}
+
+    @staticmethod
+    def album_id(i: int) -> str:
+        return hashlib.blake2b(str(i).encode(), digest_size=11).hexdigest()
+
+    def album_index(self, album_id: str) -> Optional[int]:
+        return self._index.get(album_id)
+
+    def album(self, i: int) -> dict:
+        album_id = self.album_id(i)
+        artist_id = f"artist{i % 997:05d}"
+        return {
+            "album_type": "album",
+            "total_tracks": self.config.tracks_per_album,
+            "available_markets": MARKETS,
+            "href": f"{self.base_url}/v1/albums/{album_id}",
+            "id": album_id,
+            "images": [
+                {"url": f"{self.base_url}/images/{album_id}/{size}.png", "height": size, "width": size}
+                for size in (640, 300, 64)
+            ],
+            "name": f"Album {i}",
+            "release_date": (self._newest_added_at - timedelta(days=30 + i)).strftime("%Y-%m-%d"),
+            "type": "album",
+            "uri": f"spotify:album:{album_id}",
+            "artists": [self.artist(i % 997, artist_id)],
+        }
+
+    def artist(self, n: int, artist_id: str) -> dict:
+        return {
+            "href": f"{self.base_url}/v1/artists/{artist_id}",
+            "id": artist_id,
+            "name": f"Artist {n}",
+            "type": "artist",
+            "uri": f"spotify:artist:{artist_id}",
+        }
+
+    def unsave(self, album_ids: list[str]):
+        """Removes albums from the saved library, like the user did from another device"""
+        removed = set(album_ids)
+        self.saved = [album_id for album_id in self.saved if album_id not in removed]
+
+    def saved_album(self, i: int) -> dict:
+        added_at = self._newest_added_at - timedelta(hours=i)
+        return {"added_at": added_at.strftime("%Y-%m-%dT%H:%M:%SZ"), "album": self.album(i)}
+
+    def track(self, album_index: int, number: int, with_album: bool = False) -> dict:
+        album = self.album(album_index)
+        track_id = f"{album['id']}{number:02d}"
+        track = {
+            "artists": album["artists"],
+            "available_markets": MARKETS,
+            "duration_ms": 180_000,
+            "href": f"{self.base_url}/v1/tracks/{track_id}",
+            "id": track_id,
+            "is_playable": True,
+            "popularity": (album_index * 7 + number) % 101,
+            "track_number": number,
+            "type": "track",
+            "uri": f"spotify:track:{track_id}",
+            "name": f"Track {number} of {album['name']}",
+        }
+        if with_album:
+            track["album"] = album
+        return track
+
+
+class _Player:
+    def __init__(self, library: _Library, devices: list[dict]):
+        self.library = library
+        self.devices = devices
+        self.device: Optional[dict] = None
+        self.album_index: Optional[int] = None
+        self.track_number = 1
+        self.is_playing = False
+        self._progress_ms = 0
+        self._resumed_at = 0.0
+        self.version = 0
+
+    def progress_ms(self) -> int:
+        if self.is_playing:
+            return self._progress_ms + int((time.monotonic() - self._resumed_at) * 1000)
+        return self._progress_ms
+
+    def _advance(self):
+        # move through the album as the simulated wall clock passes track boundaries
+        duration = 180_000
+        progress = self.progress_ms()
+        if progress < duration:
+            return
+        skipped, progress = divmod(progress, duration)
+        self.track_number = (self.track_number - 1 + skipped) % self.library.config.tracks_per_album + 1
+        self._progress_ms = progress
+        self._resumed_at = time.monotonic()
+        self.version += 1
+
+    def play(self, device_id: Optional[str], context_uri: Optional[str], uris: Optional[list[str]]):
+        self._set_device(device_id)
+        # what played so far, the clock restarts below
+        self._progress_ms = self.progress_ms()
+        if context_uri:
+            self.album_index = self.library.album_index(context_uri.rsplit(":", 1)[-1]) or 0
+            self.track_number = 1
+            self._progress_ms = 0
+        elif uris:
+            track_id = uris[0].rsplit(":", 1)[-1]
+            self.album_index = self.library.album_index(track_id[:-2]) or 0
+            self.track_number = int(track_id[-2:]) if track_id[-2:].isdigit() else 1
+            self._progress_ms = 0
+        elif self.album_index is None:
+            self.album_index = 0
+        self._resumed_at = time.monotonic()
+        self.is_playing = True
+        self.version += 1
+
+    def pause(self):
+        if self.is_playing:
+            self._progress_ms = self.progress_ms()
+            self.is_playing = False
+            self.version += 1
+
+    def transfer(self, device_id: str, play: bool):
+        self._set_device(device_id)
+        if play:
+            self.play(device_id, None, None)
+        self.version += 1
+
+    def _set_device(self, device_id: Optional[str]):
+        if device_id is None and self.device is not None:
+            return
+        target = next((d for d in self.devices if d["id"] == device_id), self.devices[0] if self.devices else None)
+        for device in self.devices:
+            device["is_active"] = device is target
+        self.device = target
+
+    def queue(self) -> dict:
+        """The rest of the album, then the next album, like autoplay"""
+        if self.album_index is None:
+            return {"currently_playing": None, "queue": []}
+        self._advance()
+        album_index, number, items = self.album_index, self.track_number, []
+        for _ in range(20):
+            number += 1
+            if number > self.library.config.tracks_per_album:
+                album_index, number = album_index + 1, 1
+            items.append(self.library.track(album_index, number, with_album=True))
+        return {
+            "currently_playing": self.library.track(self.album_index, self.track_number, with_album=True),
+            "queue": items,
+        }
+
+    def state(self) -> Optional[dict]:
+        if self.album_index is None or self.device is None:
+            return None
+        self._advance()
+        return {
+            "device": self.device,
+            "progress_ms": self.progress_ms(),
+            "is_playing": self.is_playing,
+            "item": self.library.track(self.album_index, self.track_number, with_album=True),
+            "currently_playing_type": "track",
+            "actions": {"disallows": {"resuming": True} if self.is_playing else {"pausing": True}},
+        }
+
+
+class SpotifySimulator:
+    """
+    Threaded HTTP server implementing the endpoints SpotifyClient talks to.
+    Usable as a context manager, `client()` returns a SpotifyClient wired to it.
+    """
+
+    def __init__(self, config: Optional[SimulatorConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or SimulatorConfig()
+        self.stats = SimulatorStats()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._request_times: deque[float] = deque()
+        self._throttled_until = 0.0
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+        self.library = _Library(self.config, self.url)
+        devices = [
+            {
+                "id": f"simdevice{n}",
+                "is_active": False,
+                "is_private_session": False,
+                "is_restricted": False,
+                "name": f"Simulated device {n}",
+                "type": "Computer",
+                "volume_percent": 50,
+                "supports_volume": True,
+            }
+            for n in range(self.config.devices)
+        ]
+        self.player = _Player(self.library, devices)
+        if self.config.active_device and devices:
+            self.player.transfer(devices[0]["id"], play=False)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # region #### Lifecycle ####
+    def start(self) -> "SpotifySimulator":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="spotify-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "SpotifySimulator":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def client(self, library: Optional[LibraryStore] = None,
+               transport: Optional[SpotifyTransport] = None) -> SpotifyClient:
+        transport = transport or SpotifyTransport()
+        sp = Spotify(auth="simulated-token", requests_session=transport.session)
+        sp.prefix = f"{self.url}/v1/"
+        return SpotifyClient(sp=sp, platform=SimulatedPlatform(), library=library, transport=transport)
+
+    # endregion
+
+    # region #### Network conditions ####
+    def _delay(self):
+        latency = self.config.latency_ms + self._random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000.0)
+
+    def _retry_after(self) -> Optional[int]:
+        """Returns seconds to wait when the request should get a 429"""
+        if self.config.rate_limit is None:
+            return None
+
+        with self._lock:
+            now = time.monotonic()
+            if now < self._throttled_until:
+                return max(1, int(self._throttled_until - now + 0.999))
+
+            window_start = now - self.config.rate_limit_window_sec
+            while self._request_times and self._request_times[0] < window_start:
+                self._request_times.popleft()
+
+            if len(self._request_times) >= self.config.rate_limit:
+                self._throttled_until = now + self.config.retry_after_sec
+                return self.config.retry_after_sec
+
+            self._request_times.append(now)
+            return None
+
+    # endregion
+
+    # region #### Endpoints ####
+    def _route(self, method: str, path: str, query: dict, body: dict,
+               request_headers: dict) -> tuple[int, Optional[dict | list | bytes], dict]:
+        path = path.rstrip("/")
+
+        if method == "GET" and path == "/v1/me/player/devices":
+            return 200, {"devices": self.player.devices}, {}
+        if method == "GET" and path == "/v1/me/player":
+            return self._player_state(request_headers)
+        if method == "GET" and path == "/v1/me/player/queue":
+            return 200, self.player.queue(), {}
+        if method == "GET" and path == "/v1/me/albums":
+            return 200, self._saved_albums(query), {}
+        if method == "GET" and path in ("/v1/me/albums/contains", "/v1/me/library/contains"):
+            return 200, self._saved_contains(query), {}
+        if method == "GET" and path == "/v1/search":
+            return 200, self._search(query), {}
+        if method == "GET" and path.startswith("/v1/albums/") and path.endswith("/tracks"):
+            return self._album_tracks(path.split("/")[3], query)
+        if method == "GET" and path.startswith("/images/"):
+            return 200, self._image(path.split("/")[2]), {}
+        if method == "PUT" and path == "/v1/me/player/play":
+            self.player.play(query.get("device_id"), body.get("context_uri"), body.get("uris"))
+            return 204, None, {}
+        if method == "PUT" and path == "/v1/me/player/pause":
+            self.player.pause()
+            return 204, None, {}
+        if method == "PUT" and path == "/v1/me/player":
+            self.player.transfer(body.get("device_ids", [None])[0], body.get("play", False))
+            return 204, None, {}
+
+        return 404, {"error": {"status": 404, "message": "Service not found"}}, {}
+
+    def _player_state(self, request_headers: dict) -> tuple[int, Optional[dict], dict]:
+        state = self.player.state()
+        if state is None:
+            return 204, None, {}
+
+        # the tag only moves on state changes (play/pause/transfer/next track), not on progress
+        etag = f'"{self.player.version}"'
+        if request_headers.get("If-None-Match") == etag:
+            self.stats.add_not_modified()
+            return 304, None, {"ETag": etag}
+        return 200, state, {"ETag": etag}
+
+    def _paging(self, href: str, items: list, offset: int, limit: int, total: int) -> dict:
+        return {
+            "href": f"{href}?offset={offset}&limit={limit}",
+            "items": items,
+            "limit": limit,
+            "next": f"{href}?offset={offset + limit}&limit={limit}" if offset + limit < total else None,
+            "offset": offset,
+            "previous": f"{href}?offset={max(0, offset - limit)}&limit={limit}" if offset > 0 else None,
+            "total": total,
+        }
+
+    def _saved_albums(self, query: dict) -> dict:
+        limit = min(int(query.get("limit", 20)), 50)
+        offset = int(query.get("offset", 0))
+        total = len(self.library.saved)
+        items = [
+            self.library.saved_album(self.library.album_index(album_id))
+            for album_id in self.library.saved[offset:offset + limit]
+        ]
+        return self._paging(f"{self.url}/v1/me/albums", items, offset, limit, total)
+
+    def _saved_contains(self, query: dict) -> list[bool]:
+        # newer spotipy versions check `uris` on /me/library/contains, older ones `ids` on /me/albums/contains
+        saved = set(self.library.saved)
+        refs = (query.get("uris") or query.get("ids") or "").split(",")
+        return [ref.rsplit(":", 1)[-1] in saved for ref in refs]
+
+    def _search(self, query: dict) -> dict:
+        limit = min(int(query.get("limit", 10)), 50)
+        offset = int(query.get("offset", 0))
+        search_type = query.get("type", "track")
+        _, _, term = query.get("q", "").partition(":")
+        term = term.casefold()
+
+        matches = [
+            i for i in range(self.config.library_size)
+            if term in f"album {i}" or term in f"artist {i % 997}"
+        ]
+        # the total is of every match, not the page
+        total = len(matches)
+        matches = matches[offset:offset + limit]
+
+        if search_type == "album":
+            items = [self.library.album(i) for i in matches]
+        elif search_type == "artist":
+            items = [
+                self.library.artist(i % 997, f"artist{i % 997:05d}") | {"popularity": (i * 13) % 101, "genres": []}
+                for i in matches
+            ]
+        else:
+            items = [self.library.track(i, 1, with_album=True) for i in matches]
+
+        href = f"{self.url}/v1/search"
+        return {f"{search_type}s": self._paging(href, items, offset, limit, total)}
+
+    def _album_tracks(self, album_id: str, query: dict) -> tuple[int, dict, dict]:
+        album_index = self.library.album_index(album_id)
+        if album_index is None:
+            return 404, {"error": {"status": 404, "message": "Non existing id"}}, {}
+
+        limit = min(int(query.get("limit", 20)), 50)
+        offset = int(query.get("offset", 0))
+        total = self.config.tracks_per_album
+        numbers = range(offset + 1, min(total, offset + limit) + 1)
+        items = [self.library.track(album_index, n) for n in numbers]
+        return 200, self._paging(f"{self.url}/v1/albums/{album_id}/tracks", items, offset, limit, total), {}
+
+    @staticmethod
+    def _image(album_id: str) -> bytes:
+        # lazy import, PIL is only needed when the simulator serves cover art
+        from PIL import Image
+
+        color = tuple(bytes.fromhex(album_id[:6]))
+        buffer = BytesIO()
+        Image.new("RGB", (64, 64), color).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    # endregion
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw_body) if raw_body else {}
+                except ValueError:
+                    body = {}
+
+                simulator._delay()
+                simulator.stats.add_request(f"{self.command} {parsed.path.rstrip('/')}")
+
+                retry_after = simulator._retry_after()
+                if retry_after is not None:
+                    simulator.stats.add_rate_limited()
+                    self._send(429, {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                               {"Retry-After": str(retry_after)})
+                    return
+
+                status, payload, headers = simulator._route(self.command, parsed.path, query, body, self.headers)
+                self._send(status, payload, headers)
+
+            def _send(self, status: int, payload: Optional[dict | list | bytes], headers: Optional[dict] = None):
+                if isinstance(payload, bytes):
+                    data, content_type = payload, "image/png"
+                elif payload is not None:
+                    data, content_type = json.dumps(payload).encode(), "application/json; charset=utf-8"
+                else:
+                    data, content_type = b"", None
+
+                self.send_response(status)
+                if content_type:
+                    self.send_header("Content-Type", content_type)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if data:
+                    self.wfile.write(data)
+
+            do_GET = _handle
+            do_PUT = _handle
+            do_POST = _handle
+            do_DELETE = _handle
+
+        return Handler
+
+
+class SimulatedPlatform:
+    """The simulator owns the player, there is no local Spotify app to launch"""
+
+    @staticmethod
+    def ensure_spotify_running():
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Spotify Web API simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=SimulatorConfig.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=SimulatorConfig.jitter_ms)
+    parser.add_argument("--library-size", type=int, default=SimulatorConfig.library_size)
+    parser.add_argument("--rate-limit", type=int, default=None, help="requests allowed per rate limit window")
+    parser.add_argument("--rate-limit-window", type=float, default=SimulatorConfig.rate_limit_window_sec)
+    parser.add_argument("--retry-after", type=int, default=SimulatorConfig.retry_after_sec)
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        library_size=args.library_size,
+        rate_limit=args.rate_limit,
+        rate_limit_window_sec=args.rate_limit_window,
+        retry_after_sec=args.retry_after,
+    )
+    simulator = SpotifySimulator(config, host=args.host, port=args.port)
+    print(f"Spotify simulator listening on {simulator.url}/v1/ ({config.library_size} saved albums)")
+    try:
+        simulator._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Import time and cold start of the `spotify` entry point, each measured in a fresh interpreter.
+Exits non zero when the median of either is over its budget, so it can guard startup regressions in ci.
+
+    python -m spotify_cli.benchmarks.startup --runs 5 --import-budget-ms 800 --cold-start-budget-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, field
+
+ENTRY_POINT_MODULE = "spotify_cli.entry_points"
+# modules the entry point must not import, they are loaded on first use
+DEFERRED_MODULES = (
+    "PIL",
+    "rich_pixels",
+    "spotify_cli.app.screens.search",
+    "spotify_cli.app.screens.setup_env",
+    "spotify_cli.app.screens.choose_device",
+)
+
+# runs the app headless against the simulator until the main screen painted, prints the timings as json.
+# the simulator is only started after the entry point import was timed, and the app clock is shifted so
+# `first_paint_ms` is import time + time from run to first paint
+_COLD_START_SCRIPT = """
+import asyncio, json, sys, time
+started_at = time.perf_counter()
+import spotify_cli.entry_points
+import_ms = (time.perf_counter() - started_at) * 1000
+
+from pathlib import Path
+from spotify_cli.app.app import SpotifyApp
+from spotify_cli.benchmarks.simulator import SpotifySimulator, SimulatorConfig
+from spotify_cli.core.library_store import LibraryStore
+
+async def main():
+    with SpotifySimulator(SimulatorConfig(latency_ms=0, jitter_ms=0)) as simulator:
+        app = SpotifyApp()
+        app.service = simulator.client(library=LibraryStore(Path(sys.argv[1]) / "library.sqlite3"))
+        app.started_at = time.perf_counter() - import_ms / 1000
+        async with app.run_test(headless=True) as pilot:
+            while app.first_paint_ms is None:
+                await pilot.pause(0.01)
+            # let the background reconciliation finish, it would query a screen that is being torn down
+            while any(worker.group.startswith("io-") and not worker.is_finished for worker in app.workers):
+                await pilot.pause(0.01)
+        print(json.dumps({"import_ms": import_ms, "cold_start_ms": app.first_paint_ms}))
+
+asyncio.run(main())
+"""
+
+
+@dataclass
+class ImportProfile:
+    total_ms: float
+    # module -> self time in ms
+    self_ms: dict[str, float] = field(default_factory=dict)
+    modules: set[str] = field(default_factory=set)
+
+    def slowest(self, count: int = 10) -> list[tuple[str, float]]:
+        return sorted(self.self_ms.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def parse_importtime(stderr: str, module: str) -> ImportProfile:
+    """Parses the `-X importtime` report, lines are `import time: self_us | cumulative_us | name`"""
+    profile = ImportProfile(total_ms=0.0)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line.removeprefix("import time:").split("|"))
+        profile.self_ms[name] = int(self_us) / 1000
+        profile.modules.add(name)
+        if name == module:
+            profile.total_ms = int(cumulative_us) / 1000
+    return profile
+
+
+def _child_env(cache_dir: str) -> dict[str, str]:
+    # fake credentials and a throwaway config/cache dir, nothing of the real user setup is read or written
+    return {
+        **os.environ,
+        "SPOTIPY_CLIENT_ID": "benchmark",
+        "SPOTIPY_CLIENT_SECRET": "benchmark",
+        "XDG_CONFIG_HOME": cache_dir,
+        "XDG_CACHE_HOME": cache_dir,
+        "PYTHONPATH": os.pathsep.join(filter(None, [os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                                                    os.environ.get("PYTHONPATH")])),
+    }
+
+
+def measure_imports(module: str = ENTRY_POINT_MODULE) -> ImportProfile:
+    with tempfile.TemporaryDirectory() as tmp:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, env=_child_env(tmp), check=True,
+        )
+    return parse_importtime(result.stderr, module)
+
+
+def measure_cold_start() -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        result = subprocess.run(
+            [sys.executable, "-c", _COLD_START_SCRIPT, tmp],
+            capture_output=True, text=True, env=_child_env(tmp), timeout=60,
+        )
+    if result.returncode:
+        raise RuntimeError(f"cold start failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and cold start of the spotify entry point")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=800.0)
+    parser.add_argument("--cold-start-budget-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    profiles = [measure_imports() for _ in range(args.runs)]
+    cold_starts = [measure_cold_start()["cold_start_ms"] for _ in range(args.runs)]
+    import_ms = statistics.median(profile.total_ms for profile in profiles)
+    cold_start_ms = statistics.median(cold_starts)
+
+    print(f"{'module':<48}{'self ms':>10}")
+    for name, self_ms in profiles[-1].slowest():
+        print(f"{name:<48}{self_ms:>10.1f}")
+    print()
+    print(f"import {ENTRY_POINT_MODULE}: {import_ms:.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"cold start to first paint: {cold_start_ms:.1f} ms (budget {args.cold_start_budget_ms:.0f} ms)")
+
+    failures = []
+    eager = sorted(
+        name for name in profiles[-1].modules
+        if any(name == deferred or name.startswith(f"{deferred}.") for deferred in DEFERRED_MODULES)
+    )
+    if eager:
+        failures.append(f"imported at startup but should be deferred: {', '.join(eager)}")
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import time {import_ms:.1f} ms is over budget")
+    if cold_start_ms > args.cold_start_budget_ms:
+        failures.append(f"cold start {cold_start_ms:.1f} ms is over budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
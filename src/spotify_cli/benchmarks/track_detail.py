@@ -0,0 +1,69 @@
+"""
+CPU time the TrackDetail widget spends on what the playback poll sends it: mostly the same track with another
+`is_playing`/device, a new track every few updates. Runs headless, covers are left out (they render off the loop).
+
+    python -m spotify_cli.benchmarks.track_detail --updates 500 --track-every 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from textual.app import App, ComposeResult
+
+from spotify_cli.app.widgets.track_details import TrackDetail
+from spotify_cli.benchmarks.simulator import SpotifySimulator, SimulatorConfig
+from spotify_cli.schemas.device import Device
+from spotify_cli.schemas.search import AlbumSearchItem
+from spotify_cli.schemas.track import Track
+
+
+class _TrackDetailApp(App):
+    def compose(self) -> ComposeResult:
+        yield TrackDetail()
+
+
+def _tracks(count: int) -> list[Track]:
+    with SpotifySimulator(SimulatorConfig(library_size=count)) as simulator:
+        device = Device(**simulator.player.devices[0])
+        albums = [AlbumSearchItem(**simulator.library.album(i)) for i in range(count)]
+    # no images, covers render off the loop and aren't what this measures
+    return [
+        Track(name=f"Track 1 of {album.name}", artist=album.artists[0].name,
+              album=album.model_copy(update={"images": []}), device=device, is_playing=True)
+        for album in albums
+    ]
+
+
+async def run(updates: int, track_every: int) -> tuple[float, float]:
+    app = _TrackDetailApp()
+    tracks = _tracks(updates // track_every + 1)
+    async with app.run_test(size=(120, 40)) as pilot:
+        detail = app.query_one(TrackDetail)
+        await pilot.pause()
+
+        cpu_started, wall_started = time.process_time(), time.perf_counter()
+        for n in range(updates):
+            detail.track = tracks[n // track_every].model_copy(update={"is_playing": n % 2 == 0})
+            # let the update (and any recompose) run like between two polls
+            await pilot.pause()
+        return (time.process_time() - cpu_started) * 1000, (time.perf_counter() - wall_started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure TrackDetail update cost")
+    parser.add_argument("--updates", type=int, default=500)
+    parser.add_argument("--track-every", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(args.updates, args.track_every)) for _ in range(args.runs)]
+    cpu_ms = statistics.median(cpu for cpu, _ in results)
+    wall_ms = statistics.median(wall for _, wall in results)
+    print(f"{args.updates} updates, new track every {args.track_every}")
+    print(f"cpu  {cpu_ms:8.1f} ms  ({cpu_ms / args.updates:.2f} ms per update)")
+    print(f"wall {wall_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
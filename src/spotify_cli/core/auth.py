@@ -1,10 +1,15 @@
+from typing import Optional
+
+from requests import Session
 from spotipy import SpotifyOAuth, Spotify, CacheFileHandler
 
 from spotify_cli.core.config import Config
 from spotify_cli.core.caching import get_spotipy_cache_path
 
 
-def get_spotify_client(cfg: Config) -> Spotify:
+def get_spotify_client(cfg: Config, session: Optional[Session] = None) -> Spotify:
+    # when a session is given both the api calls and the token refreshes share its connection pool
+    requests_session = session if session is not None else True
     auth = SpotifyOAuth(
         client_id=cfg.client_id,
         client_secret=cfg.client_secret,
@@ -13,7 +18,8 @@ def get_spotify_client(cfg: Config) -> Spotify:
         open_browser=True,
         cache_handler=CacheFileHandler(
             cache_path=get_spotipy_cache_path()
-        )
+        ),
+        requests_session=requests_session,
     )
     import spotipy
-    return spotipy.Spotify(auth_manager=auth)
\ No newline at end of file
+    return spotipy.Spotify(auth_manager=auth, requests_session=requests_session)
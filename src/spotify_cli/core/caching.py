@@ -1,23 +1,76 @@
+import gc
+import hashlib
 import json
 import os
 import tempfile
+import threading
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, Optional
 
 from platformdirs import user_cache_dir
 from pydantic import BaseModel
 
+from spotify_cli.core.codecs import JSON_CODEC, Codec, get_codec
+from spotify_cli.core.library_record import LibraryAlbum
+from spotify_cli.schemas.device import Device
+from spotify_cli.schemas.playback import PlaybackState
 from spotify_cli.schemas.search import AlbumSearchItem
 
 T = TypeVar("T")
 
 
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def eviction_target(limit: int) -> int:
+    """What a cache over `limit` evicts down to, below it so a full cache doesn't evict again on every put"""
+    return int(limit * 0.9)
+
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextmanager
+def _gc_paused():
+    # the collector is process wide and loads run on several threads, the first pause disables it and only the last
+    # one to finish turns it back on, and only when it was on to begin with
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
 class JsonCacheBase(ABC, Generic[T]):
     schema_version: int = 1
+    # how the body is written, any codec named in a file header can be read back
+    codec: Codec = JSON_CODEC
 
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, codec: Optional[Codec] = None):
         self.path = path
+        if codec is not None:
+            self.codec = codec
 
     @abstractmethod
     def default_payload(self) -> T:
@@ -39,10 +92,16 @@ class JsonCacheBase(ABC, Generic[T]):
     def load(self) -> T | None:
         if not self.path.exists():
             return None
+        # parsing and validating allocate a container per json object, with the collector running it rescans the
+        # growing payload over and over which costs more than the load itself
+        with _gc_paused():
+            return self._load()
+
+    def _load(self) -> T | None:
         try:
-            with self.path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (OSError, json.JSONDecodeError):
+            raw = self.path.read_bytes()
+            data = self._decode(raw)
+        except (OSError, ValueError):
             # catch corrupted files
             return None
 
@@ -55,13 +114,41 @@ class JsonCacheBase(ABC, Generic[T]):
 
         return self.from_json(data)
 
+    def _decode(self, raw: bytes) -> dict:
+        """
+        Files are read with the codec their header names, one written with another codec (or as plain json before
+        there was a header) loads like any other and is rewritten with `codec` on the next save
+        """
+        first_line, newline, body = raw.partition(b"\n")
+        header = json.loads(first_line) if newline else None
+        if not isinstance(header, dict) or "checksum" not in header:
+            return json.loads(raw)
+
+        codec = get_codec(header.get("codec", JSON_CODEC.name))
+        if header["checksum"] != self._checksum(body) and codec != JSON_CODEC:
+            # json that still parses is left to validation, a damaged binary body is just corrupted
+            raise ValueError("checksum mismatch")
+
+        data = codec.decode(body)
+        data["schema_version"] = header.get("schema_version", 0)
+        return data
+
+    @staticmethod
+    def _checksum(body: bytes) -> str:
+        return hashlib.blake2b(body, digest_size=16).hexdigest()
+
     def save(self, payload: T):
-        data = self.to_json(payload)
-        data["schema_version"] = self.schema_version
+        # a header line with the version, codec and a checksum of the body, then the encoded body
+        body = self.codec.encode(self.to_json(payload))
+        header = json.dumps({
+            "schema_version": self.schema_version,
+            "codec": self.codec.name,
+            "checksum": self._checksum(body),
+        })
 
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        with tempfile.NamedTemporaryFile("w", dir=self.path.parent, delete=False, encoding="utf-8") as temp:
-            json.dump(data, temp, ensure_ascii=False)
+        with tempfile.NamedTemporaryFile("wb", dir=self.path.parent, delete=False) as temp:
+            temp.write(header.encode("utf-8") + b"\n" + body)
             temp.flush()
             os.fsync(temp.fileno())
             temp_name = temp.name
@@ -115,6 +202,124 @@ def get_saved_albums_cache_path() -> Path:
     return Path(user_cache_dir("spotify-cli")) / "saved_albums.json"
 
 
+class SessionSnapshotModel(BaseModel):
+    """Last known state of the session, enough for the main screen to paint before any request"""
+    playback: Optional[PlaybackState] = None
+    device: Optional[Device] = None
+    library_head: list[LibraryAlbum] = []
+    saved_ts: float = 0.0
+
+
+class SessionSnapshotCache(JsonCacheBase[SessionSnapshotModel]):
+    schema_version = 2
+
+    def default_payload(self) -> SessionSnapshotModel:
+        return SessionSnapshotModel()
+
+    def from_json(self, data: dict) -> SessionSnapshotModel:
+        return SessionSnapshotModel.model_validate(data)
+
+    def to_json(self, payload: SessionSnapshotModel) -> dict:
+        return payload.model_dump()
+
+    def migrate(self, data: dict) -> dict:
+        # a snapshot is only a head start, an unknown version is dropped and rebuilt by the next requests
+        return {}
+
+
+def get_session_snapshot_path() -> Path:
+    return Path(user_cache_dir("spotify-cli")) / "session.json"
+
+
+class ImageBytesCache:
+    """
+    Content addressed on-disk byte store for downloaded images, keyed by the sha256 of the image url.
+    When the store grows over `max_bytes` the least recently used files are evicted.
+    """
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, root: Path, max_bytes: int = MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, url: str) -> Path:
+        key = self.key(url)
+        return self.root / key[:2] / key
+
+    def get(self, url: str) -> bytes | None:
+        path = self._path(url)
+        try:
+            data = path.read_bytes()
+            # bump mtime so eviction is least recently *used*, not least recently written
+            os.utime(path)
+        except OSError:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return data
+
+    def put(self, url: str, data: bytes):
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=path.parent, delete=False) as temp:
+            temp.write(data)
+            temp_name = temp.name
+        os.replace(temp_name, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._total_bytes += len(data)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> list[tuple[Path, int, float]]:
+        entries = []
+        for file in self.root.glob("*/*"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            entries.append((file, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = eviction_target(self.max_bytes)
+        for file, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                file.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._total_bytes = total
+
+    def invalidate(self):
+        with self._lock:
+            for file, _, _ in self._entries():
+                try:
+                    file.unlink()
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+
+def get_album_art_cache_path() -> Path:
+    return Path(user_cache_dir("spotify-cli")) / "album_art"
+
+
 class SpotipyTokenModel(BaseModel):
     access_token: str
     token_type: str
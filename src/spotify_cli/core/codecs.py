@@ -0,0 +1,95 @@
+import json
+import marshal
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+
+@dataclass(frozen=True)
+class Serializer:
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+@dataclass(frozen=True)
+class Compressor:
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+JSON = Serializer(
+    "json",
+    lambda data: json.dumps(data, ensure_ascii=False).encode("utf-8"),
+    json.loads,
+)
+# marshal is the c serializer behind .pyc files, several times faster than json for plain dicts/lists/strs/ints.
+# its format belongs to the interpreter, the version is part of the name so a file from another format version
+# reads as an unknown codec (a cache miss) instead of being misread
+MARSHAL = Serializer(f"marshal{marshal.version}", marshal.dumps, marshal.loads)
+
+SERIALIZERS = {serializer.name: serializer for serializer in (JSON, MARSHAL)}
+COMPRESSORS = {"zlib": Compressor("zlib", lambda body: zlib.compress(body, 1), zlib.decompress)}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = Compressor(
+        "zstd",
+        zstandard.ZstdCompressor(level=3).compress,
+        lambda body: zstandard.ZstdDecompressor().decompress(body),
+    )
+if lz4 is not None:
+    COMPRESSORS["lz4"] = Compressor("lz4", lz4.frame.compress, lz4.frame.decompress)
+
+
+@dataclass(frozen=True)
+class Codec:
+    """How a cache body is encoded on disk, recorded in the file header as e.g. `marshal4+zstd`"""
+    serializer: Serializer
+    compressor: Optional[Compressor] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.serializer.name}+{self.compressor.name}" if self.compressor else self.serializer.name
+
+    def encode(self, data) -> bytes:
+        body = self.serializer.dumps(data)
+        return self.compressor.compress(body) if self.compressor else body
+
+    def decode(self, body: bytes):
+        try:
+            if self.compressor:
+                body = self.compressor.decompress(body)
+            return self.serializer.loads(body)
+        except ValueError:
+            raise
+        except Exception as e:
+            # zlib.error, EOFError from marshal, ... are all a corrupted body to the caller
+            raise ValueError(f"can't decode {self.name} body") from e
+
+
+JSON_CODEC = Codec(JSON)
+
+
+def get_codec(name: str) -> Codec:
+    """The codec a header names, ValueError when it is unknown or its compression library isn't installed"""
+    serializer_name, _, compressor_name = name.partition("+")
+    if serializer_name not in SERIALIZERS or (compressor_name and compressor_name not in COMPRESSORS):
+        raise ValueError(f"unsupported cache codec: {name}")
+    return Codec(SERIALIZERS[serializer_name], COMPRESSORS[compressor_name] if compressor_name else None)
+
+
+def binary_codec() -> Codec:
+    """marshal with the fastest compression installed, zstd or lz4 from the `compression` extra, zlib otherwise"""
+    for name in ("zstd", "lz4", "zlib"):
+        if name in COMPRESSORS:
+            return Codec(MARSHAL, COMPRESSORS[name])
@@ -0,0 +1,57 @@
+import threading
+import time
+from typing import Optional
+
+from spotify_cli.core.caching import CacheStats
+from spotify_cli.schemas.device import Device
+
+
+class DeviceRegistry:
+    """
+    Short lived cache of the device list.
+    Devices come and go outside the app so entries expire quickly, but our own playback commands update it in
+    place (the device we played on becomes the active one) instead of forcing a refetch.
+    """
+    TTL_SEC = 10.0
+
+    def __init__(self, ttl_sec: float = TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self.stats = CacheStats()
+        self._devices: list[Device] | None = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[list[Device]]:
+        """The devices if fetched within the ttl, None when they need fetching"""
+        with self._lock:
+            if self._devices is not None and time.monotonic() - self._fetched_at <= self.ttl_sec:
+                self.stats.hits += 1
+                return list(self._devices)
+            self.stats.misses += 1
+            return None
+
+    def peek(self) -> Optional[list[Device]]:
+        """The last known devices regardless of age, for showing something while they are refreshed"""
+        with self._lock:
+            return list(self._devices) if self._devices is not None else None
+
+    def put(self, devices: list[Device]):
+        with self._lock:
+            self._devices = list(devices)
+            self._fetched_at = time.monotonic()
+
+    def set_active(self, device_id: str):
+        with self._lock:
+            if self._devices is None:
+                return
+            if not any(device.id == device_id for device in self._devices):
+                # a device we haven't seen yet, the next read has to fetch it
+                self._devices = None
+                return
+            self._devices = [
+                device.model_copy(update={"is_active": device.id == device_id}) for device in self._devices
+            ]
+
+    def invalidate(self):
+        with self._lock:
+            self._devices = None
@@ -0,0 +1,179 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Iterable, NamedTuple, Optional
+
+from spotify_cli.core.caching import JsonCacheBase
+from spotify_cli.core.codecs import binary_codec
+from spotify_cli.core.library_record import LibraryAlbum
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """casefold, strip accents and collapse everything that isn't a letter or digit to single spaces"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", stripped).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class IndexedAlbum(NamedTuple):
+    id: str
+    uri: str
+    name: str
+    artists: str
+    added_at: str
+    # normalized " name artists " with padding so word starts are their own trigrams
+    text: str
+
+
+class LibraryIndex:
+    """
+    In-memory trigram index over album and artist names of the library.
+    Queries intersect the postings of the query trigrams (smallest first) and verify the candidates, which
+    keeps lookups well under a millisecond for tens of thousands of albums. When nothing matches exactly
+    the candidates sharing most of the query trigrams are returned instead, so small typos still match.
+    """
+    MIN_QUERY_LENGTH = 2
+    # share of the query trigrams a fuzzy match needs
+    FUZZY_THRESHOLD = 0.5
+
+    def __init__(self):
+        self._docs: list[IndexedAlbum | None] = []
+        self._doc_ids: dict[str, int] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def album_ids(self) -> set[str]:
+        with self._lock:
+            return set(self._doc_ids)
+
+    # region #### Updates ####
+    def add(self, albums: Iterable[LibraryAlbum]):
+        with self._lock:
+            for album in albums:
+                artists = album.get_albums_artists()
+                self._add_doc(IndexedAlbum(
+                    id=album.id,
+                    uri=album.uri,
+                    name=album.name,
+                    artists=artists,
+                    added_at=album.added_at,
+                    text=f" {normalize(album.name)} {normalize(artists)} ",
+                ))
+
+    def _add_doc(self, doc: IndexedAlbum):
+        if doc.id in self._doc_ids:
+            self._remove_doc(doc.id)
+
+        doc_id = len(self._docs)
+        self._docs.append(doc)
+        self._doc_ids[doc.id] = doc_id
+        for gram in trigrams(doc.text):
+            self._postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, album_ids: Iterable[str]):
+        with self._lock:
+            for album_id in album_ids:
+                self._remove_doc(album_id)
+
+    def _remove_doc(self, album_id: str):
+        doc_id = self._doc_ids.pop(album_id, None)
+        if doc_id is None:
+            return
+
+        for gram in trigrams(self._docs[doc_id].text):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[gram]
+        # tombstone, ids are compacted when the index is saved
+        self._docs[doc_id] = None
+
+    # endregion
+
+    # region #### Queries ####
+    def search(self, query: str, limit: Optional[int] = None) -> list[IndexedAlbum]:
+        """Matching albums, name prefix matches first then newest added first"""
+        q = normalize(query)
+        if len(q) < self.MIN_QUERY_LENGTH:
+            return []
+
+        # two letters are only matched at a word start, longer queries anywhere
+        grams = trigrams(f" {q}") if len(q) < 3 else trigrams(q)
+
+        with self._lock:
+            postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:]) if postings else set()
+            matches = [doc for doc in (self._docs[i] for i in candidates) if q in doc.text]
+
+            if not matches and len(grams) > 2:
+                matches = self._fuzzy(grams)
+
+        def rank(doc: IndexedAlbum):
+            return doc.text.startswith(f" {q}"), f" {q}" in doc.text, doc.added_at
+
+        if limit is None:
+            return sorted(matches, key=rank, reverse=True)
+        return heapq.nlargest(limit, matches, key=rank)
+
+    def _fuzzy(self, grams: set[str]) -> list[IndexedAlbum]:
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, ()))
+
+        needed = math.ceil(len(grams) * self.FUZZY_THRESHOLD)
+        return [self._docs[doc_id] for doc_id, count in counts.items() if count >= needed]
+
+    # endregion
+
+    # region #### Persistence ####
+    def to_json(self) -> dict:
+        with self._lock:
+            docs = [doc for doc in self._docs if doc is not None]
+            compacted = {doc.id: new_id for new_id, doc in enumerate(docs)}
+            postings = {
+                gram: sorted(compacted[self._docs[doc_id].id] for doc_id in posting)
+                for gram, posting in self._postings.items()
+            }
+        return {"docs": [list(doc) for doc in docs], "postings": postings}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "LibraryIndex":
+        index = cls()
+        index._docs = [IndexedAlbum(*doc) for doc in data.get("docs", [])]
+        index._doc_ids = {doc.id: doc_id for doc_id, doc in enumerate(index._docs)}
+        index._postings = {gram: set(posting) for gram, posting in data.get("postings", {}).items()}
+        return index
+
+    # endregion
+
+
+class LibraryIndexCache(JsonCacheBase[LibraryIndex]):
+    schema_version = 1
+    # the biggest cache and loaded on the first filter, marshal + compression loads faster at a quarter of the size
+    codec = binary_codec()
+
+    def default_payload(self) -> LibraryIndex:
+        return LibraryIndex()
+
+    def from_json(self, data: dict) -> LibraryIndex:
+        return LibraryIndex.from_json(data)
+
+    def to_json(self, payload: LibraryIndex) -> dict:
+        return payload.to_json()
+
+    def migrate(self, data: dict) -> dict:
+        # nothing older to upgrade from, an unknown version is rebuilt from the library store
+        return {"docs": [], "postings": {}}
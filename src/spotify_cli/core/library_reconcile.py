@@ -0,0 +1,216 @@
+import itertools
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+from spotify_cli.core.library_record import LibraryAlbum
+
+PAGE_SIZE = 50
+# the most ids a saved albums contains check takes at once
+CONTAINS_BATCH = 20
+
+
+@dataclass
+class ReconcileResult:
+    # confirmed not saved anymore
+    removed: list[str] = field(default_factory=list)
+    # found upstream at a position the store didn't have them at, new or saved again
+    upserts: list[LibraryAlbum] = field(default_factory=list)
+    # (id, added_at) of the saved albums the store skips, to line the next run's local order up with upstream
+    unstored: list[tuple[str, str]] = field(default_factory=list)
+    page_requests: int = 0
+    contains_requests: int = 0
+    divergences: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.removed or self.upserts)
+
+
+class LibraryReconciler:
+    """
+    Finds what changed between the local library and the user library upstream without reading all of it.
+    Pages are compared by their fingerprint, the added_at of every position and the album ids in order - except
+    between albums that share an added_at, which upstream and the store order differently: a page is widened to the
+    whole runs of those at its ends, across pages if they span more, and the albums of a run are compared as a set.
+    A few sampled pages (always the first unchecked one and the last) are compared and when one differs the first
+    differing page is found by bisecting between the last page that matched and it. Inside that page the first
+    differing album tells what happened:
+    - a local album isn't shown upstream and isn't saved anymore: it, and the ones around it that aren't either, were
+      removed
+    - the upstream album is stored further down: it was saved again, it moves up
+    - the upstream album isn't stored at all: it is new
+    after which the local order matches up to there and the search continues from that page.
+    Each change costs ~log2(pages) page requests instead of a full sync, pages are fetched at most once.
+    """
+    SAMPLE_PAGES = 4
+    MAX_DIVERGENCES = 100
+
+    def __init__(self, local: list[tuple[str, str]],
+                 fetch_page: Callable[[int], dict],
+                 contains: Callable[[list[str]], list[bool]],
+                 to_record: Callable[[dict], Optional[LibraryAlbum]],
+                 unstored: Iterable[tuple[str, str]] = (),
+                 rng: Optional[random.Random] = None):
+        """
+        `local` the (id, added_at) of the stored albums in the store order (newest added first),
+        `fetch_page(offset)` a saved albums page, `contains(ids)` whether each id is still saved,
+        `to_record(item)` the record to store for a saved albums item, None for the ones the library sync skips, and
+        `unstored` the skipped ones a previous run found, they hold a position upstream the store doesn't know about
+        """
+        self._unstored = dict(unstored)
+        local = _store_order([*local, *self._unstored.items()])
+        self.local = [album_id for album_id, _ in local]
+        self._added_at = dict(local)
+        self._fetch_page = fetch_page
+        self._contains = contains
+        self._to_record = to_record
+        self._rng = rng or random.Random()
+        self._pages: dict[int, list[dict]] = {}
+        # the fetched items by album id
+        self._items: dict[str, dict] = {}
+        self._total: int | None = None
+        self._upserts: dict[str, LibraryAlbum] = {}
+        self.result = ReconcileResult()
+
+    def run(self) -> ReconcileResult:
+        start = 0
+        while self.result.divergences < self.MAX_DIVERGENCES:
+            page = self._first_divergent_page(start)
+            if page is None:
+                break
+            self.result.divergences += 1
+            if not self._resolve(page):
+                break
+            start = page
+
+        self.result.upserts = list(self._upserts.values())
+        self.result.unstored = [(album_id, self._added_at[album_id]) for album_id in self.local
+                                if album_id in self._unstored]
+        return self.result
+
+    # region #### Pages ####
+    def _page(self, page: int) -> list[dict]:
+        if page not in self._pages:
+            data = self._fetch_page(page * PAGE_SIZE)
+            self.result.page_requests += 1
+            self._pages[page] = data.get("items", [])
+            self._items.update((item["album"]["id"], item) for item in self._pages[page])
+            self._total = data.get("total", self._total)
+        return self._pages[page]
+
+    def _window(self, page: int) -> tuple[int, list[tuple[str, str]], list[tuple[str, str]]]:
+        """
+        The first position and the (id, added_at) of the upstream and the local albums compared for `page`, its
+        positions widened on both ends to whole runs of albums sharing an added_at, a run can span several pages.
+        Upstream orders a run its own way, on both sides the albums of a run are by id
+        """
+        end = max(self._total or 0, len(self.local))
+        low, high = page * PAGE_SIZE, min((page + 1) * PAGE_SIZE, end)
+        while 0 < low < len(self.local) and self._same_run(low - 1):
+            low -= 1
+        while 0 < high < len(self.local) and self._same_run(high - 1):
+            high += 1
+
+        upstream = []
+        for upstream_page in range(low // PAGE_SIZE, math.ceil(high / PAGE_SIZE)):
+            offset = upstream_page * PAGE_SIZE
+            items = self._page(upstream_page)[max(low - offset, 0):high - offset]
+            upstream += [(item["album"]["id"], item["added_at"]) for item in items]
+        local = [(album_id, self._added_at[album_id]) for album_id in self.local[low:high]]
+        return low, _runs_by_id(upstream), _runs_by_id(local)
+
+    def _same_run(self, position: int) -> bool:
+        """Whether the local albums at `position` and the one after it share an added_at"""
+        return self._added_at[self.local[position]] == self._added_at[self.local[position + 1]]
+
+    def _matches(self, page: int) -> bool:
+        _, upstream, local = self._window(page)
+        return upstream == local
+
+    def _page_count(self) -> int:
+        if self._total is None:
+            # the first page carries the total
+            self._page(0)
+        return max(math.ceil(max(self._total or 0, len(self.local)) / PAGE_SIZE), 1)
+
+    # endregion
+
+    def _first_divergent_page(self, start: int) -> int | None:
+        last = self._page_count() - 1
+        middle = range(start + 1, last)
+        samples = sorted({start, last, *self._rng.sample(middle, min(self.SAMPLE_PAGES, len(middle)))})
+
+        matched = start - 1
+        for page in samples:
+            if not self._matches(page):
+                break
+            matched = page
+        else:
+            return None
+
+        # the pages between the last sample that matched and the first that didn't
+        low, high = matched + 1, page
+        while low < high:
+            middle_page = (low + high) // 2
+            if self._matches(middle_page):
+                low = middle_page + 1
+            else:
+                high = middle_page
+        return low
+
+    def _resolve(self, page: int) -> bool:
+        """Fixes the first difference in `page`, False when it can't be explained (the library changed meanwhile)"""
+        low, upstream, local = self._window(page)
+        index = next((i for i, (shown, stored) in enumerate(zip(upstream, local)) if shown != stored),
+                     min(len(upstream), len(local)))
+
+        shown = set(upstream)
+        if index < len(local) and local[index] not in shown:
+            # upstream doesn't show the local album, nor maybe some of the ones after it
+            missing = [album_id for album_id, added_at in local[index:] if (album_id, added_at) not in shown]
+            missing = missing[:CONTAINS_BATCH]
+            unsaved = [album_id for album_id, saved in zip(missing, self._saved(missing)) if not saved]
+            if unsaved:
+                self._remove(unsaved)
+                return True
+        if index >= len(upstream):
+            return False
+
+        album_id, added_at = upstream[index]
+        item = self._items[album_id]
+        if album_id in self.local:
+            # saved again, it has a newer added_at now and was stored after the position
+            self.local.remove(album_id)
+        self.local.insert(low + index, album_id)
+        self._added_at[album_id] = added_at
+        record = self._to_record(item)
+        if record is not None:
+            self._upserts[album_id] = record
+        else:
+            self._unstored[album_id] = added_at
+        return True
+
+    def _saved(self, album_ids: list[str]) -> list[bool]:
+        self.result.contains_requests += 1
+        return self._contains(album_ids)
+
+    def _remove(self, album_ids: list[str]):
+        for album_id in album_ids:
+            self.local.remove(album_id)
+            self._upserts.pop(album_id, None)
+            # skipped by the store, there is nothing to delete
+            if self._unstored.pop(album_id, None) is None:
+                self.result.removed.append(album_id)
+
+
+def _store_order(albums: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """(id, added_at) of albums in the store order, added_at descending then id"""
+    # the second sort keeps the id order of equal added_at
+    return sorted(sorted(albums), key=lambda album: album[1], reverse=True)
+
+
+def _runs_by_id(albums: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """(id, added_at) of albums in their order, the albums sharing an added_at next to each other by id"""
+    return [album for _, run in itertools.groupby(albums, key=lambda album: album[1]) for album in sorted(run)]
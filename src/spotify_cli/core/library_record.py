@@ -0,0 +1,114 @@
+import sys
+from typing import Iterable, NamedTuple, Optional
+
+from spotify_cli.schemas.images import SpotifyImage
+from spotify_cli.schemas.search import AlbumSearchItem, ArtistSearchItem
+
+# a market code is two letters, bit (first - A) * 26 + (second - A) of the mask is set when the album is available
+# there. every code has a fixed bit so masks stored on disk never need a lookup table that could go out of date
+MARKET_BITS = 26 * 26
+MARKET_BYTES = (MARKET_BITS + 7) // 8
+
+_ARTISTS: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+
+def market_bit(market: str) -> int:
+    """Mask with only the bit of `market` set, 0 for anything that isn't a two letter code"""
+    code = market.upper()
+    if len(code) != 2 or not ("A" <= code[0] <= "Z" and "A" <= code[1] <= "Z"):
+        return 0
+    return 1 << ((ord(code[0]) - 65) * 26 + ord(code[1]) - 65)
+
+
+def market_mask(markets: Iterable[str]) -> int:
+    mask = 0
+    for market in markets:
+        mask |= market_bit(market)
+    return mask
+
+
+def decode_markets(mask: int) -> list[str]:
+    markets = []
+    while mask:
+        low = mask & -mask
+        first, second = divmod(low.bit_length() - 1, 26)
+        markets.append(chr(65 + first) + chr(65 + second))
+        mask ^= low
+    return markets
+
+
+def intern_artists(names: Iterable[str]) -> tuple[str, ...]:
+    """Shared tuple of interned names, a library has a lot more albums than artists"""
+    names = tuple(sys.intern(name) for name in names)
+    return _ARTISTS.setdefault(names, names)
+
+
+class LibraryAlbum(NamedTuple):
+    """
+    Compact record of a saved album, only what the library ui, the index and playback need.
+    A tuple has no per instance dict, artist names are shared between albums and the ~185 market codes of an album
+    are a single int (see `market_mask`), so a record is a fraction of the size of the `AlbumSearchItem` it came from.
+    """
+    id: str
+    uri: str
+    name: str
+    artists: tuple[str, ...]
+    artist_ids: tuple[str, ...]
+    album_type: str
+    total_tracks: int
+    release_date: str
+    # smallest image, album art is square
+    image_url: Optional[str]
+    image_size: int
+    markets: int
+    added_at: str
+
+    @classmethod
+    def from_album(cls, album: AlbumSearchItem, added_at: str) -> "LibraryAlbum":
+        image = album.get_album_image()
+        return cls(
+            id=album.id,
+            uri=album.uri,
+            name=album.name,
+            artists=intern_artists(artist.name for artist in album.artists),
+            artist_ids=intern_artists(artist.id for artist in album.artists),
+            album_type=sys.intern(album.album_type),
+            total_tracks=album.total_tracks,
+            release_date=album.release_date,
+            image_url=image.url if image else None,
+            image_size=image.height if image else 0,
+            markets=market_mask(album.available_markets),
+            added_at=added_at,
+        )
+
+    def get_albums_artists(self) -> str:
+        return ", ".join(self.artists)
+
+    def is_playable_in(self, market: str) -> bool:
+        return bool(self.markets & market_bit(market))
+
+    def to_album(self) -> AlbumSearchItem:
+        """The full api model, for code that shows or plays the album like a search result"""
+        return AlbumSearchItem(
+            album_type=self.album_type,
+            total_tracks=self.total_tracks,
+            available_markets=decode_markets(self.markets),
+            href=f"https://api.spotify.com/v1/albums/{self.id}",
+            id=self.id,
+            images=[SpotifyImage(url=self.image_url, height=self.image_size, width=self.image_size)]
+            if self.image_url else [],
+            name=self.name,
+            release_date=self.release_date,
+            type="album",
+            uri=self.uri,
+            artists=[
+                ArtistSearchItem(
+                    href=f"https://api.spotify.com/v1/artists/{artist_id}",
+                    id=artist_id,
+                    name=name,
+                    type="artist",
+                    uri=f"spotify:artist:{artist_id}",
+                )
+                for name, artist_id in zip(self.artists, self.artist_ids)
+            ],
+        )
@@ -0,0 +1,280 @@
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from platformdirs import user_cache_dir
+
+from spotify_cli.core.caching import SavedAlbumsCache, get_saved_albums_cache_path
+from spotify_cli.core.library_record import MARKET_BYTES, LibraryAlbum, intern_artists
+from spotify_cli.schemas.search import AlbumSearchItem
+
+
+# artist names and ids are joined with the ascii unit separator, unlike ", " it can't be part of a name
+_SEPARATOR = "\x1f"
+_ALBUM_COLUMNS = """
+    id TEXT PRIMARY KEY,
+    added_at TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    name TEXT NOT NULL,
+    uri TEXT NOT NULL,
+    artists TEXT NOT NULL,
+    artist_ids TEXT NOT NULL,
+    album_type TEXT NOT NULL,
+    total_tracks INTEGER NOT NULL,
+    release_date TEXT NOT NULL,
+    image_url TEXT,
+    image_size INTEGER NOT NULL,
+    markets BLOB NOT NULL
+"""
+_INSERT_ALBUM = (
+    "INSERT INTO {table} (id, added_at, artist, name, uri, artists, artist_ids, album_type, total_tracks, "
+    "release_date, image_url, image_size, markets) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET added_at = excluded.added_at, artist = excluded.artist, name = excluded.name, "
+    "uri = excluded.uri, artists = excluded.artists, artist_ids = excluded.artist_ids, "
+    "album_type = excluded.album_type, total_tracks = excluded.total_tracks, release_date = excluded.release_date, "
+    "image_url = excluded.image_url, image_size = excluded.image_size, markets = excluded.markets"
+)
+_RECORD_COLUMNS = ("id, added_at, name, uri, artists, artist_ids, album_type, total_tracks, release_date, image_url, "
+                   "image_size, markets")
+
+
+class LibraryStore:
+    """
+    Indexed sqlite store for the saved albums library.
+    Rows are keyed by album id, so a refresh only writes the entries that changed and metadata like
+    `updated_ts` is a single row update instead of rewriting the whole library.
+    Albums are stored and read back as `LibraryAlbum` records, markets as a fixed width bitset blob.
+    """
+    schema_version = 2
+
+    def __init__(self, path: Path, legacy_cache: Optional[SavedAlbumsCache] = None):
+        self.path = path
+        self.legacy_cache = legacy_cache
+        self._conn: sqlite3.Connection | None = None
+        # one connection shared by the transport threads, sqlite serializes writes anyway
+        self._lock = threading.RLock()
+
+    # region #### Connection ####
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate(conn)
+        self._conn = conn
+        self._import_legacy_cache()
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        if version < 1:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS albums (
+                    id TEXT PRIMARY KEY,
+                    added_at TEXT NOT NULL,
+                    artist TEXT NOT NULL,
+                    album TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+        if version < 2:
+            self._migrate_to_records(conn)
+
+        conn.execute(f"PRAGMA user_version = {self.schema_version}")
+
+    def _migrate_to_records(self, conn: sqlite3.Connection):
+        """v2 stores the compact record fields in columns instead of the whole album as json"""
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f"CREATE TABLE albums_v2 ({_ALBUM_COLUMNS})")
+            cursor = conn.execute("SELECT added_at, album FROM albums")
+            migrated = 0
+            while rows := cursor.fetchmany(500):
+                conn.executemany(_INSERT_ALBUM.format(table="albums_v2"), [
+                    self._to_row(LibraryAlbum.from_album(AlbumSearchItem.model_validate_json(album), added_at))
+                    for added_at, album in rows
+                ])
+                migrated += len(rows)
+            # one statement at a time, executescript would commit the open transaction first
+            conn.execute("DROP TABLE albums")
+            conn.execute("ALTER TABLE albums_v2 RENAME TO albums")
+            conn.execute("CREATE INDEX albums_added_at ON albums (added_at DESC, id)")
+            conn.execute("CREATE INDEX albums_artist ON albums (artist COLLATE NOCASE)")
+            conn.execute("PRAGMA user_version = 2")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        if migrated:
+            # hand the space of the json rows back to the file system
+            conn.execute("VACUUM")
+
+    def _import_legacy_cache(self):
+        """One time move of the old saved_albums.json into the store"""
+        if self.legacy_cache is None or not self.legacy_cache.path.exists():
+            return
+
+        model = self.legacy_cache.load()
+        if model is not None and self.count() == 0:
+            self.apply(
+                upserts=[LibraryAlbum.from_album(entry.album, entry.added_at) for entry in model.entries],
+                meta={"latest_added_at": model.latest_added_at, "updated_ts": model.updated_ts},
+            )
+        self.legacy_cache.invalidate()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # endregion
+
+    # region #### Writes ####
+    def apply(self, upserts: list[LibraryAlbum] = (), deletes: list[str] = (), meta: Optional[dict] = None):
+        """Upserts/deletes entries and updates metadata in a single transaction"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                if upserts:
+                    conn.executemany(_INSERT_ALBUM.format(table="albums"), [self._to_row(album) for album in upserts])
+                if deletes:
+                    conn.executemany("DELETE FROM albums WHERE id = ?", [(album_id,) for album_id in deletes])
+                for key, value in (meta or {}).items():
+                    conn.execute(
+                        "INSERT INTO meta (key, value) VALUES (?, ?) "
+                        "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                        (key, json.dumps(value)),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def upsert(self, albums: list[LibraryAlbum]):
+        self.apply(upserts=albums)
+
+    def delete(self, album_ids: list[str]):
+        self.apply(deletes=album_ids)
+
+    def set_meta(self, key: str, value):
+        self.apply(meta={key: value})
+
+    def invalidate(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM albums")
+            conn.execute("DELETE FROM meta")
+            conn.execute("COMMIT")
+
+    # endregion
+
+    # region #### Reads ####
+    def get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM albums").fetchone()[0]
+
+    def album_ids(self) -> set[str]:
+        with self._lock:
+            return {row[0] for row in self._connect().execute("SELECT id FROM albums")}
+
+    def ordered_album_keys(self) -> list[tuple[str, str]]:
+        """(id, added_at) of every album in the library order, newest added first"""
+        with self._lock:
+            return self._connect().execute("SELECT id, added_at FROM albums ORDER BY added_at DESC, id").fetchall()
+
+    def albums(self, offset: int = 0, limit: Optional[int] = None) -> list[LibraryAlbum]:
+        """Albums newest added first, `limit` None reads to the end"""
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {_RECORD_COLUMNS} FROM albums ORDER BY added_at DESC, id LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def get_albums(self, album_ids: Iterable[str]) -> list[LibraryAlbum]:
+        album_ids = list(album_ids)
+        rows = []
+        with self._lock:
+            conn = self._connect()
+            # stay under sqlite's bound parameters limit
+            for start in range(0, len(album_ids), 500):
+                chunk = album_ids[start:start + 500]
+                rows += conn.execute(
+                    f"SELECT {_RECORD_COLUMNS} FROM albums WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def iter_pages(self, page_size: int = 200) -> Iterator[list[LibraryAlbum]]:
+        offset = 0
+        while True:
+            page = self.albums(offset=offset, limit=page_size)
+            if not page:
+                return
+            yield page
+            offset += len(page)
+
+    def albums_by_artist(self, artist: str) -> list[LibraryAlbum]:
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {_RECORD_COLUMNS} FROM albums WHERE artist = ? COLLATE NOCASE ORDER BY added_at DESC",
+                (artist,),
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    # endregion
+
+    @staticmethod
+    def _to_row(album: LibraryAlbum) -> tuple:
+        return (
+            album.id, album.added_at, album.get_albums_artists(), album.name, album.uri,
+            _SEPARATOR.join(album.artists), _SEPARATOR.join(album.artist_ids), album.album_type, album.total_tracks,
+            album.release_date, album.image_url, album.image_size, album.markets.to_bytes(MARKET_BYTES, "little"),
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> LibraryAlbum:
+        (album_id, added_at, name, uri, artists, artist_ids, album_type, total_tracks, release_date, image_url,
+         image_size, markets) = row
+        return LibraryAlbum(
+            id=album_id,
+            uri=uri,
+            name=name,
+            artists=intern_artists(artists.split(_SEPARATOR)),
+            artist_ids=intern_artists(artist_ids.split(_SEPARATOR)),
+            album_type=sys.intern(album_type),
+            total_tracks=total_tracks,
+            release_date=release_date,
+            image_url=image_url,
+            image_size=image_size,
+            markets=int.from_bytes(markets, "little"),
+            added_at=added_at,
+        )
+
+
+def get_library_store_path() -> Path:
+    return Path(user_cache_dir("spotify-cli")) / "library.sqlite3"
+
+
+def get_library_store() -> LibraryStore:
+    return LibraryStore(get_library_store_path(), legacy_cache=SavedAlbumsCache(get_saved_albums_cache_path()))
@@ -0,0 +1,147 @@
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+from spotify_cli.core.caching import CacheStats
+
+
+def get_endpoint_name(method: str, url: str) -> str:
+    """`GET albums/{id}/tracks` for any album, ids are replaced so every call of an endpoint lands in one entry"""
+    path = urlsplit(url).path
+    path = path.split("/v1/", 1)[1] if "/v1/" in path else path.lstrip("/")
+    segments = ["{id}" if _is_id(segment) else segment for segment in path.strip("/").split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+def _is_id(segment: str) -> bool:
+    # spotify ids are 22 base62 characters
+    return segment.isdigit() or (len(segment) == 22 and segment.isalnum())
+
+
+class LatencyHistogram:
+    """
+    Latencies in log spaced buckets, each `GROWTH` times wider than the one before, so percentiles of any number of
+    calls cost the same fixed memory. A percentile is the upper bound of its bucket, at most `GROWTH - 1` over.
+    """
+    MIN_MS = 1.0
+    GROWTH = 1.2
+    BUCKETS = 64
+
+    def __init__(self):
+        self.counts = [0] * (self.BUCKETS + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def _bucket(self, ms: float) -> int:
+        if ms <= self.MIN_MS:
+            return 0
+        return min(math.ceil(math.log(ms / self.MIN_MS, self.GROWTH)), self.BUCKETS)
+
+    def add(self, ms: float):
+        self.counts[self._bucket(ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(self.count * q), 1)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.MIN_MS * self.GROWTH ** bucket, self.max_ms)
+        return self.max_ms
+
+
+@dataclass
+class EndpointMetrics:
+    count: int = 0
+    # failed requests, status >= 400 other than 429 or no response at all
+    errors: int = 0
+    throttled: int = 0
+    bytes: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def to_json(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "bytes": self.bytes,
+            "total_ms": round(self.latency.total_ms, 1),
+            "p50_ms": round(self.latency.percentile(0.5), 1),
+            "p95_ms": round(self.latency.percentile(0.95), 1),
+            "p99_ms": round(self.latency.percentile(0.99), 1),
+            "max_ms": round(self.latency.max_ms, 1),
+        }
+
+
+class ApiMetrics:
+    """
+    What every spotify request cost, per endpoint: calls, errors, 429s, response bytes and latency percentiles.
+    Every attempt is recorded on its own, a 429 retried by the session counts twice. The hit ratios of the local
+    caches are kept next to them, registered with `add_cache`, to see which requests they saved.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.caches: dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, url: str, elapsed_ms: float, status: Optional[int], size: int = 0):
+        """One attempt, `status` None when it failed without a response"""
+        name = get_endpoint_name(method, url)
+        with self._lock:
+            endpoint = self.endpoints.setdefault(name, EndpointMetrics())
+            endpoint.count += 1
+            endpoint.bytes += size
+            endpoint.latency.add(elapsed_ms)
+            if status == 429:
+                endpoint.throttled += 1
+            elif status is None or status >= 400:
+                endpoint.errors += 1
+
+    def add_cache(self, name: str, stats: CacheStats):
+        with self._lock:
+            self.caches[name] = stats
+
+    def to_json(self) -> dict:
+        with self._lock:
+            endpoints = {name: endpoint.to_json() for name, endpoint in self.endpoints.items()}
+            caches = {
+                name: {"hits": stats.hits, "misses": stats.misses, "hit_ratio": round(stats.hit_ratio, 3)}
+                for name, stats in self.caches.items()
+            }
+        return {
+            "started_at": self.started_at,
+            "duration_sec": round(time.time() - self.started_at, 1),
+            "endpoints": dict(sorted(endpoints.items(), key=lambda e: -e[1]["total_ms"])),
+            "caches": caches,
+        }
+
+    def summary(self) -> list[str]:
+        """One line per endpoint, where the most time went first, then one per cache"""
+        data = self.to_json()
+        lines = [
+            f"{name}  {e['count']}x  err {e['errors']}  429 {e['throttled']}  {e['bytes'] / 1024:.0f} KB  "
+            f"p50 {e['p50_ms']:.0f}  p95 {e['p95_ms']:.0f}  p99 {e['p99_ms']:.0f} ms"
+            for name, e in data["endpoints"].items()
+        ]
+        lines += [
+            f"cache {name}  {c['hit_ratio']:.0%} ({c['hits']}/{c['hits'] + c['misses']})"
+            for name, c in data["caches"].items()
+        ]
+        return lines
+
+    def dump(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_json(), indent=2))
@@ -0,0 +1,79 @@
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from spotify_cli.schemas.playback import PlaybackState
+
+
+class PlaybackClock:
+    """
+    Local clock for the playing track.
+    Seeded from the progress_ms/duration_ms of a poll and the moment it was received, it advances progress on its
+    own between polls so the ui can tick every second and the next poll can be scheduled at the track boundary.
+    Every sync compares the prediction with what spotify reports and keeps the difference as drift.
+    """
+    MAX_DRIFT_SAMPLES = 50
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._track_key: tuple | None = None
+        self._progress_ms: int | None = None
+        self._duration_ms: int | None = None
+        self._is_playing = False
+        self._synced_at = 0.0
+        # reported - predicted progress, positive when playback is ahead of the local clock
+        self.drift_samples: deque[int] = deque(maxlen=self.MAX_DRIFT_SAMPLES)
+
+    def sync(self, state: PlaybackState | None, at: Optional[float] = None) -> int | None:
+        """Reseeds the clock from a poll, returns the drift in ms when the same track kept playing"""
+        at = self._clock() if at is None else at
+        drift = None
+
+        if state is not None and state.progress_ms is not None:
+            same_track = self._track_key is not None and self._track_key == self._key(state)
+            if same_track and self._is_playing and state.is_playing:
+                drift = state.progress_ms - self.progress_ms(at)
+                self.drift_samples.append(drift)
+
+        self._track_key = self._key(state) if state else None
+        self._progress_ms = state.progress_ms if state else None
+        self._duration_ms = state.duration_ms if state else None
+        self._is_playing = bool(state and state.is_playing)
+        self._synced_at = at
+        return drift
+
+    def progress_ms(self, at: Optional[float] = None) -> int | None:
+        if self._progress_ms is None:
+            return None
+        if not self._is_playing:
+            return self._progress_ms
+
+        at = self._clock() if at is None else at
+        progress = self._progress_ms + int((at - self._synced_at) * 1000)
+        return min(progress, self._duration_ms) if self._duration_ms else progress
+
+    @property
+    def duration_ms(self) -> int | None:
+        return self._duration_ms
+
+    @property
+    def is_playing(self) -> bool:
+        return self._is_playing
+
+    def remaining_sec(self, at: Optional[float] = None) -> float | None:
+        """Seconds until the predicted end of the playing track, None when nothing is playing"""
+        progress = self.progress_ms(at)
+        if not self._is_playing or progress is None or not self._duration_ms:
+            return None
+        return max(self._duration_ms - progress, 0) / 1000.0
+
+    @property
+    def last_drift_ms(self) -> int | None:
+        return self.drift_samples[-1] if self.drift_samples else None
+
+    @staticmethod
+    def _key(state: PlaybackState) -> tuple | None:
+        if state.track is None:
+            return None
+        return state.track.name, state.track.album.id
+
@@ -0,0 +1,143 @@
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+# endpoint class: (requests per second, burst)
+DEFAULT_RATE_LIMITS: dict[str, tuple[float, int]] = {
+    "player": (4.0, 8),
+    "search": (4.0, 8),
+    "library": (8.0, 16),
+    "default": (6.0, 12),
+}
+
+
+def get_endpoint_class(url: str) -> str:
+    path = urlsplit(url).path
+    path = path.split("/v1/", 1)[1] if "/v1/" in path else path.lstrip("/")
+
+    if path.startswith("me/player"):
+        return "player"
+    if path.startswith("search"):
+        return "search"
+    if path.startswith(("me/albums", "albums")):
+        return "library"
+    return "default"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        # missing, or an http date which spotify doesn't send
+        return None
+
+
+@dataclass
+class TokenBucket:
+    rate: float
+    capacity: int
+    tokens: float = field(init=False)
+    updated_at: float = field(init=False, default=0.0)
+
+    def __post_init__(self):
+        self.tokens = float(self.capacity)
+
+    def refill(self, now: float):
+        if self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, now: float) -> float:
+        """Takes a token and returns how long to wait for it, tokens can go negative so waiters queue up in order"""
+        self.refill(now)
+        self.tokens -= 1
+        return max(-self.tokens / self.rate, 0.0)
+
+
+@dataclass(frozen=True)
+class ThrottleEvent:
+    at: float
+    endpoint_class: str
+    retry_after: Optional[float]
+    # how long every request is held back, Retry-After (or the backoff) plus jitter
+    delay: float
+
+
+class RateLimiter:
+    """
+    Client wide limiter every spotify request passes through.
+    Each endpoint class has its own token bucket so a burst of suggestions can't starve playback commands, and a
+    429 on any request holds back all of them until Retry-After has passed (with jitter, so the waiting threads
+    don't all retry in the same instant). Without a Retry-After the wait backs off exponentially.
+    """
+    BACKOFF_BASE_SEC = 1.0
+    BACKOFF_MAX_SEC = 30.0
+    JITTER = 0.1
+    MAX_EVENTS = 100
+
+    def __init__(self, limits: Optional[dict[str, tuple[float, int]]] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        limits = {**DEFAULT_RATE_LIMITS, **(limits or {})}
+        self.buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in limits.items()}
+        self.events: deque[ThrottleEvent] = deque(maxlen=self.MAX_EVENTS)
+        self._clock = clock
+        self._sleep = sleep
+        self._blocked_until = 0.0
+        self._consecutive_throttles = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, endpoint_class: str) -> float:
+        """Blocks until a request of `endpoint_class` may be sent, returns the seconds waited"""
+        with self._lock:
+            now = self._clock()
+            bucket = self.buckets.get(endpoint_class) or self.buckets["default"]
+            wait = max(bucket.reserve(now), self._blocked_until - now, 0.0)
+
+        if wait:
+            self._sleep(wait)
+        return wait
+
+    def throttled(self, endpoint_class: str, retry_after: Optional[float]) -> float:
+        """Holds back every request after a 429, returns the seconds they are held back for"""
+        with self._lock:
+            now = self._clock()
+            self._consecutive_throttles += 1
+            if retry_after is None:
+                retry_after_or_backoff = min(
+                    self.BACKOFF_BASE_SEC * 2 ** (self._consecutive_throttles - 1), self.BACKOFF_MAX_SEC
+                )
+            else:
+                retry_after_or_backoff = retry_after
+            delay = retry_after_or_backoff * (1 + random.uniform(0, self.JITTER)) + random.uniform(0, self.JITTER)
+
+            self._blocked_until = max(self._blocked_until, now + delay)
+            # spend the burst, requests resume at the bucket rate once the block is over
+            bucket = self.buckets.get(endpoint_class) or self.buckets["default"]
+            bucket.refill(now)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            self.events.append(ThrottleEvent(time.time(), endpoint_class, retry_after, delay))
+            return delay
+
+    def succeeded(self):
+        with self._lock:
+            self._consecutive_throttles = 0
+
+    # region #### Introspection ####
+    def budget(self) -> dict[str, float]:
+        """Tokens available right now per endpoint class, negative while requests are queued"""
+        with self._lock:
+            now = self._clock()
+            for bucket in self.buckets.values():
+                bucket.refill(now)
+            return {name: bucket.tokens for name, bucket in self.buckets.items()}
+
+    @property
+    def throttled_for(self) -> float:
+        """Seconds left of the current global Retry-After block"""
+        return max(self._blocked_until - self._clock(), 0.0)
+
+    # endregion
@@ -0,0 +1,50 @@
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls into one.
+    The first caller of a key runs the function, callers arriving while it is in flight wait for it and get the
+    same result (or exception) instead of making their own upstream request.
+    """
+
+    def __init__(self):
+        # calls per key, and how many of them were answered by a call already in flight
+        self.calls: Counter[Hashable] = Counter()
+        self.shared: Counter[Hashable] = Counter()
+        self._in_flight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def saved(self) -> int:
+        return sum(self.shared.values())
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args, **kwargs) -> T:
+        with self._lock:
+            self.calls[key] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.shared[key] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
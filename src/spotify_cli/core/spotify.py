@@ -1,21 +1,60 @@
+import asyncio
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from pathlib import Path
+from typing import Optional, Callable, AsyncIterator
 
-from spotipy import Spotify, SpotifyOauthError
+from spotipy import Spotify, SpotifyOauthError, SpotifyException
 
 from spotify_cli.core.auth import get_spotify_client
 from spotify_cli.core.config import Config
+from spotify_cli.core.device_registry import DeviceRegistry
+from spotify_cli.core.transport import SpotifyTransport
 from spotify_cli.schemas.device import Device
 from spotify_cli.schemas.playback import PlaybackState
 from spotify_cli.schemas.search import SearchResult, AlbumSearchItem, TracksSearchItems
 from spotify_cli.schemas.track import Track, Actions
-from spotify_cli.core.caching import get_saved_albums_cache_path, SavedAlbumsCache, EntryModel, SavedAlbumsModel
+from spotify_cli.core.caching import CacheStats, SessionSnapshotCache, SessionSnapshotModel, \
+    get_session_snapshot_path
+from spotify_cli.core.library_index import LibraryIndex, LibraryIndexCache
+from spotify_cli.core.library_reconcile import LibraryReconciler, ReconcileResult
+from spotify_cli.core.library_record import LibraryAlbum
+from spotify_cli.core.library_store import LibraryStore, get_library_store
+from spotify_cli.core.metrics import ApiMetrics
+from spotify_cli.core.rate_limiter import RateLimiter
+from spotify_cli.core.single_flight import SingleFlight
+from spotify_cli.core.suggestions import SuggestionCache
+from spotify_cli.core.tracklist_cache import TracklistCache
 from spotify_cli.utils.date_time_helpers import parse_date
 
 
+LIBRARY_PAGE_SIZE = 50
+# saved albums pages fetched concurrently during a library sync, kept under the transport connection pool size
+LIBRARY_SYNC_WINDOW = 4
+# rows per chunk when streaming the stored library, about a few screenfuls
+LIBRARY_STREAM_PAGE_SIZE = 200
+# newest albums kept in the session snapshot, about a screenful
+LIBRARY_HEAD_SIZE = 50
+# tracks per album_tracks request, the most the api returns, which is the whole tracklist for most albums
+ALBUM_TRACKS_PAGE_SIZE = 50
+# how often the stored library is compared against upstream for removals, it costs a handful of requests
+LIBRARY_RECONCILE_TTL = 3600
+# playback fields that move on every poll while a track plays, the snapshot isn't rewritten for them alone
+SNAPSHOT_VOLATILE_PLAYBACK_FIELDS = ("progress_ms", "etag")
+
+
+@dataclass
+class LibraryChunk:
+    albums: list[LibraryAlbum]
+    # row index the albums should be inserted at, None appends them
+    index: int | None = None
+
+
 class SearchElementTypes(Enum):
     ARTIST = "artist"
     ALBUM = "album"
@@ -57,17 +96,70 @@ class PlatformAdapter:
 
 
 class SpotifyClient:
+    """
+    The sync methods are blocking spotipy calls and are what the tests and thread workers use, every `*_async`
+    method awaits the same call on the transport executor so it can be used straight from the event loop
+    """
+
     def __init__(self, sp: Spotify, platform: Optional[PlatformAdapter] = None,
-                 cache: Optional[SavedAlbumsCache] = None):
+                 library: Optional[LibraryStore] = None, transport: Optional[SpotifyTransport] = None,
+                 snapshot_cache: Optional[SessionSnapshotCache] = None,
+                 tracklists: Optional[TracklistCache] = None):
         self.sp = sp
         self.platform = platform or PlatformAdapter()
-        self.cache = cache or SavedAlbumsCache(get_saved_albums_cache_path())
+        self.library = library or get_library_store()
+        self.transport = transport or SpotifyTransport()
+
+        # last PlaybackState received with its ETag, replayed when the api answers 304 Not Modified
+        self._playback_cache: tuple[str, PlaybackState] | None = None
+        self.playback_etag_stats = CacheStats()
+        # shared by every suggester of the app, outlives search screens and mode switches
+        self.suggestions = SuggestionCache()
+        # identical reads in flight at the same time share one request, see `single_flight.saved`
+        self.single_flight = SingleFlight()
+        self.device_registry = DeviceRegistry()
+
+        # loaded on first use, see get_library_index
+        self._library_index: LibraryIndex | None = None
+        self._library_index_cache = LibraryIndexCache(self.library.path.with_name("library_index.json"))
+        self._library_index_lock = threading.Lock()
+        # tracklists of played and hovered albums, so playing them again needs no request. next to the library
+        # store unless given, so a client on a test store never writes to the user cache dir
+        self.tracklists = tracklists or TracklistCache(self.library.path.with_name("tracklists.sqlite3"))
+
+        # last known session saved on every change so the next launch paints it before any request,
+        # None keeps the session in memory only
+        self.snapshot_cache = snapshot_cache
+        self._snapshot: SessionSnapshotModel | None = None
+        self._snapshot_lock = threading.Lock()
+
+        self.metrics.add_cache("playback etag", self.playback_etag_stats)
+        self.metrics.add_cache("suggestions", self.suggestions.stats)
+        self.metrics.add_cache("devices", self.device_registry.stats)
+        self.metrics.add_cache("tracklists", self.tracklists.stats)
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Budget and throttle events of every request made through the transport session"""
+        return self.transport.limiter
+
+    @property
+    def metrics(self) -> ApiMetrics:
+        """Per endpoint calls, errors, 429s, bytes and latencies of every request, and the local cache hit ratios"""
+        return self.transport.metrics
+
+    def dump_metrics(self, path: Optional[Path] = None) -> Path:
+        """Writes the metrics of this session as json, next to the library by default"""
+        path = path or self.library.path.with_name("metrics.json")
+        self.metrics.dump(path)
+        return path
 
     # region #### Factories ####
     @classmethod
     def from_config(cls, config: Config) -> "SpotifyClient":
-        sp = get_spotify_client(config)
-        return cls(sp=sp)
+        transport = SpotifyTransport()
+        sp = get_spotify_client(config, session=transport.session)
+        return cls(sp=sp, transport=transport, snapshot_cache=SessionSnapshotCache(get_session_snapshot_path()))
 
     @staticmethod
     def is_spotify_config_valid(client_id: str, client_secret: str) -> bool:
@@ -82,10 +174,54 @@ class SpotifyClient:
 
     # endregion
 
+    # region #### Session snapshot ####
+    def load_snapshot(self) -> SessionSnapshotModel | None:
+        """The session as it was last seen, possibly by a previous run, None when there is nothing saved"""
+        with self._snapshot_lock:
+            if self._snapshot is None and self.snapshot_cache is not None:
+                self._snapshot = self.snapshot_cache.load()
+            return self._snapshot
+
+    def _update_snapshot(self, **changes):
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                snapshot = (self.snapshot_cache and self.snapshot_cache.load()) or SessionSnapshotModel()
+            if all(getattr(snapshot, field) == value for field, value in changes.items()):
+                return
+
+            if all(self._snapshot_value(getattr(snapshot, field)) == self._snapshot_value(value)
+                   for field, value in changes.items()):
+                # only the progress moved, the main screen never shows a snapshot's progress so it stays in memory
+                self._snapshot = snapshot.model_copy(update=changes)
+                return
+
+            self._snapshot = snapshot.model_copy(update={**changes, "saved_ts": time.time()})
+            if self.snapshot_cache is not None:
+                self.snapshot_cache.save(self._snapshot)
+
+    @staticmethod
+    def _snapshot_value(value):
+        if isinstance(value, PlaybackState):
+            return value.model_copy(update=dict.fromkeys(SNAPSHOT_VOLATILE_PLAYBACK_FIELDS))
+        return value
+
+    # endregion
+
     # region #### Devices ####
-    def get_devices(self) -> list[Device]:
+    def get_devices(self, fresh: bool = False) -> list[Device]:
+        """Devices from the registry while they are fresh, `fresh` always asks spotify"""
+        devices = None if fresh else self.device_registry.get()
+        if devices is None:
+            devices = self.single_flight.do("devices", self._fetch_devices)
+        return devices
+
+    def _fetch_devices(self) -> list[Device]:
         resp = self.sp.devices()
-        return [Device(**device) for device in resp.get("devices", [])]
+        devices = [Device(**device) for device in resp.get("devices", [])]
+        self.device_registry.put(devices)
+        self._update_snapshot(device=next((device for device in devices if device.is_active), None))
+        return devices
 
     def get_first_active_device(self) -> Device | None:
         devices = self.get_devices()
@@ -95,12 +231,21 @@ class SpotifyClient:
         else:
             return None
 
+    async def get_devices_async(self, fresh: bool = False) -> list[Device]:
+        return await self.transport.run(self.get_devices, fresh=fresh)
+
+    async def get_first_active_device_async(self) -> Device | None:
+        return await self.transport.run(self.get_first_active_device)
+
     async def wait_for_device(self, tries=12, delay=0.5) -> Device | None:
-        for _ in range(tries):
-            active_device = self.get_first_active_device()
+        for attempt in range(tries):
+            if attempt:
+                # the registry can answer the first try, waiting for a device to show up needs fresh reads
+                self.device_registry.invalidate()
+            active_device = await self.transport.run(self.get_first_active_device)
             if active_device:
                 return active_device
-            time.sleep(delay)
+            await asyncio.sleep(delay)
         return None
 
     # endregion
@@ -123,11 +268,30 @@ class SpotifyClient:
         search_res = self.sp.search(q=f"{search_element.value}:{query}", type=search_element.value, limit=limit)
         return SearchResult(**search_res[next(iter(search_res))])
 
+    async def search_spotify_suggestions_async(self, query: str, search_element: SearchElementTypes,
+                                               limit: int = 10) -> SearchResult:
+        return await self.transport.run(self.search_spotify_suggestions, query=query,
+                                        search_element=search_element, limit=limit)
+
+    def get_search_suggestions(self, query: str, search_element: SearchElementTypes) -> SearchResult:
+        """Suggestions through the shared cache, only queries it can't answer go upstream"""
+        cached = self.suggestions.get(search_element.value, query)
+        if cached is not None:
+            return cached
+
+        # a full page costs the same request as one item and gives longer queries more to filter locally
+        result = self.search_spotify_suggestions(query=query, search_element=search_element, limit=10)
+        self.suggestions.put(search_element.value, query, result)
+        return result
+
+    async def get_search_suggestions_async(self, query: str, search_element: SearchElementTypes) -> SearchResult:
+        return await self.transport.run(self.get_search_suggestions, query=query, search_element=search_element)
+
     async def search_artist_and_play(self, artist_query: str) -> TracksSearchItems:
         HARD_LIMIT = 50
-        search_result = self.search_spotify_tracks(query=f"{artist_query}",
-                                                   search_element=SearchElementTypes.ARTIST,
-                                                   limit=HARD_LIMIT)
+        search_result = await self.transport.run(self.search_spotify_tracks, query=f"{artist_query}",
+                                                 search_element=SearchElementTypes.ARTIST,
+                                                 limit=HARD_LIMIT)
 
         uris: list[str] = []
         for i in search_result.items:
@@ -137,7 +301,8 @@ class SpotifyClient:
         return search_result.get_item_by_index()
 
     async def search_track_and_play(self, song_query) -> TracksSearchItems:
-        search_res = self.search_spotify_tracks(query=song_query, search_element=SearchElementTypes.TRACK, limit=1)
+        search_res = await self.transport.run(self.search_spotify_tracks, query=song_query,
+                                              search_element=SearchElementTypes.TRACK, limit=1)
 
         if len(search_res.items) == 0:
             raise NoTrackFound()
@@ -148,14 +313,15 @@ class SpotifyClient:
         return search_res.get_item_by_index()
 
     async def search_album_and_play(self, album_query) -> TracksSearchItems:
-        album_res = self.search_spotify_tracks(query=album_query, search_element=SearchElementTypes.ALBUM, limit=1)
+        album_res = await self.transport.run(self.search_spotify_tracks, query=album_query,
+                                             search_element=SearchElementTypes.ALBUM, limit=1)
         albums: list[AlbumSearchItem] = album_res.items
 
         if len(albums) == 0:
             raise NoAlbumsFound()
 
         await self.play_by_uris_or_context_uri(context_uri=albums[0].uri)
-        returned_track = self._get_first_track_from_album_search_item(album=albums[0])
+        returned_track = await self.transport.run(self._get_first_track_from_album_search_item, album=albums[0])
         return returned_track
 
     # endregion
@@ -165,21 +331,37 @@ class SpotifyClient:
         if not uris and not context_uri:
             raise ValueError("play_by_uris_or_context_uri must be called with either uris or context_uri")
 
-        self.platform.ensure_spotify_running()
+        await self.transport.run(self.platform.ensure_spotify_running)
         device = await self.wait_for_device()
         if device is None:
             raise NoActiveDeviceFound()
 
-        self.sp.start_playback(uris=uris, context_uri=context_uri, device_id=device.id)
+        await self.transport.run(self.sp.start_playback, uris=uris, context_uri=context_uri, device_id=device.id)
+        self.device_registry.set_active(device.id)
 
     def _get_first_track_from_album_search_item(self, album: AlbumSearchItem) -> TracksSearchItems:
-        album_tracks = self.sp.album_tracks(album.id, limit=1)
-        _album_track = album_tracks.get("items")[0]
+        _album_track = self.get_album_tracks(album.id)[0]
         return TracksSearchItems(
             **_album_track,
             album=album,
         )
 
+    def get_album_tracks(self, album_id: str) -> list[dict]:
+        """The album tracklist (up to its first 50 tracks) from the tracklist cache, fetched on a miss"""
+        tracks = self.tracklists.get(album_id)
+        if tracks is None:
+            # a hover prefetch and the play of the same album share the request
+            tracks = self.single_flight.do(("album_tracks", album_id), self._fetch_album_tracks, album_id)
+        return tracks
+
+    def _fetch_album_tracks(self, album_id: str) -> list[dict]:
+        tracks = self.sp.album_tracks(album_id, limit=ALBUM_TRACKS_PAGE_SIZE).get("items", [])
+        self.tracklists.put(album_id, tracks)
+        return tracks
+
+    async def prefetch_album_tracks_async(self, album_id: str):
+        await self.transport.run(self.get_album_tracks, album_id)
+
     # todo - currently this work but this could be written better
     def play_or_pause_track(self, active_device: Device | None = None):
         if active_device is None:
@@ -195,9 +377,13 @@ class SpotifyClient:
                 self.sp.transfer_playback(device_id=active_device.id)
             else:
                 self.sp.start_playback(device_id=active_device.id)
+            self.device_registry.set_active(active_device.id)
         elif self._can_pause_playback(currently_playing):
             self.sp.pause_playback(device_id=currently_playing.device_id)
 
+    async def play_or_pause_track_async(self, active_device: Device | None = None):
+        await self.transport.run(self.play_or_pause_track, active_device=active_device)
+
     @staticmethod
     def _can_start_playback(currently_playing: PlaybackState | None) -> bool:
         if currently_playing is None:
@@ -218,11 +404,58 @@ class SpotifyClient:
         return True
 
     def get_playback_state(self) -> PlaybackState | None:
-        playback_data = self.sp.current_playback()
+        """
+        Conditional GET of the player state, when nothing changed since the last poll spotify answers
+        304 Not Modified and the cached PlaybackState is returned without downloading or parsing anything
+        """
+        return self.single_flight.do("playback_state", self._fetch_playback_state)
+
+    def _fetch_playback_state(self) -> PlaybackState | None:
+        cached = self._playback_cache
+        status, playback_data, etag = self._conditional_get("me/player", etag=cached[0] if cached else None)
+
+        if status == 304 and cached:
+            self.playback_etag_stats.hits += 1
+            return cached[1]
 
+        self.playback_etag_stats.misses += 1
         if playback_data is None:
+            self._playback_cache = None
+            self._update_snapshot(playback=None)
             return None
 
+        playback_state = self._parse_playback_state(playback_data, etag=etag)
+        self._playback_cache = (etag, playback_state) if etag else None
+        self._update_snapshot(playback=playback_state)
+        return playback_state
+
+    def _conditional_get(self, path: str, etag: Optional[str] = None) -> tuple[int, dict | None, str | None]:
+        """
+        spotipy drops the response headers and treats a 304 as an empty body, so conditional requests go
+        straight through its session, with its auth headers and error handling
+        """
+        headers = self.sp._auth_headers()
+        if etag:
+            headers["If-None-Match"] = etag
+
+        response = self.sp._session.request(
+            "GET", self.sp.prefix + path, headers=headers, proxies=self.sp.proxies, timeout=self.sp.requests_timeout
+        )
+
+        if response.status_code >= 400:
+            try:
+                msg = response.json().get("error", {}).get("message")
+            except ValueError:
+                msg = response.text or None
+            raise SpotifyException(response.status_code, -1, f"{response.url}:\n {msg}", headers=response.headers)
+
+        if response.status_code in (204, 304) or not response.content:
+            return response.status_code, None, response.headers.get("ETag")
+
+        return response.status_code, response.json(), response.headers.get("ETag")
+
+    @staticmethod
+    def _parse_playback_state(playback_data: dict, etag: Optional[str] = None) -> PlaybackState:
         # todo - make track schema more like the result from spotify
         track = Track(
             name=playback_data.get("item").get("name"),
@@ -238,101 +471,275 @@ class SpotifyClient:
         return PlaybackState(
             track=track,
             progress_ms=playback_data.get("progress_ms"),
-            duration_ms=playback_data.get("duration_ms"),
+            # the duration belongs to the item, the top level payload has none
+            duration_ms=playback_data.get("item").get("duration_ms"),
             is_playing=playback_data.get("is_playing"),
             device_id=playback_data.get("device", {}).get("id"),
             actions=Actions(**playback_data.get("actions")),
-            etag=playback_data.get("etag")
+            etag=etag
         )
 
+    async def get_playback_state_async(self) -> PlaybackState | None:
+        return await self.transport.run(self.get_playback_state)
+
+    def get_next_queued_album(self) -> Optional[AlbumSearchItem]:
+        """Album of the next item in the playback queue, None when the queue is empty or it is an episode"""
+        queue = self.single_flight.do("queue", self.sp.queue) or {}
+        items = queue.get("queue") or []
+        album = items[0].get("album") if items else None
+        return AlbumSearchItem(**album) if album else None
+
+    async def get_next_queued_album_async(self) -> Optional[AlbumSearchItem]:
+        return await self.transport.run(self.get_next_queued_album)
+
     # endregion
 
     # region #### Library ####
     def get_library_albums_cached(
             self,
             ttl_sec: int = 900,
-    ) -> list[AlbumSearchItem]:
-        cache = SavedAlbumsCache(get_saved_albums_cache_path())
-        model = cache.load() or cache.default_payload()
+    ) -> list[LibraryAlbum]:
+        self.refresh_library(ttl_sec=ttl_sec)
+        return self.library.albums()
+
+    async def get_library_albums_cached_async(self) -> list[LibraryAlbum]:
+        return await self.transport.run(self.get_library_albums_cached)
+
+    def refresh_library(self, ttl_sec: int = 900,
+                        on_entries: Optional[Callable[[list[LibraryAlbum]], None]] = None) -> list[LibraryAlbum]:
+        """
+        Brings the library store up to date with the user library and returns the newly saved albums,
+        `on_entries` is called with every batch of new albums as soon as it is fetched
+        """
+        library = self.library
 
         now = time.time()
-        if len(model.album_ids) > 0 and model.updated_ts and (now - model.updated_ts < ttl_sec):
+        updated_ts = library.get_meta("updated_ts", 0.0)
+        if updated_ts and (now - updated_ts < ttl_sec) and library.count() > 0:
             # Cache is fresh by TTL—return as is.
-            return [entry.album for entry in model.entries]
+            return []
 
         newest_added_at = self._get_newest_added_album_in_library()
 
-        if newest_added_at and newest_added_at == model.latest_added_at:
+        if newest_added_at and newest_added_at == library.get_meta("latest_added_at"):
             # No change since last seen—refresh TTL and return
-            model.updated_ts = now
-            cache.save(model)
-            return [entry.album for entry in model.entries]
+            library.set_meta("updated_ts", now)
+            return []
 
-        new_entries = self._get_new_library_entries(known_ids=model.album_ids)
+        new_entries = self._get_new_library_entries(known_ids=library.album_ids(), on_entries=on_entries)
 
+        meta = {"updated_ts": now}
         if new_entries:
-            model.entries = [entry for entry in new_entries] + model.entries
-            model.album_ids = list(set(model.album_ids).union(a.album.id for a in new_entries))
-            model.latest_added_at = newest_added_at or model.latest_added_at
-
-        model.updated_ts = now
-        model.entries.sort(key=lambda e: e.added_at, reverse=True)
+            meta["latest_added_at"] = newest_added_at or library.get_meta("latest_added_at")
 
-        cache.save(model)
-        return [entry.album for entry in model.entries]
+        # only the new rows and two metadata values are written, not the whole library
+        library.apply(upserts=new_entries, meta=meta)
+        self._update_library_index(upserts=new_entries)
+        if new_entries:
+            self._update_snapshot(library_head=library.albums(limit=LIBRARY_HEAD_SIZE))
+        return new_entries
 
-    def _get_new_library_entries(self, known_ids: list[str]) -> list[EntryModel]:
+    async def stream_library_albums(self, ttl_sec: int = 900,
+                                    page_size: int = LIBRARY_STREAM_PAGE_SIZE) -> AsyncIterator[LibraryChunk]:
         """
-        go overs the user library in batches and add new saved albums to the model until hitting an id of
-        existing model in the library
+        Yields the library in chunks as they become available - the locally stored albums first, page by page,
+        then the newly saved albums found by the network refresh as each sync window arrives
         """
-        known_ids = set(known_ids)
-        new_entries: list[EntryModel] = []
-
         offset = 0
         while True:
-            BATCH = 50
-            res = self.sp.current_user_saved_albums(limit=BATCH, offset=offset)
-
-            def key(item):
-                added = parse_date(item.get("added_at"))
-                release = parse_date(item.get("release_date"))
-                # if release is after added → use release as effective sort key
-                return release if release > added else added
-
-            items = sorted(res.get("items", []), key=key, reverse=True)
-            if not items:
+            albums = await self.transport.run(self.library.albums, offset=offset, limit=page_size)
+            if not albums:
                 break
+            yield LibraryChunk(albums=albums)
+            offset += len(albums)
+
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue[list[LibraryAlbum] | None] = asyncio.Queue()
+        refresh = asyncio.ensure_future(self.transport.run(
+            self.refresh_library,
+            ttl_sec=ttl_sec,
+            on_entries=lambda entries: loop.call_soon_threadsafe(chunks.put_nowait, entries),
+        ))
+
+        # None marks the end, it is queued after every on_entries callback the refresh thread scheduled
+        refresh.add_done_callback(lambda _: chunks.put_nowait(None))
+
+        # new albums are newer than everything stored, they go on top in the order they were fetched
+        inserted = 0
+        try:
+            while (entries := await chunks.get()) is not None:
+                yield LibraryChunk(albums=entries, index=inserted)
+                inserted += len(entries)
+        finally:
+            if not refresh.done():
+                refresh.cancel()
 
-            hit_known = False
-            for it in items:
-                release_date = it.get("release_date", None)
-                added_at = it.get("added_at")
-                album = it.get("album", {})
-                album_id = album.get("id")
+        # surfaces refresh errors to the consumer
+        refresh.result()
 
-                if self._is_album_not_released_yet(added_date=added_at, release_date=release_date):
-                    # we don't save pre-saved albums to the cache because we can't play them on the app,
-                    # and it causes headache later when trying to update cache when they release
-                    continue
+    def reconcile_library(self, ttl_sec: int = LIBRARY_RECONCILE_TTL) -> ReconcileResult:
+        """
+        Catches up with changes the top down sync can't see, albums removed (or saved again) on another device,
+        by comparing sampled pages with the store instead of reading the whole library. At most once per `ttl_sec`
+        """
+        library = self.library
+        now = time.time()
+        reconciled_ts = library.get_meta("reconciled_ts", 0.0)
+        if reconciled_ts and now - reconciled_ts < ttl_sec:
+            return ReconcileResult()
+
+        result = LibraryReconciler(
+            library.ordered_album_keys(),
+            fetch_page=lambda offset: self._get_saved_albums_page(offset=offset),
+            contains=lambda album_ids: self.sp.current_user_saved_albums_contains(albums=album_ids),
+            to_record=self._to_library_album,
+            unstored=library.get_meta("unstored_albums", []),
+        ).run()
+
+        library.apply(upserts=result.upserts, deletes=result.removed,
+                      meta={"reconciled_ts": now, "unstored_albums": result.unstored})
+
+        if result.changed:
+            # the newest album may have been the one removed, the freshness peek compares against it
+            newest = library.albums(limit=1)
+            library.set_meta("latest_added_at", newest[0].added_at if newest else None)
+            self._update_library_index(upserts=result.upserts, deletes=result.removed)
+            self._update_snapshot(library_head=library.albums(limit=LIBRARY_HEAD_SIZE))
+        return result
+
+    async def reconcile_library_async(self) -> ReconcileResult:
+        return await self.transport.run(self.reconcile_library)
+
+    def get_library_index(self) -> LibraryIndex:
+        """
+        The persisted search index over the library, reconciled with the library store the first time
+        it is loaded so albums synced while it wasn't in memory are picked up
+        """
+        with self._library_index_lock:
+            if self._library_index is not None:
+                return self._library_index
+
+            index = self._library_index_cache.load() or self._library_index_cache.default_payload()
+            stored_ids = self.library.album_ids()
+            indexed_ids = index.album_ids()
+
+            missing = stored_ids - indexed_ids
+            removed = indexed_ids - stored_ids
+            if missing:
+                index.add(self.library.get_albums(missing))
+            if removed:
+                index.remove(removed)
+            if missing or removed:
+                self._library_index_cache.save(index)
+
+            self._library_index = index
+            return index
+
+    async def get_library_index_async(self) -> LibraryIndex:
+        return await self.transport.run(self.get_library_index)
+
+    def _update_library_index(self, upserts: list[LibraryAlbum] = (), deletes: list[str] = ()):
+        with self._library_index_lock:
+            index = self._library_index
+            if index is None or not (upserts or deletes):
+                # not loaded yet, it is reconciled with the store when it is
+                return
+            index.add(upserts)
+            index.remove(deletes)
+            self._library_index_cache.save(index)
+
+    async def play_library_album(self, album_id: str) -> TracksSearchItems:
+        albums = await self.transport.run(self.library.get_albums, [album_id])
+        if not albums:
+            raise NoAlbumsFound()
 
-                if album_id in known_ids:
-                    hit_known = True
+        album = albums[0].to_album()
+        await self.play_by_uris_or_context_uri(context_uri=album.uri)
+        return await self.transport.run(self._get_first_track_from_album_search_item, album=album)
+
+    def _get_new_library_entries(self, known_ids: set[str] | list[str], window: int = LIBRARY_SYNC_WINDOW,
+                                 on_entries: Optional[Callable[[list[LibraryAlbum]], None]] = None
+                                 ) -> list[LibraryAlbum]:
+        """
+        go overs the user library in batches and add new saved albums to the model until hitting an id of
+        existing model in the library.
+        The first page is fetched alone (warm syncs usually stop there), after that `window` pages are fetched
+        concurrently at a time using the library `total` from the first page, so a cold sync costs
+        ~total / (50 * window) round trips instead of total / 50.
+        """
+        known_ids = set(known_ids)
+        new_entries: list[LibraryAlbum] = []
+
+        def key(item):
+            added = parse_date(item.get("added_at"))
+            release = parse_date(item.get("release_date"))
+            # if release is after added → use release as effective sort key
+            return release if release > added else added
+
+        first_page = self._get_saved_albums_page(offset=0)
+        total = first_page.get("total")
+        pages = [first_page]
+        offset = LIBRARY_PAGE_SIZE
+
+        with ThreadPoolExecutor(max_workers=window, thread_name_prefix="library-sync") as executor:
+            while True:
+                # pages come back in offset order, merging them keeps the newest first order across the window
+                items = sorted(
+                    (item for page in pages for item in page.get("items", [])), key=key, reverse=True
+                )
+                if not items:
                     break
 
-                new_entries.append(EntryModel(
-                    album=AlbumSearchItem(**album),
-                    added_at=added_at
-                ))
+                collected = len(new_entries)
+                hit_known = self._collect_new_library_entries(items, known_ids, new_entries)
+                if on_entries and len(new_entries) > collected:
+                    on_entries(new_entries[collected:])
 
-            # Stop if we reached previously known territory or the last page
-            if hit_known or len(items) < BATCH:
-                break
+                # Stop if we reached previously known territory or the last page
+                if hit_known or len(pages[-1].get("items", [])) < LIBRARY_PAGE_SIZE:
+                    break
+                if total is not None and offset >= total:
+                    break
 
-            offset += BATCH
+                if total is None:
+                    # without a total we can't tell where the library ends, fall back to one page at a time
+                    offsets = [offset]
+                else:
+                    offsets = list(range(offset, min(total, offset + window * LIBRARY_PAGE_SIZE), LIBRARY_PAGE_SIZE))
+                pages = list(executor.map(lambda o: self._get_saved_albums_page(offset=o), offsets))
+                offset += len(offsets) * LIBRARY_PAGE_SIZE
 
         return new_entries
 
+    def _collect_new_library_entries(self, items: list[dict], known_ids: set[str],
+                                     new_entries: list[LibraryAlbum]) -> bool:
+        """Appends the unknown items to new_entries, returns True when a known album was reached"""
+        for it in items:
+            record = self._to_library_album(it)
+            if record is None:
+                continue
+
+            if record.id in known_ids:
+                return True
+
+            new_entries.append(record)
+        return False
+
+    def _to_library_album(self, item: dict) -> Optional[LibraryAlbum]:
+        """The record stored for a saved albums item, None for the ones that aren't stored"""
+        added_at = item.get("added_at")
+        if self._is_album_not_released_yet(added_date=added_at, release_date=item.get("release_date", None)):
+            # we don't save pre-saved albums to the cache because we can't play them on the app,
+            # and it causes headache later when trying to update cache when they release
+            return None
+
+        # validated as the full api model once, only the compact record is kept
+        return LibraryAlbum.from_album(AlbumSearchItem(**item.get("album", {})), added_at)
+
+    def _get_saved_albums_page(self, offset: int) -> dict:
+        # 429s are retried by the transport session once its limiter allows, not here
+        return self.sp.current_user_saved_albums(limit=LIBRARY_PAGE_SIZE, offset=offset)
+
     def _get_newest_added_album_in_library(self):
         # Freshness peek: get the newest 'added_at' from API
         peek = self.sp.current_user_saved_albums(limit=1, offset=0)
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from spotify_cli.core.caching import CacheStats
+from spotify_cli.core.library_index import normalize
+from spotify_cli.schemas.search import SearchResult
+
+
+def matches_query(query: str, name: str) -> bool:
+    """Every word of the (normalized) query starts a word of the name, how a field filtered search matches"""
+    words = normalize(name).split()
+    return all(any(word.startswith(q) for word in words) for q in query.split())
+
+
+class SuggestionCache:
+    """
+    App wide cache for search suggestions keyed by (element type, normalized query), with a ttl and LRU eviction.
+    A query that extends one already fetched is answered by filtering the shorter query's results when they were
+    complete, so typing "radioh" after "rad" needs no request. A truncated result can't answer, the longer query's
+    matches may all be past its limit.
+    """
+    TTL_SEC = 300
+    MAX_ENTRIES = 512
+    MIN_PREFIX_LENGTH = 2
+
+    def __init__(self, ttl_sec: float = TTL_SEC, max_entries: int = MAX_ENTRIES):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        # hits answered from a shorter query, also counted in stats.hits
+        self.prefix_hits = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[float, SearchResult]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, element_type: str, query: str) -> Optional[SearchResult]:
+        q = normalize(query)
+        with self._lock:
+            result = self._get_fresh((element_type, q))
+            if result is not None:
+                self.stats.hits += 1
+                return result
+
+            for end in range(len(q) - 1, self.MIN_PREFIX_LENGTH - 1, -1):
+                shorter = self._get_fresh((element_type, q[:end].rstrip()))
+                if shorter is None:
+                    continue
+                if shorter.total > len(shorter.items):
+                    # truncated, the few matches it has aren't every match of the longer query
+                    continue
+                items = [item for item in shorter.items if matches_query(q, item.name)]
+                self.stats.hits += 1
+                self.prefix_hits += 1
+                return shorter.model_copy(update={"items": items, "total": len(items)})
+
+            self.stats.misses += 1
+            return None
+
+    def put(self, element_type: str, query: str, result: SearchResult):
+        key = (element_type, normalize(query))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get_fresh(self, key: tuple[str, str]) -> Optional[SearchResult]:
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+
+        stored_at, result = cached
+        if time.monotonic() - stored_at > self.ttl_sec:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
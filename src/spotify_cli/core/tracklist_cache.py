@@ -0,0 +1,86 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from spotify_cli.core.caching import CacheStats, eviction_target
+
+
+class TracklistCache:
+    """
+    Persistent album tracklists keyed by album id, so playing an album that was played (or hovered) before
+    needs no `album_tracks` request. Entries expire after `ttl_sec` and when there are more than `max_albums`
+    the least recently used ones are evicted. Tracks are stored as the api items without `available_markets`,
+    which is most of their size and which nothing reads.
+    """
+    TTL_SEC = 7 * 24 * 3600
+    MAX_ALBUMS = 2000
+
+    def __init__(self, path: Path, ttl_sec: float = TTL_SEC, max_albums: int = MAX_ALBUMS):
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_albums = max_albums
+        self.stats = CacheStats()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tracklists "
+            "(album_id TEXT PRIMARY KEY, fetched_at REAL NOT NULL, used_at REAL NOT NULL, tracks TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS tracklists_used_at ON tracklists (used_at)")
+        self._conn = conn
+        return conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, album_id: str) -> Optional[list[dict]]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT fetched_at, tracks FROM tracklists WHERE album_id = ?", (album_id,)
+            ).fetchone()
+            if row is None or now - row[0] > self.ttl_sec:
+                self.stats.misses += 1
+                return None
+            conn.execute("UPDATE tracklists SET used_at = ? WHERE album_id = ?", (now, album_id))
+            self.stats.hits += 1
+        return json.loads(row[1])
+
+    def put(self, album_id: str, tracks: list[dict]):
+        now = time.time()
+        tracks = [{k: v for k, v in track.items() if k != "available_markets"} for track in tracks]
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO tracklists (album_id, fetched_at, used_at, tracks) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (album_id) DO UPDATE SET fetched_at = excluded.fetched_at, "
+                "used_at = excluded.used_at, tracks = excluded.tracks",
+                (album_id, now, now, json.dumps(tracks)),
+            )
+            count = conn.execute("SELECT COUNT(*) FROM tracklists").fetchone()[0]
+            if count > self.max_albums:
+                conn.execute(
+                    "DELETE FROM tracklists WHERE album_id IN "
+                    "(SELECT album_id FROM tracklists ORDER BY used_at LIMIT ?)",
+                    (count - eviction_target(self.max_albums),),
+                )
+
+    def invalidate(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM tracklists")
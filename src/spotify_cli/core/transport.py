@@ -0,0 +1,125 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+
+from spotify_cli.core.metrics import ApiMetrics
+from spotify_cli.core.rate_limiter import RateLimiter, get_endpoint_class, parse_retry_after
+
+T = TypeVar("T")
+
+
+class RateLimitedSession(Session):
+    """
+    Session that takes a token from the limiter before every request and retries 429s once the limiter allows.
+    It is the only place 429s are retried, a request keeps waiting them out until it was held back for
+    `max_throttled_sec` in total, so a throttle lasting a whole rate limit window doesn't fail a library sync.
+    Every attempt is recorded in `metrics`, timed without the wait for the limiter.
+    """
+    # about twice spotify's rolling rate limit window
+    MAX_THROTTLED_SEC = 60.0
+
+    def __init__(self, limiter: RateLimiter, max_throttled_sec: float = MAX_THROTTLED_SEC,
+                 metrics: Optional[ApiMetrics] = None):
+        super().__init__()
+        self.limiter = limiter
+        self.max_throttled_sec = max_throttled_sec
+        self.metrics = metrics or ApiMetrics()
+
+    def request(self, method, url, *args, **kwargs) -> Response:
+        endpoint_class = get_endpoint_class(url)
+
+        throttled_sec = 0.0
+        while True:
+            self.limiter.acquire(endpoint_class)
+            started = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except Exception:
+                self.metrics.record(method, url, (time.perf_counter() - started) * 1000, None)
+                raise
+            # spotipy doesn't stream, the body is already read
+            self.metrics.record(method, url, (time.perf_counter() - started) * 1000, response.status_code,
+                                len(response.content))
+            if response.status_code != 429:
+                self.limiter.succeeded()
+                return response
+
+            throttled_sec += self.limiter.throttled(
+                endpoint_class, parse_retry_after(response.headers.get("Retry-After"))
+            )
+            if throttled_sec > self.max_throttled_sec:
+                # still throttled, the caller gets the 429 (spotipy raises it with the headers)
+                return response
+
+
+class SpotifyTransport:
+    """
+    Owns the keep-alive connection pool every spotipy call goes through and the bounded executor the async
+    methods of SpotifyClient await on.
+    spotipy is blocking all the way down, so instead of every screen/worker borrowing its own thread, all
+    network waits are funneled into one executor sized to the pool - at most `max_connections` requests are
+    in flight and the Textual event loop never blocks on HTTP.
+    """
+    MAX_CONNECTIONS = 8
+    # 429s are left to the rate limiter, which holds back every request instead of only the throttled one
+    RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS,
+                 rate_limits: Optional[dict[str, tuple[float, int]]] = None):
+        self.max_connections = max_connections
+        self.limiter = RateLimiter(rate_limits)
+        self.metrics = ApiMetrics()
+        self.session = self._build_session(max_connections)
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _build_session(self, max_connections: int) -> Session:
+        # same retry policy spotipy builds for its own session, but with a bounded pool that blocks instead of
+        # opening throwaway connections when it is exhausted
+        retry = Retry(
+            total=3,
+            connect=None,
+            read=False,
+            allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+            status=3,
+            backoff_factor=0.3,
+            status_forcelist=self.RETRY_STATUS_CODES,
+            # urllib3 would otherwise retry any 429 carrying a Retry-After itself, sleeping only this request
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max_connections,
+            pool_block=True,
+            max_retries=retry,
+        )
+
+        session = RateLimitedSession(self.limiter, metrics=self.metrics)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Await a blocking call on the transport executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args, **kwargs))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # created lazily so clients that never await anything (tests, setup validation) don't spawn threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_connections,
+                thread_name_prefix="spotify-transport",
+            )
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.session.close()
@@ -1,7 +1,12 @@
+import time
+
+# taken before the app (and everything it imports) is loaded, so time to first paint covers the whole startup
+STARTED_AT = time.perf_counter()
+
 from spotify_cli.app.app import SpotifyApp
 
 def spotify_tui():
-    app = SpotifyApp()
+    app = SpotifyApp(started_at=STARTED_AT)
     app.run()
 
 if __name__ == "__main__":
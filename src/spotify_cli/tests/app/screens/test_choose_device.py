@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from textual.app import App, ComposeResult
 from textual.widgets import Static, RadioButton
@@ -27,12 +29,13 @@ class TestChooseDevice:
         monkeypatch.setattr(
             SpotifyClient,
             "get_devices",
-            lambda _: [],
+            lambda _, fresh=False: [],
         )
 
         app = ChooseDeviceApp()
 
-        async with app.run_test():
+        async with app.run_test() as pilot:
+            await pilot.pause()
             static = app.query_one(Static)
             assert static.content == "No available devices"
 
@@ -42,12 +45,13 @@ class TestChooseDevice:
         monkeypatch.setattr(
             SpotifyClient,
             "get_devices",
-            lambda _: devices,
+            lambda _, fresh=False: devices,
         )
 
         app = ChooseDeviceApp()
 
-        async with app.run_test():
+        async with app.run_test() as pilot:
+            await pilot.pause()
             radio_choices = app.query(RadioButton)
 
             assert len(radio_choices) == 2
@@ -65,11 +69,34 @@ class TestChooseDevice:
         monkeypatch.setattr(
             SpotifyClient,
             "get_devices",
-            lambda _: devices,
+            lambda _, fresh=False: devices,
         )
 
         app = ChooseDeviceApp(device=devices[0])
 
-        async with app.run_test():
+        async with app.run_test() as pilot:
+            await pilot.pause()
             radio_choices = app.query(RadioButton)
-            assert radio_choices[0].value == True
\ No newline at end of file
+            assert radio_choices[0].value == True
+
+    @pytest.mark.asyncio
+    async def test_opens_with_known_devices_and_refreshes_them(self, monkeypatch):
+        known = [generate_test_device(name="known")]
+        refreshed = known + [generate_test_device(name="new")]
+        gate = asyncio.Event()
+
+        async def get_devices_async(_, fresh=False):
+            await gate.wait()
+            return refreshed
+
+        monkeypatch.setattr(SpotifyClient, "get_devices_async", get_devices_async)
+
+        app = ChooseDeviceApp()
+        app.service.device_registry.put(known)
+
+        async with app.run_test() as pilot:
+            assert [button.label for button in app.query(RadioButton)] == ["known"]
+
+            gate.set()
+            await pilot.pause()
+            assert [button.label for button in app.query(RadioButton)] == ["known", "new"]
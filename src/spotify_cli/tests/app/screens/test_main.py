@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from textual.app import App
+from textual.widgets import Static
+
+from spotify_cli.app.screens.main import Main
+from spotify_cli.app.widgets.active_device import ActiveDevice
+from spotify_cli.app.widgets.track_details import TrackDetail
+from spotify_cli.core.caching import SessionSnapshotCache
+from spotify_cli.core.spotify import SpotifyClient, LibraryChunk
+from spotify_cli.tests.utils import MockSpotify, generate_test_device, generate_test_playback_state
+
+
+class MainApp(App):
+    def __init__(self, service: SpotifyClient):
+        super().__init__()
+        self.service = service
+        self.started_at = 0.0
+        self.first_paint_ms = None
+
+    def on_mount(self):
+        self.push_screen(Main())
+
+
+async def _empty_stream(_):
+    for chunk in ():
+        yield chunk
+
+
+class TestMain:
+    @pytest.mark.asyncio
+    async def test_paints_last_session_as_stale_then_reconciles(self, monkeypatch, tmp_path):
+        snapshot_cache = SessionSnapshotCache(tmp_path / "session.json")
+        previous = SpotifyClient(sp=MockSpotify(), snapshot_cache=snapshot_cache)
+        previous._update_snapshot(playback=generate_test_playback_state(), device=generate_test_device(name="old"))
+
+        gate = asyncio.Event()
+        fresh_device = generate_test_device(name="fresh", is_active=True)
+
+        async def get_playback_state_async(_):
+            await gate.wait()
+            return None
+
+        async def get_first_active_device_async(_):
+            await gate.wait()
+            return fresh_device
+
+        monkeypatch.setattr(SpotifyClient, "get_playback_state_async", get_playback_state_async)
+        monkeypatch.setattr(SpotifyClient, "get_first_active_device_async", get_first_active_device_async)
+        monkeypatch.setattr(SpotifyClient, "stream_library_albums", _empty_stream)
+        app = MainApp(SpotifyClient(sp=MockSpotify(), snapshot_cache=snapshot_cache))
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            screen = app.screen
+            assert screen.query_one(TrackDetail).track.name == "test name"
+            assert screen.query_one(ActiveDevice).active_device_name == "old"
+            assert not screen.query_one("#stale_notice", Static).has_class("invisible")
+            assert app.first_paint_ms is not None
+
+            gate.set()
+            await pilot.pause()
+            assert screen.query_one(TrackDetail).track is None
+            assert screen.query_one(ActiveDevice).active_device_name == "fresh"
+            assert screen.query_one("#stale_notice", Static).has_class("invisible")
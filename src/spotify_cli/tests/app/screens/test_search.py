@@ -2,11 +2,13 @@ from unittest.mock import MagicMock
 
 import pytest
 from textual.app import App
-from textual.widgets import Input
+from textual.widgets import Input, OptionList
 
 from spotify_cli.app.screens.search import SearchScreen
+from spotify_cli.core.library_record import LibraryAlbum
+from spotify_cli.core.library_index import LibraryIndex
 from spotify_cli.core.spotify import SpotifyClient
-from spotify_cli.tests.utils import MockSpotify
+from spotify_cli.tests.utils import MockSpotify, generate_test_album_search_item
 
 
 class SearchApp(App):
@@ -82,3 +84,37 @@ class TestSearch:
             await pilot.press("enter")
 
             mock_function.assert_called_once_with(artist_query="test")
+
+    @pytest.mark.asyncio
+    async def test_shows_library_matches_and_plays_selected_album(self, monkeypatch):
+        album = generate_test_album_search_item("Kid A")
+        index = LibraryIndex()
+        index.add([LibraryAlbum.from_album(album, "2025-01-01T00:00:00Z")])
+
+        async def get_library_index_async(_):
+            return index
+
+        monkeypatch.setattr(SpotifyClient, "get_library_index_async", get_library_index_async)
+        play_library_album = MagicMock()
+
+        async def fake_play_library_album(_, album_id):
+            play_library_album(album_id)
+
+        monkeypatch.setattr(SpotifyClient, "play_library_album", fake_play_library_album)
+
+        app = SearchApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app.screen.query_one("#search", Input).value = "kid"
+            await pilot.pause()
+
+            matches = app.screen.query_one("#library_matches", OptionList)
+            assert matches.option_count == 1
+            assert not matches.has_class("invisible")
+
+            matches.focus()
+            matches.highlighted = 0
+            await pilot.press("enter")
+            await pilot.pause()
+
+            play_library_album.assert_called_once_with(album.id)
@@ -1,36 +1,69 @@
-import threading
-from time import sleep
-from unittest.mock import AsyncMock
+import asyncio
+from unittest.mock import MagicMock
 
 import pytest
 from textual.app import App, ComposeResult
-from textual.widgets import LoadingIndicator, DataTable, Static
+from textual.widgets import LoadingIndicator, DataTable, Static, Input
 
-from spotify_cli.app.widgets.library import Library
-from spotify_cli.core.spotify import SpotifyClient
+from spotify_cli.app.widgets.library import Library, AlbumsSynced, AlbumPlayed, LibraryTable
+from spotify_cli.core.library_record import LibraryAlbum
+from spotify_cli.core.library_index import LibraryIndex
+from spotify_cli.core.spotify import SpotifyClient, LibraryChunk
+from spotify_cli.utils import pixelate_images
 from spotify_cli.tests.utils import generate_test_album_search_item, MockSpotify
 
 
 class LibraryApp(App):
-    service = SpotifyClient(sp=MockSpotify())
+    def __init__(self):
+        super().__init__()
+        self.service = SpotifyClient(sp=MockSpotify())
+        self.played: list[AlbumPlayed] = []
 
     def compose(self) -> ComposeResult:
         yield Library()
 
+    def on_album_played(self, message: AlbumPlayed):
+        self.played.append(message)
+
+
+def _stream(*chunks: LibraryChunk):
+    async def stream_library_albums(_):
+        for chunk in chunks:
+            yield chunk
+
+    return stream_library_albums
+
+
+def _album(name: str) -> LibraryAlbum:
+    return LibraryAlbum.from_album(generate_test_album_search_item(name), "2025-01-01T00:00:00Z")
+
+
+def _table_names(data_table: DataTable) -> list[str]:
+    return [data_table.get_row_at(i)[1] for i in range(data_table.row_count)]
+
+
+def _spy_rows(monkeypatch, data_table: DataTable) -> dict[str, MagicMock]:
+    """Wraps the DataTable methods that add, remove or clear rows"""
+    calls = {}
+    for name in ("add_row", "remove_row", "clear"):
+        calls[name] = MagicMock(wraps=getattr(data_table, name))
+        monkeypatch.setattr(data_table, name, calls[name])
+    return calls
+
 
 class TestLibrary:
     @pytest.mark.asyncio
     async def test_shows_loading_while_getting_albums(self, monkeypatch):
-        gate = threading.Event()
+        gate = asyncio.Event()
 
-        def fake_get_albums(_):
-            gate.wait() #block the worker thread until we say so
-            return []
+        async def fake_stream(_):
+            await gate.wait()  # block the stream until we say so
+            yield LibraryChunk(albums=[])
 
         monkeypatch.setattr(
             SpotifyClient,
-            "get_library_albums_cached",
-            fake_get_albums
+            "stream_library_albums",
+            fake_stream
         )
         app = LibraryApp()
 
@@ -40,15 +73,16 @@ class TestLibrary:
 
     @pytest.mark.asyncio
     async def test_shows_album_list_when_loaded(self, monkeypatch):
-        albums = [generate_test_album_search_item("test1"), generate_test_album_search_item("test2")]
+        albums = [_album("test1"), _album("test2")]
         monkeypatch.setattr(
             SpotifyClient,
-            "get_library_albums_cached",
-            lambda _: albums,
+            "stream_library_albums",
+            _stream(LibraryChunk(albums=albums)),
         )
         app = LibraryApp()
 
-        async with app.run_test():
+        async with app.run_test() as pilot:
+            await pilot.pause()
             assert app.query_one("#albums_loading", LoadingIndicator).display == False
 
             data_table = app.query_one(DataTable)
@@ -61,21 +95,308 @@ class TestLibrary:
             assert data_table.get_row_at(1)[0] == albums[1].get_albums_artists()
             assert data_table.get_row_at(1)[1] == albums[1].name
 
+    @pytest.mark.asyncio
+    async def test_appends_streamed_chunks_in_order(self, monkeypatch):
+        first = [_album(f"cached {i}") for i in range(250)]
+        second = [_album("cached last")]
+        monkeypatch.setattr(
+            SpotifyClient,
+            "stream_library_albums",
+            _stream(LibraryChunk(albums=first), LibraryChunk(albums=second)),
+        )
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            data_table = app.query_one(DataTable)
+
+            assert _table_names(data_table) == [album.name for album in first + second]
 
     @pytest.mark.asyncio
-    async def test_show_error_when_fetching_failed(self, monkeypatch):
+    async def test_inserts_new_albums_at_chunk_index(self, monkeypatch):
+        cached = [_album("cached 1"), _album("cached 2")]
+        new = [_album("new 1"), _album("new 2")]
         monkeypatch.setattr(
             SpotifyClient,
-            "get_library_albums_cached",
-            lambda _: 2/0,
+            "stream_library_albums",
+            _stream(LibraryChunk(albums=cached), LibraryChunk(albums=new[:1], index=0),
+                    LibraryChunk(albums=new[1:], index=1)),
         )
         app = LibraryApp()
 
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            data_table = app.query_one(DataTable)
+
+            assert _table_names(data_table) == ["new 1", "new 2", "cached 1", "cached 2"]
+
+    @pytest.mark.asyncio
+    async def test_synced_albums_update_changed_rows_in_place(self, monkeypatch):
+        a, b = _album("a"), _album("b")
+        monkeypatch.setattr(SpotifyClient, "stream_library_albums", _stream(LibraryChunk(albums=[a, b])))
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            data_table = app.query_one(DataTable)
+            kept_row = data_table.rows[a.uri]
+
+            new = _album("new")
+            add_row = MagicMock(wraps=data_table.add_row)
+            monkeypatch.setattr(data_table, "add_row", add_row)
+            app.query_one(Library).post_message(AlbumsSynced([a, b._replace(name="b renamed"), new]))
+            await pilot.pause()
+
+            assert _table_names(data_table) == ["a", "b renamed", "new"]
+            add_row.assert_called_once()
+            assert data_table.rows[a.uri] is kept_row
+
+    @pytest.mark.asyncio
+    async def test_synced_albums_inserted_above_keep_the_cursor_row(self, monkeypatch):
+        a, b, c = (_album(name) for name in ("a", "b", "c"))
+        monkeypatch.setattr(SpotifyClient, "stream_library_albums", _stream(LibraryChunk(albums=[a, b, c])))
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            data_table = app.query_one(DataTable)
+            data_table.move_cursor(row=1)
+
+            app.query_one(Library).post_message(AlbumsSynced([_album("new"), a, b]))
+            await pilot.pause()
+
+            assert _table_names(data_table) == ["new", "a", "b"]
+            # cursor follows "b" to its new index
+            assert data_table.cursor_row == 2
+
+    @pytest.mark.asyncio
+    async def test_synced_albums_inserted_at_the_top_only_add_the_new_rows(self, monkeypatch):
+        albums = [_album(f"album {i}") for i in range(1000)]
+        monkeypatch.setattr(SpotifyClient, "stream_library_albums", _stream(LibraryChunk(albums=albums)))
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            data_table = app.query_one(LibraryTable)
+            calls = _spy_rows(monkeypatch, data_table)
+
+            new = [_album("new 1"), _album("new 2")]
+            app.query_one(Library).post_message(AlbumsSynced([*new, *albums]))
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+
+            assert _table_names(data_table) == [album.name for album in new + albums]
+            assert calls["add_row"].call_count == 2
+            calls["remove_row"].assert_not_called()
+            calls["clear"].assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_synced_albums_removed_in_the_middle_only_remove_their_rows(self, monkeypatch):
+        albums = [_album(f"album {i}") for i in range(1000)]
+        monkeypatch.setattr(SpotifyClient, "stream_library_albums", _stream(LibraryChunk(albums=albums)))
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            data_table = app.query_one(LibraryTable)
+            calls = _spy_rows(monkeypatch, data_table)
+
+            kept = albums[:500] + albums[501:]
+            app.query_one(Library).post_message(AlbumsSynced(kept))
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+
+            assert _table_names(data_table) == [album.name for album in kept]
+            calls["remove_row"].assert_called_once_with(albums[500].uri)
+            calls["add_row"].assert_not_called()
+            calls["clear"].assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_removing_most_rows_rebuilds_the_table(self, monkeypatch):
+        albums = [_album(f"album {i}") for i in range(5000)]
+        monkeypatch.setattr(SpotifyClient, "stream_library_albums", _stream(LibraryChunk(albums=albums)))
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            data_table = app.query_one(LibraryTable)
+            assert data_table.row_count == 5000
+            calls = _spy_rows(monkeypatch, data_table)
+
+            await data_table.patch_rows([Library._row(album) for album in albums[::500]], Library.ROWS_PER_SLICE)
+
+            # removing 4990 rows one by one re-indexes the table each time
+            assert _table_names(data_table) == [album.name for album in albums[::500]]
+            calls["clear"].assert_called_once()
+            calls["remove_row"].assert_not_called()
+            assert calls["add_row"].call_count == 10
+
+    @pytest.mark.asyncio
+    async def test_rows_are_added_a_slice_at_a_time(self):
+        app = App()
+
         async with app.run_test():
+            data_table = LibraryTable()
+            await app.mount(data_table)
+            data_table.add_columns(*Library.TABLE_COL)
+            slices = []
+
+            rows = [Library._row(_album(f"album {i}")) for i in range(1050)]
+            await data_table.append_rows(rows, Library.ROWS_PER_SLICE,
+                                         on_slice=lambda: slices.append(data_table.row_count) and False)
+
+            assert slices == [*range(100, 1001, 100), 1050]
+
+    @pytest.mark.asyncio
+    async def test_filter_shows_only_matching_albums_and_escape_restores_them(self, monkeypatch):
+        albums = [_album(name) for name in ("Kid A", "Amnesiac", "Kid Koala")]
+        index = LibraryIndex()
+        index.add(albums)
+
+        async def get_library_index_async(_):
+            return index
+
+        monkeypatch.setattr(SpotifyClient, "stream_library_albums", _stream(LibraryChunk(albums=albums)))
+        monkeypatch.setattr(SpotifyClient, "get_library_index_async", get_library_index_async)
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            data_table = app.query_one(DataTable)
+            data_table.focus()
+
+            await pilot.press("slash", "k", "i", "d")
+            await pilot.pause()
+            filtered = app.query_one("#library_filtered", DataTable)
+            assert app.query_one("#library_filter", Input).has_focus
+            assert _table_names(filtered) == ["Kid A", "Kid Koala"]
+            assert data_table.has_class("invisible") and not filtered.has_class("invisible")
+
+            await pilot.press("escape")
+            await pilot.pause()
+            assert _table_names(data_table) == ["Kid A", "Amnesiac", "Kid Koala"]
+            assert filtered.has_class("invisible") and not data_table.has_class("invisible")
+            assert data_table.has_focus
+
+    @pytest.mark.asyncio
+    async def test_filtering_a_big_library_leaves_the_full_table_alone(self, monkeypatch):
+        albums = [_album(f"album {i}") for i in range(5000)]
+        index = LibraryIndex()
+        index.add(albums)
+
+        async def get_library_index_async(_):
+            return index
+
+        monkeypatch.setattr(SpotifyClient, "stream_library_albums", _stream(LibraryChunk(albums=albums)))
+        monkeypatch.setattr(SpotifyClient, "get_library_index_async", get_library_index_async)
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            data_table = app.query_one(DataTable)
+            data_table.focus()
+            assert data_table.row_count == 5000
+            calls = _spy_rows(monkeypatch, data_table)
+            filtered = app.query_one("#library_filtered", LibraryTable)
+            filtered_calls = _spy_rows(monkeypatch, filtered)
+
+            await pilot.press("slash", "a", "l", "b", "u", "m", "space", "1", "2", "3")
+            await app.workers.wait_for_complete()
+            matches = ["album 123", *(f"album 123{i}" for i in range(10))]
+            assert _table_names(filtered) == matches
+
+            await pilot.press("escape")
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            assert not data_table.has_class("invisible") and data_table.row_count == 5000
+
+            # narrowing and restoring rebuilt all 5000 rows, now the full table is only shown and hidden
+            for spy in calls.values():
+                spy.assert_not_called()
+            # and every key pressed adds at most a filter's worth of rows to the filtered one
+            keys_pressed = len("album 123")
+            assert filtered_calls["add_row"].call_count <= Library.FILTER_LIMIT * keys_pressed
+
+    @pytest.mark.asyncio
+    async def test_prefetches_tracklist_of_the_row_the_cursor_rests_on_and_plays_it(self, monkeypatch):
+        albums = [_album(name) for name in ("a", "b", "c")]
+        prefetched = []
+        played = []
+
+        async def prefetch_album_tracks_async(_, album_id):
+            prefetched.append(album_id)
+
+        async def play_library_album(_, album_id):
+            played.append(album_id)
+            return "first track"
+
+        monkeypatch.setattr(SpotifyClient, "stream_library_albums", _stream(LibraryChunk(albums=albums)))
+        monkeypatch.setattr(SpotifyClient, "prefetch_album_tracks_async", prefetch_album_tracks_async)
+        monkeypatch.setattr(SpotifyClient, "play_library_album", play_library_album)
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause(Library.PREFETCH_DELAY * 2)
+            data_table = app.query_one(DataTable)
+            data_table.focus()
+            prefetched.clear()
+
+            # scrolling past "b" prefetches nothing, resting on "c" does
+            await pilot.press("down", "down")
+            await pilot.pause(Library.PREFETCH_DELAY * 2)
+            assert prefetched == [albums[2].id]
+
+            await pilot.press("enter")
+            await pilot.pause()
+            assert played == [albums[2].id]
+            assert [message.track for message in app.played] == ["first track"]
+
+    @pytest.mark.asyncio
+    async def test_prefetches_covers_around_the_cursor_nearest_first(self, monkeypatch):
+        albums = [_album(f"album {i}")._replace(image_url=f"https://img/{i}") for i in range(8)]
+        prefetcher = MagicMock()
+
+        async def prefetch_album_tracks_async(_, album_id):
+            pass
+
+        monkeypatch.setattr(SpotifyClient, "stream_library_albums", _stream(LibraryChunk(albums=albums)))
+        monkeypatch.setattr(SpotifyClient, "prefetch_album_tracks_async", prefetch_album_tracks_async)
+        monkeypatch.setattr(pixelate_images, "get_album_art_prefetcher", lambda: prefetcher)
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            data_table = app.query_one(DataTable)
+            data_table.focus()
+            await pilot.press("down", "down", "down")
+            await pilot.pause(Library.PREFETCH_DELAY * 2)
+
+            lane, urls = prefetcher.prefetch.call_args.args
+            assert lane == "library"
+            assert urls == [f"https://img/{i}" for i in (3, 2, 4, 1, 5)]
+
+    @pytest.mark.asyncio
+    async def test_show_error_when_fetching_failed(self, monkeypatch):
+        async def failing_stream(_):
+            yield 2/0
+
+        monkeypatch.setattr(
+            SpotifyClient,
+            "stream_library_albums",
+            failing_stream,
+        )
+        app = LibraryApp()
+
+        async with app.run_test() as pilot:
+            await pilot.pause()
             assert app.query_one("#albums_loading", LoadingIndicator).display == False
 
             data_table = app.query_one(DataTable)
             assert len(data_table.rows) == 0
 
             static = app.query_one("#albums_error", Static)
-            assert static.content == "Error: Failed loading albums, try again later"
\ No newline at end of file
+            assert static.content == "Error: Failed loading albums, try again later"
@@ -1,10 +1,19 @@
+import threading
+from io import BytesIO
+from unittest.mock import MagicMock
+
 import pytest
+from PIL import Image
 from textual.app import App, ComposeResult
 from textual.widgets import Static
 
 from spotify_cli.app.widgets.track_details import TrackDetail
+from spotify_cli.core.caching import ImageBytesCache
+from spotify_cli.schemas.images import SpotifyImage
 from spotify_cli.schemas.track import Track
 from spotify_cli.tests.utils import generate_test_track_instance
+from spotify_cli.utils import pixelate_images
+from spotify_cli.utils.pixelate_images import AlbumArtCache
 
 
 class TrackDetailApp(App):
@@ -36,3 +45,74 @@ class TestTrackDetails:
             assert track_details_statics[0].content == f"Track: {track.name}"
             assert track_details_statics[1].content == f"Album: {track.album.name}"
             assert track_details_statics[2].content == f"Artist: {track.artist}"
+
+    @pytest.mark.asyncio
+    async def test_track_changes_update_the_details_in_place(self):
+        track = generate_test_track_instance()
+        app = TrackDetailApp(track)
+
+        async with app.run_test() as pilot:
+            detail = app.query_one(TrackDetail)
+            name = app.query_one("#track_name", Static)
+            layout = app.query_one("#track_layout")
+
+            detail.track = track.model_copy(update={"is_playing": True})
+            await pilot.pause()
+            detail.track = track.model_copy(update={"name": "next song"})
+            await pilot.pause()
+
+            assert app.query_one("#track_name", Static) is name
+            assert app.query_one("#track_layout") is layout
+            assert name.content == "Track: next song"
+            assert len(detail.update_timings) == 2
+
+    @pytest.mark.asyncio
+    async def test_clearing_the_track_hides_the_details(self):
+        app = TrackDetailApp(generate_test_track_instance())
+
+        async with app.run_test() as pilot:
+            detail = app.query_one(TrackDetail)
+            assert app.query_one("#no_track").has_class("invisible")
+
+            detail.track = None
+            await pilot.pause()
+            assert not app.query_one("#no_track").has_class("invisible")
+            assert app.query_one("#track_layout").has_class("invisible")
+
+            detail.track = generate_test_track_instance()
+            await pilot.pause()
+            assert app.query_one("#no_track").has_class("invisible")
+            assert not app.query_one("#track_layout").has_class("invisible")
+
+    @pytest.mark.asyncio
+    async def test_cover_is_rendered_off_the_event_loop_at_the_fitted_size(self, monkeypatch, tmp_path):
+        buffer = BytesIO()
+        Image.new("RGB", (64, 64), (200, 30, 30)).save(buffer, format="PNG")
+        monkeypatch.setattr(pixelate_images, "get", MagicMock(return_value=MagicMock(content=buffer.getvalue())))
+        cache = AlbumArtCache(disk=ImageBytesCache(tmp_path))
+        monkeypatch.setattr(pixelate_images, "_album_art_cache", cache)
+
+        rendered_on = []
+        render = AlbumArtCache._render
+
+        def recording_render(image, size):
+            rendered_on.append((threading.current_thread().name, size))
+            return render(image, size)
+
+        monkeypatch.setattr(AlbumArtCache, "_render", staticmethod(recording_render))
+        track = generate_test_track_instance()
+        track.album.images = [SpotifyImage(url="https://i.scdn.co/image/abc", height=64, width=64)]
+        app = TrackDetailApp(track)
+
+        async with app.run_test(size=(120, 40)) as pilot:
+            await pilot.pause(0.2)
+            await app.workers.wait_for_complete()
+            detail = app.query_one(TrackDetail)
+
+            shown = detail._cover_size
+            assert shown != TrackDetail.COVER_SIZE
+            assert cache.shown_size == shown
+            assert cache.peek("https://i.scdn.co/image/abc", shown) is not None
+            assert all(thread.startswith("art-render") for thread, _ in rendered_on)
+            assert rendered_on[0][1] == shown
+            assert len(detail.cover_timings) == 1
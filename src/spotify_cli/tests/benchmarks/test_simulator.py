@@ -0,0 +1,149 @@
+import pytest
+import requests
+
+from spotify_cli.benchmarks.simulator import SpotifySimulator, SimulatorConfig
+from spotify_cli.core.library_store import LibraryStore
+from spotify_cli.core.spotify import SearchElementTypes
+
+
+@pytest.fixture
+def simulator():
+    with SpotifySimulator(SimulatorConfig(latency_ms=0, jitter_ms=0, library_size=120)) as sim:
+        yield sim
+
+
+@pytest.fixture
+def client(simulator, tmp_path):
+    client = simulator.client(library=LibraryStore(tmp_path / "library.sqlite3"))
+    yield client
+    client.transport.close()
+    client.library.close()
+
+
+class TestSpotifySimulator:
+    def test_devices_start_with_one_active_device(self, client):
+        device = client.get_first_active_device()
+
+        assert device is not None
+        assert device.id == "simdevice0"
+
+    def test_no_playback_state_before_playing(self, client):
+        assert client.get_playback_state() is None
+
+    def test_library_sync_pages_through_whole_library(self, simulator, client):
+        albums = client.get_library_albums_cached()
+
+        assert len(albums) == 120
+        # one freshness peek + ceil(120 / 50) pages
+        assert simulator.stats.requests["GET /v1/me/albums"] == 1 + 3
+
+    def test_reconcile_removes_albums_unsaved_elsewhere(self, simulator, client):
+        albums = client.get_library_albums_cached()
+        unsaved = [albums[0].id, albums[77].id]
+        simulator.library.unsave(unsaved)
+        requests_before = simulator.stats.total_requests
+
+        result = client.reconcile_library(ttl_sec=0)
+
+        assert sorted(result.removed) == sorted(unsaved)
+        assert [a.id for a in client.library.albums()] == simulator.library.saved
+        assert client.library.get_meta("latest_added_at") == client.library.albums(limit=1)[0].added_at
+        # the 3 pages (fetched once each) and one contains check per removal
+        assert simulator.stats.total_requests - requests_before == 3 + 2
+        assert not client.reconcile_library().changed
+
+    @pytest.mark.asyncio
+    async def test_stream_library_albums_streams_network_then_stored_pages(self, client):
+        cold = [chunk async for chunk in client.stream_library_albums(page_size=50)]
+        warm = [chunk async for chunk in client.stream_library_albums(page_size=50)]
+
+        # cold: nothing stored, every sync window is inserted in order
+        assert [chunk.index for chunk in cold] == [0, 50]
+        assert sum(len(chunk.albums) for chunk in cold) == 120
+        # warm: stored pages are appended and the fresh ttl skips the network
+        assert [chunk.index for chunk in warm] == [None, None, None]
+        assert [a.id for chunk in warm for a in chunk.albums] == [a.id for chunk in cold for a in chunk.albums]
+
+    def test_search_returns_parsable_results(self, client):
+        res = client.search_spotify_suggestions("album 11", search_element=SearchElementTypes.ALBUM, limit=5)
+
+        assert res.total > 0
+        assert all("11" in album.name for album in res.items)
+
+    def test_search_total_counts_every_match_not_the_page(self, client):
+        res = client.search_spotify_suggestions("album 1", search_element=SearchElementTypes.ALBUM, limit=5)
+
+        # album 1, 10-19 and 100-119
+        assert res.total == 31
+        assert len(res.items) == 5
+
+    def test_playing_another_album_while_playing_starts_it_from_the_beginning(self, simulator):
+        player = simulator.player
+        player.play(None, f"spotify:album:{simulator.library.album_id(1)}", None)
+        # a minute into the first album
+        player._resumed_at -= 60
+
+        player.play(None, f"spotify:album:{simulator.library.album_id(2)}", None)
+
+        assert player.progress_ms() < 1000
+
+    @pytest.mark.asyncio
+    async def test_play_album_then_pause(self, client):
+        album = client.get_library_albums_cached()[3]
+
+        await client.play_by_uris_or_context_uri(context_uri=album.uri)
+        state = client.get_playback_state()
+        assert state.is_playing
+        assert state.track.album.id == album.id
+
+        client.play_or_pause_track()
+        assert client.get_playback_state().is_playing is False
+
+    @pytest.mark.asyncio
+    async def test_playing_a_prefetched_album_needs_no_tracklist_request(self, simulator, client):
+        album = client.get_library_albums_cached()[5]
+        await client.prefetch_album_tracks_async(album.id)
+        tracks_requests = simulator.stats.requests[f"GET /v1/albums/{album.id}/tracks"]
+
+        track = await client.play_library_album(album.id)
+
+        assert track.album.id == album.id
+        assert track.track_number == 1
+        assert simulator.stats.requests[f"GET /v1/albums/{album.id}/tracks"] == tracks_requests == 1
+        assert client.tracklists.stats.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_next_queued_album_is_the_next_album_on_its_last_track(self, simulator, client):
+        assert client.get_next_queued_album() is None
+        album = client.get_library_albums_cached()[2]
+        await client.play_by_uris_or_context_uri(context_uri=album.uri)
+
+        assert client.get_next_queued_album().id == album.id
+
+        last_track = f"spotify:track:{album.id}{simulator.config.tracks_per_album:02d}"
+        await client.play_by_uris_or_context_uri(uris=[last_track])
+        assert client.get_next_queued_album().id == simulator.library.album_id(3)
+
+    @pytest.mark.asyncio
+    async def test_unchanged_playback_state_is_answered_with_304(self, simulator, client):
+        album = client.get_library_albums_cached()[0]
+        await client.play_by_uris_or_context_uri(context_uri=album.uri)
+
+        first = client.get_playback_state()
+        second = client.get_playback_state()
+
+        assert second is first
+        assert simulator.stats.not_modified == 1
+        assert client.playback_etag_stats.hits == 1
+
+    def test_rate_limit_returns_429_with_retry_after(self):
+        config = SimulatorConfig(latency_ms=0, jitter_ms=0, rate_limit=2, retry_after_sec=7)
+        with SpotifySimulator(config) as simulator:
+            url = f"{simulator.url}/v1/me/player/devices"
+            statuses = [requests.get(url).status_code for _ in range(2)]
+            throttled = requests.get(url)
+
+        assert statuses == [200, 200]
+        assert throttled.status_code == 429
+        assert throttled.headers["Retry-After"] == "7"
+        assert simulator.stats.rate_limited == 1
@@ -0,0 +1,31 @@
+from spotify_cli.benchmarks.startup import DEFERRED_MODULES, measure_cold_start, measure_imports, parse_importtime
+
+IMPORTTIME_REPORT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _abc
+import time:      4303 |      13601 |   PIL.Image
+import time:       206 |      20000 | spotify_cli.entry_points
+"""
+
+
+class TestStartup:
+    def test_parse_importtime(self):
+        profile = parse_importtime(IMPORTTIME_REPORT, "spotify_cli.entry_points")
+
+        assert profile.total_ms == 20.0
+        assert profile.slowest(1) == [("PIL.Image", 4.303)]
+        assert profile.modules == {"_abc", "PIL.Image", "spotify_cli.entry_points"}
+
+    def test_entry_point_does_not_import_deferred_modules(self):
+        profile = measure_imports()
+
+        assert profile.total_ms > 0
+        eager = [
+            name for name in profile.modules
+            if any(name == deferred or name.startswith(f"{deferred}.") for deferred in DEFERRED_MODULES)
+        ]
+        assert eager == []
+
+    def test_cold_start_reaches_first_paint(self):
+        timings = measure_cold_start()
+
+        assert 0 < timings["import_ms"] < timings["cold_start_ms"]
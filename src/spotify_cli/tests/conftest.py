@@ -0,0 +1,16 @@
+import pytest
+
+from spotify_cli.core import spotify
+from spotify_cli.core.library_store import LibraryStore
+
+
+@pytest.fixture(autouse=True)
+def library_store(tmp_path, monkeypatch):
+    """
+    The store every client built without a library gets, in tmp_path instead of the user cache dir (where it would
+    also import and delete the developer's saved albums cache). The caches kept next to the store follow it there.
+    """
+    store = LibraryStore(tmp_path / "user_cache" / "library.sqlite3")
+    monkeypatch.setattr(spotify, "get_library_store", lambda: store)
+    yield store
+    store.close()
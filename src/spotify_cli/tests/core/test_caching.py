@@ -0,0 +1,156 @@
+import gc
+import json
+import os
+
+import pytest
+from pydantic import ValidationError
+
+from spotify_cli.core.caching import ImageBytesCache, SavedAlbumsCache, SavedAlbumsModel, EntryModel, \
+    SessionSnapshotCache, SessionSnapshotModel, _gc_paused
+from spotify_cli.core.codecs import binary_codec
+from spotify_cli.core.library_record import LibraryAlbum
+from spotify_cli.tests.utils import generate_test_album_search_item, generate_test_device, \
+    generate_test_playback_state
+
+
+class TestImageBytesCache:
+    def test_get_returns_none_when_missing(self, tmp_path):
+        cache = ImageBytesCache(tmp_path)
+
+        assert cache.get("https://i.scdn.co/image/missing") is None
+
+    def test_put_then_get_round_trips_bytes(self, tmp_path):
+        cache = ImageBytesCache(tmp_path)
+        cache.put("https://i.scdn.co/image/abc", b"image-bytes")
+
+        assert cache.get("https://i.scdn.co/image/abc") == b"image-bytes"
+
+    def test_files_are_content_addressed_by_url(self, tmp_path):
+        cache = ImageBytesCache(tmp_path)
+        url = "https://i.scdn.co/image/abc"
+        cache.put(url, b"image-bytes")
+
+        key = ImageBytesCache.key(url)
+        assert (tmp_path / key[:2] / key).read_bytes() == b"image-bytes"
+
+    def test_evicts_least_recently_used_when_over_max_bytes(self, tmp_path):
+        cache = ImageBytesCache(tmp_path, max_bytes=25)
+        cache.put("old", b"x" * 10)
+        cache.put("used", b"x" * 10)
+        old_path = tmp_path / ImageBytesCache.key("old")[:2] / ImageBytesCache.key("old")
+        os.utime(old_path, (0, 0))
+
+        cache.put("new", b"x" * 10)
+
+        assert cache.get("old") is None
+        assert cache.get("used") is not None
+        assert cache.get("new") is not None
+
+    def test_invalidate_removes_everything(self, tmp_path):
+        cache = ImageBytesCache(tmp_path)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+
+        cache.invalidate()
+
+        assert cache.get("a") is None
+        assert cache.get("b") is None
+
+
+def _saved_albums(count: int = 3) -> SavedAlbumsModel:
+    entries = [
+        EntryModel(album=generate_test_album_search_item(f"album {i}"), added_at=f"2025-01-{i + 1:02d}T00:00:00Z")
+        for i in range(count)
+    ]
+    return SavedAlbumsModel(entries=entries, album_ids=[entry.album.id for entry in entries], updated_ts=10.0)
+
+
+class TestJsonCacheLoad:
+    def test_own_files_round_trip(self, tmp_path):
+        cache = SavedAlbumsCache(tmp_path / "saved_albums.json")
+        model = _saved_albums()
+        cache.save(model)
+
+        loaded = cache.load()
+
+        assert loaded == model
+        assert loaded.entries[0].album.artists[0].name == "test artist"
+
+    def test_nested_optionals_and_records_round_trip(self, tmp_path):
+        cache = SessionSnapshotCache(tmp_path / "session.json")
+        album = generate_test_album_search_item()
+        snapshot = SessionSnapshotModel(
+            playback=generate_test_playback_state(),
+            device=generate_test_device(),
+            library_head=[LibraryAlbum.from_album(album, "2025-01-01T00:00:00Z")],
+            saved_ts=1.0,
+        )
+        cache.save(snapshot)
+
+        loaded = cache.load()
+
+        assert loaded == snapshot
+        assert loaded.playback.actions.disallows.pausing is False
+        assert isinstance(loaded.library_head[0], LibraryAlbum)
+
+    def test_json_with_a_checksum_mismatch_is_still_validated(self, tmp_path):
+        cache = SavedAlbumsCache(tmp_path / "saved_albums.json")
+        cache.save(_saved_albums())
+        header, body = cache.path.read_bytes().split(b"\n", 1)
+        cache.path.write_bytes(header + b"\n" + body.replace(b"album 0", b"album X"))
+
+        loaded = cache.load()
+
+        assert loaded.entries[0].album.name == "album X"
+
+    def test_files_without_a_header_are_validated(self, tmp_path):
+        cache = SavedAlbumsCache(tmp_path / "saved_albums.json")
+        model = _saved_albums()
+        cache.path.write_text(json.dumps({**model.model_dump(), "schema_version": 1}))
+
+        assert cache.load() == model
+
+    def test_data_missing_required_fields_is_validated(self, tmp_path):
+        cache = SessionSnapshotCache(tmp_path / "session.json")
+        cache.save(SessionSnapshotModel(device=generate_test_device()))
+        header, body = cache.path.read_bytes().split(b"\n", 1)
+        data = json.loads(body)
+        del data["device"]["name"]
+        body = json.dumps(data).encode()
+        checksum = cache._checksum(body)
+        cache.path.write_bytes(json.dumps({**json.loads(header), "checksum": checksum}).encode() + b"\n" + body)
+
+        with pytest.raises(ValidationError):
+            cache.load()
+
+    def test_files_of_another_codec_load_and_are_rewritten_on_save(self, tmp_path):
+        path = tmp_path / "saved_albums.json"
+        model = _saved_albums()
+        SavedAlbumsCache(path).save(model)
+        cache = SavedAlbumsCache(path, codec=binary_codec())
+
+        assert cache.load() == model
+
+        cache.save(model)
+        assert json.loads(path.read_bytes().split(b"\n", 1)[0])["codec"] == binary_codec().name
+        assert SavedAlbumsCache(path).load() == model
+
+    def test_damaged_binary_files_are_a_miss(self, tmp_path):
+        cache = SavedAlbumsCache(tmp_path / "saved_albums.json", codec=binary_codec())
+        cache.save(_saved_albums())
+        raw = cache.path.read_bytes()
+        cache.path.write_bytes(raw[:-10] + bytes(10))
+
+        assert cache.load() is None
+
+    def test_overlapping_loads_keep_gc_paused_until_the_last_one_ends(self):
+        assert gc.isenabled()
+        first, second = _gc_paused(), _gc_paused()
+
+        first.__enter__()
+        second.__enter__()
+        first.__exit__(None, None, None)
+        assert not gc.isenabled()
+
+        second.__exit__(None, None, None)
+        assert gc.isenabled()
@@ -0,0 +1,39 @@
+import pytest
+
+from spotify_cli.core.codecs import COMPRESSORS, JSON, JSON_CODEC, MARSHAL, Codec, binary_codec, get_codec
+
+DATA = {"docs": [["id", "spotify:album:id", "name", 1 << 100]], "postings": {" na": [0]}, "ts": 1.5, "none": None}
+
+
+def _codecs() -> list[Codec]:
+    return [Codec(serializer, compressor) for serializer in (JSON, MARSHAL) for compressor in
+            (None, *COMPRESSORS.values())]
+
+
+class TestCodecs:
+    @pytest.mark.parametrize("codec", _codecs(), ids=lambda codec: codec.name)
+    def test_round_trips_through_the_name_in_the_header(self, codec):
+        body = codec.encode(DATA)
+
+        assert get_codec(codec.name).decode(body) == DATA
+
+    def test_unknown_codecs_are_rejected(self):
+        with pytest.raises(ValueError):
+            get_codec("marshal0")
+        with pytest.raises(ValueError):
+            get_codec("json+brotli")
+
+    def test_corrupted_binary_body_raises_value_error(self):
+        codec = binary_codec()
+        body = codec.encode(DATA)
+
+        with pytest.raises(ValueError):
+            codec.decode(body[: len(body) // 2])
+
+    def test_json_is_the_default(self):
+        assert JSON_CODEC.name == "json"
+
+    def test_uses_zstd_when_installed(self):
+        pytest.importorskip("zstandard")
+
+        assert binary_codec().name.endswith("+zstd")
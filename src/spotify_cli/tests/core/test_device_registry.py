@@ -0,0 +1,68 @@
+from unittest.mock import MagicMock
+
+from spotify_cli.core.device_registry import DeviceRegistry
+from spotify_cli.core.spotify import SpotifyClient
+from spotify_cli.tests.utils import MockSpotify, generate_test_device, generate_test_playback_state
+
+
+class TestDeviceRegistry:
+    def test_devices_expire_after_ttl(self, monkeypatch):
+        now = 100.0
+        monkeypatch.setattr("spotify_cli.core.device_registry.time.monotonic", lambda: now)
+        registry = DeviceRegistry(ttl_sec=5)
+        devices = [generate_test_device()]
+
+        assert registry.get() is None
+        registry.put(devices)
+        assert registry.get() == devices
+
+        now += 6
+        assert registry.get() is None
+        # stale devices are still there to render while refreshing
+        assert registry.peek() == devices
+
+    def test_set_active_updates_devices_in_place(self):
+        registry = DeviceRegistry()
+        old, new = generate_test_device(name="old", is_active=True), generate_test_device(name="new")
+        registry.put([old, new])
+
+        registry.set_active(new.id)
+
+        assert [device.is_active for device in registry.get()] == [False, True]
+
+    def test_set_active_on_unknown_device_invalidates(self):
+        registry = DeviceRegistry()
+        registry.put([generate_test_device()])
+
+        registry.set_active("unknown")
+
+        assert registry.peek() is None
+
+    def test_client_reads_devices_from_registry_until_it_expires(self):
+        mock_spotify = MockSpotify()
+        mock_spotify.devices = MagicMock(return_value={"devices": [generate_test_device(is_active=True).model_dump()]})
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        sp_client.get_devices()
+        sp_client.get_first_active_device()
+        assert mock_spotify.devices.call_count == 1
+
+        sp_client.get_devices(fresh=True)
+        assert mock_spotify.devices.call_count == 2
+
+    def test_transfer_playback_marks_the_device_active(self):
+        current, other = generate_test_device(name="current", is_active=True), generate_test_device(name="other")
+        mock_spotify = MockSpotify()
+        mock_spotify.devices = MagicMock(return_value={"devices": [current.model_dump(), other.model_dump()]})
+        mock_spotify.transfer_playback = MagicMock()
+        sp_client = SpotifyClient(sp=mock_spotify)
+        sp_client.get_playback_state = MagicMock(
+            return_value=generate_test_playback_state(is_playing=False, device_id=current.id)
+        )
+        sp_client.get_devices()
+
+        sp_client.play_or_pause_track(active_device=other)
+
+        mock_spotify.transfer_playback.assert_called_once_with(device_id=other.id)
+        assert sp_client.get_first_active_device().id == other.id
+        assert mock_spotify.devices.call_count == 1
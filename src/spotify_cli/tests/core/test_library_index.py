@@ -0,0 +1,102 @@
+
+from spotify_cli.core.library_index import LibraryIndex, LibraryIndexCache, normalize
+from spotify_cli.core.library_record import LibraryAlbum
+from spotify_cli.tests.utils import generate_test_album_search_item, generate_artist_search_item
+
+
+def _entry(name: str, artist: str = "test artist", added_at: str = "2025-01-01T00:00:00Z") -> LibraryAlbum:
+    album = generate_test_album_search_item(name)
+    album.artists = [generate_artist_search_item().model_copy(update={"name": artist})]
+    return LibraryAlbum.from_album(album, added_at)
+
+
+def _names(results) -> list[str]:
+    return [result.name for result in results]
+
+
+class _CountingList(list):
+    """Counts the albums a search reads"""
+    reads = 0
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return super().__getitem__(index)
+
+
+class TestLibraryIndex:
+    def test_normalize_strips_case_accents_and_punctuation(self):
+        assert normalize("Beyoncé – Lemonade!") == "beyonce lemonade"
+        assert normalize("Sigur Rós") == "sigur ros"
+
+    def test_matches_album_and_artist_names(self):
+        index = LibraryIndex()
+        index.add([_entry("Kid A", "Radiohead"), _entry("Ágætis byrjun", "Sigur Rós")])
+
+        assert _names(index.search("radio")) == ["Kid A"]
+        assert _names(index.search("agætis")) == ["Ágætis byrjun"]
+        assert _names(index.search("SIGUR ROS")) == ["Ágætis byrjun"]
+
+    def test_two_letters_only_match_word_starts(self):
+        index = LibraryIndex()
+        index.add([_entry("Kid A", "Radiohead"), _entry("Abbey Road", "The Beatles")])
+
+        assert _names(index.search("ra")) == ["Kid A"]
+        assert index.search("a") == []
+
+    def test_name_prefix_matches_rank_first_then_newest(self):
+        index = LibraryIndex()
+        index.add([
+            _entry("Blue Train", "John Coltrane", added_at="2025-03-01T00:00:00Z"),
+            _entry("Train of Thought", "Someone", added_at="2024-01-01T00:00:00Z"),
+            _entry("Mystery Train", "Someone", added_at="2025-01-01T00:00:00Z"),
+        ])
+
+        assert _names(index.search("train")) == ["Train of Thought", "Blue Train", "Mystery Train"]
+        assert _names(index.search("train", limit=1)) == ["Train of Thought"]
+
+    def test_falls_back_to_fuzzy_matches_on_typos(self):
+        index = LibraryIndex()
+        index.add([_entry("In Rainbows", "Radiohead"), _entry("Blonde", "Frank Ocean")])
+
+        assert _names(index.search("radiohaed")) == ["In Rainbows"]
+
+    def test_readding_and_removing_updates_matches(self):
+        index = LibraryIndex()
+        entry = _entry("Old Name")
+        index.add([entry])
+
+        index.add([entry._replace(name="New Name")])
+        assert index.search("old") == []
+        assert _names(index.search("new")) == ["New Name"]
+
+        index.remove([entry.id])
+        assert index.search("new") == []
+        assert len(index) == 0
+
+    def test_cache_round_trip_compacts_removed_albums(self, tmp_path):
+        cache = LibraryIndexCache(tmp_path / "library_index.json")
+        index = LibraryIndex()
+        removed, kept = _entry("Removed"), _entry("Kept")
+        index.add([removed, kept])
+        index.remove([removed.id])
+
+        cache.save(index)
+        loaded = cache.load()
+
+        assert loaded.album_ids() == {kept.id}
+        assert _names(loaded.search("kept")) == ["Kept"]
+
+    def test_queries_only_verify_the_candidates_of_a_large_library(self):
+        index = LibraryIndex()
+        index.add([
+            LibraryAlbum.from_album(generate_test_album_search_item(f"album {i} volume {i % 97}"), f"{i:08d}")
+            for i in range(20000)
+        ])
+        index._docs = _CountingList(index._docs)
+
+        for query in ("album 1234", "volume 42", "1999"):
+            index._docs.reads = 0
+            matches = index.search(query)
+
+            # the postings narrow the 20000 albums down to about the matches
+            assert 0 < len(matches) <= index._docs.reads <= 2 * len(matches)
@@ -0,0 +1,195 @@
+import itertools
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from spotify_cli.core.library_reconcile import LibraryReconciler, PAGE_SIZE
+from spotify_cli.core.library_record import LibraryAlbum
+from spotify_cli.tests.utils import generate_test_album_search_item
+
+
+def _added_at(album_id: str, seconds: int = 0) -> str:
+    """`_ids` were saved a minute apart, newest first"""
+    saved = datetime(2025, 1, 1, tzinfo=timezone.utc) - timedelta(minutes=int(album_id.removeprefix("album")))
+    return (saved + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeLibrary:
+    def __init__(self, saved: list[str], added_at: Optional[dict[str, str]] = None):
+        self.saved = saved
+        self.added_at = added_at or {}
+        self.page_requests = 0
+
+    def added(self, album_id: str) -> str:
+        if album_id in self.added_at:
+            return self.added_at[album_id]
+        # anything else was saved after all of them
+        return _added_at(album_id) if album_id.startswith("album") else "2025-02-01T00:00:00Z"
+
+    def fetch_page(self, offset: int) -> dict:
+        self.page_requests += 1
+        items = [
+            {"added_at": self.added(album_id), "album": {"id": album_id}}
+            for album_id in self.saved[offset:offset + PAGE_SIZE]
+        ]
+        return {"items": items, "total": len(self.saved)}
+
+    def contains(self, album_ids: list[str]) -> list[bool]:
+        saved = set(self.saved)
+        return [album_id in saved for album_id in album_ids]
+
+
+def _record(item: dict) -> LibraryAlbum:
+    album = generate_test_album_search_item(item["album"]["id"]).model_copy(update={"id": item["album"]["id"]})
+    return LibraryAlbum.from_album(album, item["added_at"])
+
+
+def _reconcile(local: list[str], upstream: FakeLibrary, to_record=_record, unstored=(),
+               saved_again: Optional[dict[str, str]] = None) -> LibraryReconciler:
+    # stored with the added_at they had before they were saved again
+    keys = [(album_id, upstream.added(album_id)) for album_id in local]
+    upstream.added_at.update(saved_again or {})
+    reconciler = LibraryReconciler(keys, upstream.fetch_page, upstream.contains, to_record, unstored=unstored,
+                                   rng=random.Random(7))
+    reconciler.run()
+    return reconciler
+
+
+def _ids(n: int) -> list[str]:
+    return [f"album{i:05d}" for i in range(n)]
+
+
+class TestLibraryReconciler:
+    def test_unchanged_library_only_costs_the_sampled_pages(self):
+        local = _ids(1000)
+        upstream = FakeLibrary(list(local))
+
+        reconciler = _reconcile(local, upstream)
+
+        assert not reconciler.result.changed
+        assert reconciler.result.page_requests == upstream.page_requests <= LibraryReconciler.SAMPLE_PAGES + 2
+        assert reconciler.result.contains_requests == 0
+
+    def test_finds_albums_removed_in_the_middle(self):
+        local = _ids(1000)
+        removed = [local[137], local[138], local[612]]
+        upstream = FakeLibrary([album_id for album_id in local if album_id not in removed])
+
+        reconciler = _reconcile(local, upstream)
+
+        assert sorted(reconciler.result.removed) == sorted(removed)
+        assert reconciler.result.upserts == []
+        assert reconciler.local == upstream.saved
+
+    def test_finds_albums_removed_at_the_end(self):
+        local = _ids(120)
+        upstream = FakeLibrary(local[:-2])
+
+        reconciler = _reconcile(local, upstream)
+
+        assert reconciler.result.removed == local[-2:]
+        assert reconciler.local == upstream.saved
+
+    def test_album_saved_again_moves_up(self):
+        local = _ids(300)
+        upstream = FakeLibrary([local[250], *local[:250], *local[251:]])
+
+        reconciler = _reconcile(local, upstream, saved_again={local[250]: "2025-02-01T00:00:00Z"})
+
+        assert reconciler.result.removed == []
+        assert [record.id for record in reconciler.result.upserts] == [local[250]]
+        assert reconciler.local == upstream.saved
+
+    def test_album_missing_locally_is_added(self):
+        local = _ids(300)
+        upstream = FakeLibrary([*local[:70], "missed", *local[70:]])
+
+        reconciler = _reconcile(local, upstream)
+
+        assert [record.id for record in reconciler.result.upserts] == ["missed"]
+        assert reconciler.local == upstream.saved
+
+    def test_skipped_items_are_followed_but_not_stored(self):
+        local = _ids(300)
+        upstream = FakeLibrary([*local[:70], "pre-saved", *local[70:]])
+
+        reconciler = _reconcile(local, upstream, to_record=lambda item: None)
+
+        assert not reconciler.result.changed
+        assert reconciler.local == upstream.saved
+        assert reconciler.result.unstored == [("pre-saved", upstream.added("pre-saved"))]
+
+    def test_skipped_items_found_before_are_not_a_difference(self):
+        local = _ids(300)
+        upstream = FakeLibrary([*local[:70], "pre-saved", *local[70:]], {"pre-saved": _added_at(local[70], 30)})
+        skip_pre_saved = lambda item: None if item["album"]["id"] == "pre-saved" else _record(item)
+        first = _reconcile(local, upstream, to_record=skip_pre_saved).result
+
+        second = _reconcile(local, upstream, to_record=skip_pre_saved, unstored=first.unstored).result
+
+        assert first.divergences == 1
+        assert second.divergences == 0
+        assert not second.changed
+        assert second.unstored == first.unstored
+
+    def test_albums_sharing_an_added_at_match_in_any_order(self):
+        # saved in one go, upstream doesn't order them by id like the store does
+        local = _ids(300)
+        bulk = local[40:160]
+        upstream = FakeLibrary([*local[:40], *reversed(bulk), *local[160:]], dict.fromkeys(bulk, _added_at(bulk[0])))
+
+        reconciler = _reconcile(local, upstream)
+
+        assert not reconciler.result.changed
+        assert reconciler.result.divergences == 0
+        assert reconciler.result.contains_requests == 0
+
+    def test_album_removed_among_albums_sharing_an_added_at(self):
+        local = _ids(300)
+        bulk = local[40:160]
+        upstream = FakeLibrary([*local[:40], *[album_id for album_id in reversed(bulk) if album_id != local[100]],
+                                *local[160:]], dict.fromkeys(bulk, _added_at(bulk[0])))
+
+        reconciler = _reconcile(local, upstream)
+
+        assert reconciler.result.removed == [local[100]]
+        assert reconciler.result.upserts == []
+        assert reconciler.result.contains_requests == 1
+
+    def test_albums_removed_among_runs_sharing_an_added_at_longer_than_a_page(self):
+        for seed in range(50):
+            rng = random.Random(seed)
+            local, added_at = [], {}
+            while len(local) < 600:
+                run = _ids(len(local) + rng.choice([1, 2, 5, rng.randint(60, 80)]))[len(local):]
+                added_at.update(dict.fromkeys(run, _added_at(run[0])))
+                local += run
+            # upstream orders each run its own way
+            shuffled = []
+            for _, run in itertools.groupby(local, key=added_at.get):
+                run = list(run)
+                rng.shuffle(run)
+                shuffled += run
+            removed = rng.sample(local, 3)
+            upstream = FakeLibrary([album_id for album_id in shuffled if album_id not in removed], added_at)
+
+            reconciler = _reconcile(local, upstream)
+
+            assert sorted(reconciler.result.removed) == sorted(removed), seed
+            assert reconciler.result.upserts == []
+            assert reconciler.local == [album_id for album_id in local if album_id not in removed]
+
+    def test_requests_grow_with_changes_times_log_pages(self):
+        local = _ids(20000)
+        removed = local[1234], local[9876], local[15000]
+        upstream = FakeLibrary([album_id for album_id in local if album_id not in removed])
+
+        reconciler = _reconcile(local, upstream)
+
+        pages = math.ceil(len(local) / PAGE_SIZE)
+        assert sorted(reconciler.result.removed) == sorted(removed)
+        # a full sync would read all 400 pages
+        per_change = math.log2(pages) + LibraryReconciler.SAMPLE_PAGES
+        assert reconciler.result.page_requests <= (len(removed) + 1) * per_change
+        assert reconciler.result.contains_requests == len(removed)
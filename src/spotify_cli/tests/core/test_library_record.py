@@ -0,0 +1,31 @@
+from spotify_cli.core.library_record import LibraryAlbum, decode_markets, market_bit, market_mask
+from spotify_cli.tests.utils import generate_test_album_search_item
+
+
+class TestLibraryRecord:
+    def test_market_mask_round_trips_and_ignores_invalid_codes(self):
+        mask = market_mask(["US", "se", "ZZ", "AA", "EU1", ""])
+
+        assert sorted(decode_markets(mask)) == ["AA", "SE", "US", "ZZ"]
+        assert mask & market_bit("SE")
+        assert not mask & market_bit("DE")
+        assert market_bit("12") == 0
+
+    def test_artist_names_are_shared_between_records(self):
+        first = LibraryAlbum.from_album(generate_test_album_search_item("first"), "2025-01-01T00:00:00Z")
+        second = LibraryAlbum.from_album(generate_test_album_search_item("second"), "2025-01-02T00:00:00Z")
+
+        assert first.artists is second.artists
+        assert first.get_albums_artists() == "test artist"
+
+    def test_to_album_keeps_the_fields_the_ui_and_playback_use(self):
+        album = generate_test_album_search_item("album")
+        album.available_markets = ["SE", "US"]
+
+        restored = LibraryAlbum.from_album(album, "2025-01-01T00:00:00Z").to_album()
+
+        assert (restored.id, restored.uri, restored.name) == (album.id, album.uri, album.name)
+        assert restored.get_albums_artists() == album.get_albums_artists()
+        assert restored.artists[0].id == album.artists[0].id
+        assert sorted(restored.available_markets) == ["SE", "US"]
+        assert restored.get_album_image() is None
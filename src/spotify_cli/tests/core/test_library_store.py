@@ -0,0 +1,126 @@
+import sqlite3
+
+from spotify_cli.core.caching import EntryModel, SavedAlbumsCache, SavedAlbumsModel
+from spotify_cli.core.library_record import LibraryAlbum
+from spotify_cli.core.library_store import LibraryStore
+from spotify_cli.tests.utils import generate_test_album_search_item
+
+
+def _entry(name: str, added_at: str) -> LibraryAlbum:
+    return LibraryAlbum.from_album(generate_test_album_search_item(name), added_at)
+
+
+class TestLibraryStore:
+    def test_entries_are_returned_newest_added_first(self, tmp_path):
+        store = LibraryStore(tmp_path / "library.sqlite3")
+        old = _entry("old", "2024-01-01T00:00:00Z")
+        new = _entry("new", "2025-01-01T00:00:00Z")
+
+        store.upsert([old, new])
+
+        assert [album.name for album in store.albums()] == ["new", "old"]
+
+    def test_upsert_updates_existing_row_in_place(self, tmp_path):
+        store = LibraryStore(tmp_path / "library.sqlite3")
+        entry = _entry("before", "2024-01-01T00:00:00Z")
+        store.upsert([entry])
+
+        store.upsert([entry._replace(name="after")])
+
+        assert store.count() == 1
+        assert store.albums()[0].name == "after"
+
+    def test_delete_removes_only_given_ids(self, tmp_path):
+        store = LibraryStore(tmp_path / "library.sqlite3")
+        keep = _entry("keep", "2024-01-01T00:00:00Z")
+        remove = _entry("remove", "2024-02-01T00:00:00Z")
+        store.upsert([keep, remove])
+
+        store.delete([remove.id])
+
+        assert store.album_ids() == {keep.id}
+
+    def test_entries_can_be_paginated(self, tmp_path):
+        store = LibraryStore(tmp_path / "library.sqlite3")
+        store.upsert([_entry(f"album {i}", f"2024-01-{i + 1:02d}T00:00:00Z") for i in range(5)])
+
+        pages = list(store.iter_pages(page_size=2))
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert store.albums(offset=1, limit=2)[0].name == "album 3"
+
+    def test_meta_round_trips_json_values(self, tmp_path):
+        store = LibraryStore(tmp_path / "library.sqlite3")
+
+        store.apply(meta={"updated_ts": 12.5, "latest_added_at": "2025-01-01T00:00:00Z"})
+
+        assert store.get_meta("updated_ts") == 12.5
+        assert store.get_meta("latest_added_at") == "2025-01-01T00:00:00Z"
+        assert store.get_meta("missing", "default") == "default"
+
+    def test_albums_by_artist_uses_artist_column(self, tmp_path):
+        store = LibraryStore(tmp_path / "library.sqlite3")
+        entry = _entry("album", "2024-01-01T00:00:00Z")
+        store.upsert([entry])
+
+        assert store.albums_by_artist("TEST ARTIST")[0].id == entry.id
+        assert store.albums_by_artist("someone else") == []
+
+    def test_records_round_trip_with_markets(self, tmp_path):
+        store = LibraryStore(tmp_path / "library.sqlite3")
+        album = generate_test_album_search_item("album")
+        album.available_markets = ["SE", "US", "JP"]
+        entry = LibraryAlbum.from_album(album, "2024-01-01T00:00:00Z")
+        store.upsert([entry])
+        store.close()
+
+        stored = LibraryStore(tmp_path / "library.sqlite3").get_albums([entry.id])
+
+        assert stored == [entry]
+        assert stored[0].is_playable_in("se")
+        assert not stored[0].is_playable_in("DE")
+
+    def test_migrates_json_rows_to_records(self, tmp_path):
+        album = generate_test_album_search_item("old layout")
+        conn = sqlite3.connect(tmp_path / "library.sqlite3")
+        conn.executescript("""
+            CREATE TABLE albums (id TEXT PRIMARY KEY, added_at TEXT NOT NULL, artist TEXT NOT NULL, album TEXT NOT NULL);
+            CREATE INDEX albums_added_at ON albums (added_at DESC, id);
+            CREATE INDEX albums_artist ON albums (artist COLLATE NOCASE);
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            PRAGMA user_version = 1;
+        """)
+        conn.execute(
+            "INSERT INTO albums VALUES (?, ?, ?, ?)",
+            (album.id, "2024-01-01T00:00:00Z", album.get_albums_artists(), album.model_dump_json()),
+        )
+        conn.commit()
+        conn.close()
+
+        store = LibraryStore(tmp_path / "library.sqlite3")
+
+        assert store.albums() == [LibraryAlbum.from_album(album, "2024-01-01T00:00:00Z")]
+        assert store.albums_by_artist("test artist")[0].id == album.id
+
+    def test_data_survives_reopening(self, tmp_path):
+        store = LibraryStore(tmp_path / "library.sqlite3")
+        store.upsert([_entry("album", "2024-01-01T00:00:00Z")])
+        store.close()
+
+        assert LibraryStore(tmp_path / "library.sqlite3").count() == 1
+
+    def test_imports_and_removes_legacy_json_cache(self, tmp_path):
+        legacy = SavedAlbumsCache(tmp_path / "saved_albums.json")
+        entry = EntryModel(album=generate_test_album_search_item("legacy"), added_at="2024-01-01T00:00:00Z")
+        legacy.save(SavedAlbumsModel(
+            latest_added_at=entry.added_at,
+            entries=[entry],
+            album_ids=[entry.album.id],
+            updated_ts=10.0,
+        ))
+
+        store = LibraryStore(tmp_path / "library.sqlite3", legacy_cache=legacy)
+
+        assert store.album_ids() == {entry.album.id}
+        assert store.get_meta("latest_added_at") == entry.added_at
+        assert not legacy.path.exists()
@@ -0,0 +1,49 @@
+import json
+
+from spotify_cli.core.caching import CacheStats
+from spotify_cli.core.metrics import ApiMetrics, LatencyHistogram, get_endpoint_name
+
+URL = "https://api.spotify.com/v1"
+
+
+class TestApiMetrics:
+    def test_endpoint_name_replaces_ids(self):
+        assert get_endpoint_name("get", f"{URL}/albums/4aawyAB9vmqN3uQ7FjRGTy/tracks?limit=50") \
+            == "GET albums/{id}/tracks"
+        assert get_endpoint_name("PUT", f"{URL}/me/player/play?device_id=abc") == "PUT me/player/play"
+
+    def test_percentiles_are_within_a_bucket(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.add(ms)
+
+        for q, expected in ((0.5, 500), (0.95, 950), (0.99, 990)):
+            assert expected <= histogram.percentile(q) <= expected * LatencyHistogram.GROWTH
+        assert histogram.percentile(1.0) == 1000
+
+    def test_records_errors_and_throttles_per_endpoint(self):
+        metrics = ApiMetrics()
+        metrics.record("GET", f"{URL}/me/player", 100, 200, 512)
+        metrics.record("GET", f"{URL}/me/player", 300, 429)
+        metrics.record("GET", f"{URL}/me/player", 50, None)
+        metrics.record("GET", f"{URL}/search?q=a", 20, 404)
+
+        endpoints = metrics.to_json()["endpoints"]
+
+        player = endpoints["GET me/player"]
+        assert (player["count"], player["errors"], player["throttled"], player["bytes"]) == (3, 1, 1, 512)
+        assert player["max_ms"] == 300
+        # where the most time went first
+        assert list(endpoints) == ["GET me/player", "GET search"]
+
+    def test_dump_includes_cache_hit_ratios(self, tmp_path):
+        metrics = ApiMetrics()
+        metrics.add_cache("suggestions", CacheStats(hits=3, misses=1))
+        metrics.record("GET", f"{URL}/me/player", 80, 200)
+
+        metrics.dump(tmp_path / "metrics.json")
+
+        data = json.loads((tmp_path / "metrics.json").read_text())
+        assert data["caches"]["suggestions"] == {"hits": 3, "misses": 1, "hit_ratio": 0.75}
+        assert data["endpoints"]["GET me/player"]["count"] == 1
+        assert metrics.summary()[-1] == "cache suggestions  75% (3/4)"
@@ -0,0 +1,57 @@
+from spotify_cli.core.playback_clock import PlaybackClock
+from spotify_cli.tests.utils import generate_test_playback_state
+
+
+def _state(progress_ms: int, is_playing: bool = True, duration_ms: int = 200_000):
+    state = generate_test_playback_state(is_playing=is_playing)
+    return state.model_copy(update={"progress_ms": progress_ms, "duration_ms": duration_ms})
+
+
+class TestPlaybackClock:
+    def test_progress_advances_while_playing(self):
+        clock = PlaybackClock(clock=lambda: 0.0)
+        clock.sync(_state(10_000), at=100.0)
+
+        assert clock.progress_ms(at=102.5) == 12_500
+        assert clock.remaining_sec(at=102.5) == 187.5
+
+    def test_progress_is_clamped_to_duration(self):
+        clock = PlaybackClock()
+        clock.sync(_state(199_000), at=100.0)
+
+        assert clock.progress_ms(at=110.0) == 200_000
+        assert clock.remaining_sec(at=110.0) == 0
+
+    def test_progress_stays_put_while_paused(self):
+        clock = PlaybackClock()
+        clock.sync(_state(10_000, is_playing=False), at=100.0)
+
+        assert clock.progress_ms(at=150.0) == 10_000
+        assert clock.remaining_sec(at=150.0) is None
+
+    def test_sync_reports_drift_for_the_same_track(self):
+        clock = PlaybackClock()
+        state = _state(10_000)
+        clock.sync(state, at=100.0)
+
+        drift = clock.sync(state.model_copy(update={"progress_ms": 16_000}), at=105.0)
+
+        assert drift == 1_000
+        assert clock.last_drift_ms == 1_000
+        assert clock.progress_ms(at=105.0) == 16_000
+
+    def test_no_drift_when_track_changed(self):
+        clock = PlaybackClock()
+        clock.sync(_state(10_000), at=100.0)
+
+        assert clock.sync(_state(1_000), at=105.0) is None
+        assert not clock.drift_samples
+
+    def test_sync_none_clears_the_clock(self):
+        clock = PlaybackClock()
+        clock.sync(_state(10_000), at=100.0)
+
+        clock.sync(None)
+
+        assert clock.progress_ms() is None
+        assert clock.remaining_sec() is None
@@ -0,0 +1,81 @@
+import pytest
+
+from spotify_cli.core.rate_limiter import RateLimiter, get_endpoint_class, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _limiter(limits=None) -> tuple[RateLimiter, FakeClock]:
+    clock = FakeClock()
+    return RateLimiter(limits, clock=clock, sleep=clock.sleep), clock
+
+
+class TestRateLimiter:
+    @pytest.mark.parametrize("url,expected", [
+        ("https://api.spotify.com/v1/me/player?market=from_token", "player"),
+        ("https://api.spotify.com/v1/me/player/devices", "player"),
+        ("https://api.spotify.com/v1/search?q=album:x", "search"),
+        ("https://api.spotify.com/v1/me/albums?limit=50", "library"),
+        ("https://api.spotify.com/v1/albums/123/tracks", "library"),
+        ("https://accounts.spotify.com/api/token", "default"),
+    ])
+    def test_get_endpoint_class(self, url, expected):
+        assert get_endpoint_class(url) == expected
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
+
+    def test_burst_is_free_then_requests_are_paced_at_the_rate(self):
+        limiter, clock = _limiter({"search": (2.0, 3)})
+
+        waits = [limiter.acquire("search") for _ in range(5)]
+
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3:] == pytest.approx([0.5, 0.5])
+
+    def test_endpoint_classes_have_separate_budgets(self):
+        limiter, clock = _limiter({"search": (1.0, 1), "player": (1.0, 1)})
+
+        limiter.acquire("search")
+
+        assert limiter.acquire("player") == 0.0
+        assert limiter.budget()["search"] == pytest.approx(0.0)
+
+    def test_retry_after_holds_back_every_endpoint_class(self):
+        limiter, clock = _limiter()
+
+        limiter.throttled("search", retry_after=4)
+        waited = limiter.acquire("player")
+
+        assert 4 <= waited <= 4 * (1 + RateLimiter.JITTER) + RateLimiter.JITTER
+        assert limiter.events[-1].endpoint_class == "search"
+        assert limiter.events[-1].retry_after == 4
+
+    def test_backs_off_exponentially_without_retry_after(self):
+        limiter, clock = _limiter()
+
+        delays = []
+        for _ in range(3):
+            limiter.throttled("default", retry_after=None)
+            delays.append(limiter.events[-1].delay)
+            clock.now += 100
+
+        assert delays[0] < delays[1] < delays[2]
+        assert delays[2] >= 4
+
+        limiter.succeeded()
+        limiter.throttled("default", retry_after=None)
+        assert limiter.events[-1].delay < 2
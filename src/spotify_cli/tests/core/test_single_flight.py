@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from spotify_cli.core.single_flight import SingleFlight
+from spotify_cli.core.spotify import SpotifyClient
+from spotify_cli.tests.utils import MockSpotify, generate_test_device
+
+
+def _run_concurrently(fn, callers: int) -> list:
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        futures = [pool.submit(fn) for _ in range(callers)]
+        return [future.result() for future in futures]
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one_result(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        upstream = MagicMock()
+
+        def slow_read():
+            upstream()
+            release.wait(1)
+            return object()
+
+        threading.Timer(0.1, release.set).start()
+        results = _run_concurrently(lambda: single_flight.do("key", slow_read), callers=5)
+
+        upstream.assert_called_once()
+        assert all(result is results[0] for result in results)
+        assert single_flight.calls["key"] == 5
+        assert single_flight.saved == 4
+
+    def test_sequential_calls_are_not_shared(self):
+        single_flight = SingleFlight()
+        upstream = MagicMock(side_effect=[1, 2])
+
+        assert single_flight.do("key", upstream) == 1
+        assert single_flight.do("key", upstream) == 2
+        assert single_flight.saved == 0
+
+    def test_exception_is_raised_to_every_waiter(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+
+        def failing_read():
+            release.wait(1)
+            raise ValueError("boom")
+
+        def call():
+            with pytest.raises(ValueError):
+                single_flight.do("key", failing_read)
+
+        threading.Timer(0.1, release.set).start()
+        _run_concurrently(call, callers=3)
+
+        # nothing left in flight, the next call runs again
+        with pytest.raises(ValueError):
+            release.set()
+            single_flight.do("key", failing_read)
+
+    def test_client_coalesces_device_reads(self):
+        release = threading.Event()
+        mock_spotify = MockSpotify()
+
+        def devices():
+            release.wait(1)
+            return {"devices": [generate_test_device(is_active=True).model_dump()]}
+
+        mock_spotify.devices = MagicMock(side_effect=devices)
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        threading.Timer(0.1, release.set).start()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            active = [pool.submit(sp_client.get_first_active_device) for _ in range(2)]
+            listed = [pool.submit(sp_client.get_devices) for _ in range(2)]
+            assert all(future.result() is not None for future in active + listed)
+
+        mock_spotify.devices.assert_called_once()
+        assert sp_client.single_flight.shared["devices"] == 3
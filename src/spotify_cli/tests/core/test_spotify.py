@@ -1,10 +1,19 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
 from unittest.mock import MagicMock
 
 import pytest
+from spotipy import SpotifyException
 
+from spotify_cli.core.caching import SessionSnapshotCache
+from spotify_cli.core.library_record import LibraryAlbum
+from spotify_cli.core.library_store import LibraryStore
 from spotify_cli.core.spotify import SpotifyClient, SearchElementTypes, NoActiveDeviceFound
 from spotify_cli.schemas.device import Device
-from spotify_cli.tests.utils import MockSpotify, MockPlatformAdapter, generate_test_device, generate_test_playback_state
+from spotify_cli.schemas.search import AlbumSearchItem
+from spotify_cli.tests.utils import MockSpotify, MockPlatformAdapter, generate_test_device, generate_test_playback_state, \
+    generate_test_album_search_item
 
 
 class TestSpotify:
@@ -375,4 +384,227 @@ class TestSpotify:
             is_playing=True,
         )
 
-        assert sp_client._can_pause_playback(playback_state) == True
\ No newline at end of file
+        assert sp_client._can_pause_playback(playback_state) == True
+
+    def test_get_playback_state_returns_none_when_nothing_playing(self):
+        mock_spotify = _mock_spotify_with_responses(MagicMock(status_code=204, content=b"", headers={}))
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        assert sp_client.get_playback_state() is None
+
+    def test_get_playback_state_sends_etag_and_reuses_state_on_304(self):
+        mock_spotify = _mock_spotify_with_responses(
+            _playback_response(etag='"v1"'),
+            MagicMock(status_code=304, content=b"", headers={"ETag": '"v1"'}),
+        )
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        first = sp_client.get_playback_state()
+        second = sp_client.get_playback_state()
+
+        assert first.etag == '"v1"'
+        assert second is first
+        second_call_headers = mock_spotify._session.request.call_args_list[1].kwargs["headers"]
+        assert second_call_headers["If-None-Match"] == '"v1"'
+        assert sp_client.playback_etag_stats.hits == 1
+        assert sp_client.playback_etag_stats.misses == 1
+
+    def test_get_playback_state_reads_duration_from_item(self):
+        mock_spotify = _mock_spotify_with_responses(_playback_response(etag='"v1"'))
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        state = sp_client.get_playback_state()
+
+        assert state.progress_ms == 1000
+        assert state.duration_ms == 200000
+
+    def test_playback_and_active_device_are_saved_to_the_session_snapshot(self, tmp_path):
+        snapshot_cache = SessionSnapshotCache(tmp_path / "session.json")
+        mock_spotify = _mock_spotify_with_responses(_playback_response(etag='"v1"'))
+        active = generate_test_device(name="active", is_active=True)
+        mock_spotify.devices = MagicMock(return_value={"devices": [active.model_dump()]})
+        sp_client = SpotifyClient(sp=mock_spotify, snapshot_cache=snapshot_cache)
+
+        state = sp_client.get_playback_state()
+        sp_client.get_devices()
+
+        snapshot = SpotifyClient(sp=MockSpotify(), snapshot_cache=snapshot_cache).load_snapshot()
+        assert snapshot.playback == state
+        assert snapshot.device == active
+
+    def test_playback_progress_alone_does_not_rewrite_the_session_snapshot(self, tmp_path):
+        snapshot_cache = SessionSnapshotCache(tmp_path / "session.json")
+        album, device = generate_test_album_search_item(), generate_test_device(is_active=True)
+        mock_spotify = _mock_spotify_with_responses(
+            _playback_response(etag='"v1"', album=album, device=device),
+            _playback_response(etag='"v2"', progress_ms=2000, album=album, device=device),
+            _playback_response(etag='"v3"', progress_ms=3000, is_playing=False, album=album, device=device),
+        )
+        sp_client = SpotifyClient(sp=mock_spotify, snapshot_cache=snapshot_cache)
+        save = MagicMock(wraps=snapshot_cache.save)
+        snapshot_cache.save = save
+
+        sp_client.get_playback_state()
+        progressed = sp_client.get_playback_state()
+
+        assert save.call_count == 1
+        assert sp_client.load_snapshot().playback == progressed
+
+        paused = sp_client.get_playback_state()
+
+        assert save.call_count == 2
+        assert SessionSnapshotCache(snapshot_cache.path).load().playback == paused
+
+    def test_get_playback_state_parses_again_when_etag_changed(self):
+        mock_spotify = _mock_spotify_with_responses(
+            _playback_response(etag='"v1"'),
+            _playback_response(etag='"v2"', is_playing=False),
+        )
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        sp_client.get_playback_state()
+        second = sp_client.get_playback_state()
+
+        assert second.etag == '"v2"'
+        assert second.is_playing is False
+        assert sp_client.playback_etag_stats.misses == 2
+
+    def test_get_playback_state_raises_spotify_exception_on_error(self):
+        mock_spotify = _mock_spotify_with_responses(
+            MagicMock(status_code=429, content=b"", headers={"Retry-After": "3"}, json=MagicMock(return_value={}))
+        )
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        with pytest.raises(SpotifyException) as exc_info:
+            sp_client.get_playback_state()
+
+        assert exc_info.value.http_status == 429
+        assert exc_info.value.headers["Retry-After"] == "3"
+
+
+    def test_get_new_library_entries_cold_sync_fetches_every_page_in_added_at_order(self):
+        library = _saved_albums_library(size=230)
+        mock_spotify = MockSpotify()
+        mock_spotify.current_user_saved_albums = MagicMock(side_effect=_saved_albums_pages(library))
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        entries = sp_client._get_new_library_entries(known_ids=[], window=3)
+
+        assert [entry.id for entry in entries] == [item["album"]["id"] for item in library]
+        assert mock_spotify.current_user_saved_albums.call_count == 5
+
+    def test_get_new_library_entries_warm_sync_stops_at_first_known_album(self):
+        library = _saved_albums_library(size=230)
+        mock_spotify = MockSpotify()
+        mock_spotify.current_user_saved_albums = MagicMock(side_effect=_saved_albums_pages(library))
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        entries = sp_client._get_new_library_entries(known_ids=[library[3]["album"]["id"]], window=3)
+
+        assert [entry.id for entry in entries] == [item["album"]["id"] for item in library[:3]]
+        mock_spotify.current_user_saved_albums.assert_called_once_with(limit=50, offset=0)
+
+    def test_get_new_library_entries_fetches_pages_in_bounded_windows(self):
+        library = _saved_albums_library(size=500)
+        mock_spotify = MockSpotify()
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+        pages = _saved_albums_pages(library)
+
+        def current_user_saved_albums(limit, offset):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            threading.Event().wait(0.01)
+            with lock:
+                in_flight -= 1
+            return pages(limit=limit, offset=offset)
+
+        mock_spotify.current_user_saved_albums = current_user_saved_albums
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        entries = sp_client._get_new_library_entries(known_ids=[], window=3)
+
+        assert len(entries) == 500
+        assert peak == 3
+
+    def test_get_saved_albums_page_leaves_429s_to_the_session(self, monkeypatch):
+        # the transport session already retried it, retrying again here multiplied the attempts
+        throttled = SpotifyException(429, -1, "rate limited", headers={"Retry-After": "0"})
+        mock_spotify = MockSpotify()
+        mock_spotify.current_user_saved_albums = MagicMock(side_effect=[throttled, {"items": [], "total": 0}])
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        with pytest.raises(SpotifyException):
+            sp_client._get_saved_albums_page(offset=0)
+        assert mock_spotify.current_user_saved_albums.call_count == 1
+
+    def test_library_index_is_reconciled_with_store_and_updated_on_refresh(self, tmp_path):
+        library = _saved_albums_library(size=60)
+        store = LibraryStore(tmp_path / "library.sqlite3")
+        store.upsert([
+            LibraryAlbum.from_album(AlbumSearchItem(**item["album"]), item["added_at"]) for item in library[10:]
+        ])
+        mock_spotify = MockSpotify()
+        mock_spotify.current_user_saved_albums = MagicMock(side_effect=_saved_albums_pages(library))
+        sp_client = SpotifyClient(sp=mock_spotify, library=store)
+
+        index = sp_client.get_library_index()
+        assert index.album_ids() == {item["album"]["id"] for item in library[10:]}
+
+        sp_client.refresh_library(ttl_sec=0)
+
+        assert index.album_ids() == {item["album"]["id"] for item in library}
+        # persisted next to the store, a new client loads it without rebuilding
+        reloaded = SpotifyClient(sp=mock_spotify, library=store)._library_index_cache.load()
+        assert reloaded.album_ids() == index.album_ids()
+
+
+def _mock_spotify_with_responses(*responses) -> MockSpotify:
+    mock_spotify = MockSpotify()
+    mock_spotify.prefix = "https://api.spotify.com/v1/"
+    mock_spotify.proxies = None
+    mock_spotify.requests_timeout = 5
+    mock_spotify._auth_headers = lambda: {"Authorization": "Bearer token"}
+    mock_spotify._session = MagicMock()
+    mock_spotify._session.request = MagicMock(side_effect=list(responses))
+    return mock_spotify
+
+
+def _playback_response(etag: str, is_playing: bool = True, progress_ms: int = 1000,
+                       album: Optional[AlbumSearchItem] = None, device: Optional[Device] = None) -> MagicMock:
+    album = album or generate_test_album_search_item()
+    payload = {
+        "device": (device or generate_test_device(is_active=True)).model_dump(),
+        "progress_ms": progress_ms,
+        "is_playing": is_playing,
+        "item": {
+            "name": "test track",
+            "artists": [{"name": "test artist"}],
+            "album": album.model_dump(),
+            "duration_ms": 200000,
+        },
+        "actions": {"disallows": {"resuming": True}},
+    }
+    return MagicMock(status_code=200, content=b"{...}", headers={"ETag": etag},
+                     json=MagicMock(return_value=payload))
+
+
+def _saved_albums_library(size: int) -> list[dict]:
+    newest = datetime(2025, 1, 1)
+    return [
+        {
+            "added_at": (newest - timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "album": generate_test_album_search_item(name=f"album {i}").model_dump(),
+        }
+        for i in range(size)
+    ]
+
+
+def _saved_albums_pages(library: list[dict]):
+    def current_user_saved_albums(limit, offset):
+        return {"items": library[offset:offset + limit], "total": len(library), "limit": limit, "offset": offset}
+
+    return current_user_saved_albums
@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock
+
+from spotify_cli.core.spotify import SpotifyClient, SearchElementTypes
+from spotify_cli.core.suggestions import SuggestionCache, matches_query
+from spotify_cli.schemas.search import SearchResult
+from spotify_cli.tests.utils import generate_test_album_search_item, MockSpotify
+
+
+def _result(*names: str, total: int | None = None) -> SearchResult:
+    items = [generate_test_album_search_item(name) for name in names]
+    return SearchResult(href="https://...", limit=10, offset=0, previous=None,
+                        total=len(items) if total is None else total, items=items)
+
+
+class TestSuggestionCache:
+    def test_matches_query_on_word_prefixes(self):
+        assert matches_query("radio he", "Radiohead - Live at Helsinki")
+        assert matches_query("beyonce", "Beyoncé")
+        assert not matches_query("head", "Radiohead")
+
+    def test_returns_cached_result_for_normalized_query(self):
+        cache = SuggestionCache()
+        result = _result("Kid A")
+        cache.put("album", "Kid", result)
+
+        assert cache.get("album", " KID ") is result
+        assert cache.get("artist", "kid") is None
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_longer_query_is_filtered_from_shorter_query_results(self):
+        cache = SuggestionCache()
+        cache.put("album", "ra", _result("Radiohead", "Rage", "Ray of Light"))
+
+        answered = cache.get("album", "rad")
+
+        assert [item.name for item in answered.items] == ["Radiohead"]
+        assert cache.prefix_hits == 1
+
+    def test_truncated_results_without_matches_go_upstream(self):
+        cache = SuggestionCache()
+        cache.put("album", "ra", _result("Rage", total=500))
+
+        assert cache.get("album", "rad") is None
+
+    def test_truncated_results_with_matches_go_upstream(self):
+        # 900 albums match "the", the 10 returned say nothing about the ones matching "the b"
+        cache = SuggestionCache()
+        cache.put("album", "the", _result("The Beatles", *(f"The Album {i}" for i in range(9)), total=900))
+
+        assert cache.get("album", "the b") is None
+        assert cache.get("album", "the be") is None
+        assert cache.prefix_hits == 0
+
+    def test_complete_results_answer_empty(self):
+        cache = SuggestionCache()
+        cache.put("album", "ra", _result("Rage"))
+
+        assert cache.get("album", "rad").items == []
+
+    def test_expired_and_evicted_entries_are_dropped(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr("spotify_cli.core.suggestions.time.monotonic", lambda: now)
+        cache = SuggestionCache(ttl_sec=10, max_entries=2)
+        cache.put("album", "aa", _result("aa"))
+        cache.put("album", "bb", _result("bb"))
+        cache.put("album", "cc", _result("cc"))
+
+        assert cache.get("album", "aa") is None
+        assert cache.get("album", "bb") is not None
+
+        now += 11
+        assert cache.get("album", "bb") is None
+
+    def test_client_only_searches_queries_the_cache_cannot_answer(self):
+        mock_spotify = MockSpotify()
+        mock_spotify.search = MagicMock(return_value={"albums": _result("Radiohead").model_dump()})
+        sp_client = SpotifyClient(sp=mock_spotify)
+
+        for query in ("ra", "rad", "radi", "radio", "ra"):
+            sp_client.get_search_suggestions(query, search_element=SearchElementTypes.ALBUM)
+
+        mock_spotify.search.assert_called_once_with(q="album:ra", type="album", limit=10)
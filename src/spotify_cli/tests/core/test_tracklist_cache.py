@@ -0,0 +1,58 @@
+from spotify_cli.core.library_store import LibraryStore
+from spotify_cli.core.spotify import SpotifyClient
+from spotify_cli.core.tracklist_cache import TracklistCache
+from spotify_cli.tests.utils import MockSpotify
+
+
+def _tracks(album_id: str, n: int = 2) -> list[dict]:
+    return [{"id": f"{album_id}{i}", "track_number": i, "available_markets": ["SE", "US"]} for i in range(1, n + 1)]
+
+
+class TestTracklistCache:
+    def test_round_trips_tracks_without_markets(self, tmp_path):
+        cache = TracklistCache(tmp_path / "tracklists.sqlite3")
+        cache.put("album1", _tracks("album1"))
+        cache.close()
+
+        reopened = TracklistCache(tmp_path / "tracklists.sqlite3")
+
+        assert reopened.get("album1") == [{"id": "album11", "track_number": 1}, {"id": "album12", "track_number": 2}]
+        assert reopened.get("album2") is None
+        assert (reopened.stats.hits, reopened.stats.misses) == (1, 1)
+
+    def test_expired_tracklists_are_misses(self, tmp_path, monkeypatch):
+        cache = TracklistCache(tmp_path / "tracklists.sqlite3", ttl_sec=60)
+        monkeypatch.setattr("spotify_cli.core.tracklist_cache.time.time", lambda: 1000.0)
+        cache.put("album1", _tracks("album1"))
+
+        monkeypatch.setattr("spotify_cli.core.tracklist_cache.time.time", lambda: 1061.0)
+
+        assert cache.get("album1") is None
+
+    def test_evicts_least_recently_used_albums(self, tmp_path, monkeypatch):
+        cache = TracklistCache(tmp_path / "tracklists.sqlite3", max_albums=10)
+        now = [0.0]
+        monkeypatch.setattr("spotify_cli.core.tracklist_cache.time.time", lambda: now[0])
+        for i in range(10):
+            now[0] += 1
+            cache.put(f"album{i}", _tracks(f"album{i}"))
+        now[0] += 1
+        # album0 is the oldest write but was just used
+        assert cache.get("album0") is not None
+
+        now[0] += 1
+        cache.put("album10", _tracks("album10"))
+
+        # 11 albums evicted down to 9, the least recently used ones go first
+        assert cache.get("album0") is not None
+        assert cache.get("album1") is None
+        assert cache.get("album2") is None
+        assert cache.get("album3") is not None
+        assert cache.get("album10") is not None
+
+    def test_client_keeps_tracklists_next_to_its_library(self, tmp_path):
+        client = SpotifyClient(sp=MockSpotify(), library=LibraryStore(tmp_path / "library.sqlite3"))
+        assert client.tracklists.path == tmp_path / "tracklists.sqlite3"
+
+        tracklists = TracklistCache(tmp_path / "elsewhere.sqlite3")
+        assert SpotifyClient(sp=MockSpotify(), tracklists=tracklists).tracklists is tracklists
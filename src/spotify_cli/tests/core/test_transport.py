@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+import pytest
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from spotify_cli.benchmarks.simulator import SpotifySimulator, SimulatorConfig
+from spotify_cli.core.rate_limiter import RateLimiter
+from spotify_cli.core.transport import SpotifyTransport, RateLimitedSession
+
+
+class ThrottlingAdapter(HTTPAdapter):
+    """Answers the first `throttles` requests with a 429 and a Retry-After of 10 seconds, then with a 200"""
+
+    def __init__(self, throttles: int):
+        super().__init__()
+        self.throttles = throttles
+        self.sent = 0
+
+    def send(self, request, **kwargs) -> Response:
+        self.sent += 1
+        response = Response()
+        response.request, response.url, response._content = request, request.url, b"{}"
+        response.status_code = 429 if self.sent <= self.throttles else 200
+        if response.status_code == 429:
+            response.headers["Retry-After"] = "10"
+        return response
+
+
+def _throttled_session(throttles: int) -> tuple[RateLimitedSession, ThrottlingAdapter]:
+    session = RateLimitedSession(RateLimiter(sleep=lambda _: None))
+    adapter = ThrottlingAdapter(throttles)
+    session.mount("https://", adapter)
+    return session, adapter
+
+
+class TestSpotifyTransport:
+    def test_session_pool_is_bounded_to_max_connections(self):
+        transport = SpotifyTransport(max_connections=3)
+        adapter = transport.session.get_adapter("https://api.spotify.com/v1/")
+
+        assert adapter._pool_maxsize == 3
+        assert adapter._pool_block is True
+        transport.close()
+
+    @pytest.mark.asyncio
+    async def test_run_executes_off_the_event_loop_thread(self):
+        transport = SpotifyTransport()
+        loop_thread = threading.get_ident()
+
+        thread_id = await transport.run(threading.get_ident)
+
+        assert thread_id != loop_thread
+        transport.close()
+
+    @pytest.mark.asyncio
+    async def test_run_never_exceeds_max_connections(self):
+        transport = SpotifyTransport(max_connections=2)
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def blocking_call():
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            threading.Event().wait(0.02)
+            with lock:
+                in_flight -= 1
+
+        await asyncio.gather(*(transport.run(blocking_call) for _ in range(6)))
+
+        assert peak == 2
+        transport.close()
+
+    def test_session_waits_out_retry_after_instead_of_failing(self, tmp_path):
+        config = SimulatorConfig(latency_ms=0, jitter_ms=0, library_size=10, rate_limit=2,
+                                 rate_limit_window_sec=1, retry_after_sec=1)
+        with SpotifySimulator(config) as simulator:
+            transport = SpotifyTransport()
+            client = simulator.client(transport=transport)
+
+            devices = [client.get_devices(fresh=True) for _ in range(3)]
+
+            assert all(devices)
+            assert simulator.stats.rate_limited >= 1
+            assert client.rate_limiter.events[-1].retry_after == 1
+            transport.close()
+
+    def test_session_records_every_attempt(self, tmp_path):
+        config = SimulatorConfig(latency_ms=0, jitter_ms=0, library_size=10, rate_limit=2,
+                                 rate_limit_window_sec=1, retry_after_sec=1)
+        with SpotifySimulator(config) as simulator:
+            transport = SpotifyTransport()
+            client = simulator.client(transport=transport)
+
+            for _ in range(3):
+                client.get_devices(fresh=True)
+
+            devices = client.metrics.to_json()["endpoints"]["GET me/player/devices"]
+            assert devices["count"] == 3 + simulator.stats.rate_limited
+            assert devices["throttled"] == simulator.stats.rate_limited >= 1
+            assert devices["errors"] == 0
+            assert devices["bytes"] > 0
+            assert "devices" in client.metrics.caches
+            transport.close()
+
+    def test_session_keeps_waiting_out_a_throttle_longer_than_a_few_retries(self):
+        session, adapter = _throttled_session(throttles=5)
+
+        response = session.get("https://api.spotify.com/v1/me/albums")
+
+        assert response.status_code == 200
+        assert adapter.sent == 6
+
+    def test_session_gives_up_once_held_back_for_max_throttled_sec(self):
+        session, adapter = _throttled_session(throttles=100)
+
+        response = session.get("https://api.spotify.com/v1/me/albums")
+
+        assert response.status_code == 429
+        # 10 seconds (plus up to 10% jitter) each, over 60 after the sixth
+        assert adapter.sent == 6
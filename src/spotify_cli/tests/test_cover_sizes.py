@@ -0,0 +1,18 @@
+from spotify_cli.utils.cover_sizes import cover_size_for, neighbour_sizes
+
+
+class TestCoverSizes:
+    def test_picks_largest_step_that_fits(self):
+        # a cover is one pixel per column and two per row
+        assert cover_size_for(40, 20) == (32, 32)
+        assert cover_size_for(80, 12) == (23, 23)
+        assert cover_size_for(200, 100) == (64, 64)
+
+    def test_tiny_area_gets_smallest_step(self):
+        assert cover_size_for(3, 2) == (12, 12)
+
+    def test_neighbour_sizes_start_with_the_size(self):
+        assert neighbour_sizes((23, 23)) == [(23, 23), (16, 16), (32, 32)]
+        assert neighbour_sizes((12, 12)) == [(12, 12), (16, 16)]
+        assert neighbour_sizes((64, 64)) == [(64, 64), (46, 46)]
+        assert neighbour_sizes((10, 10)) == [(10, 10)]
@@ -0,0 +1,157 @@
+import threading
+import time
+from io import BytesIO
+from unittest.mock import MagicMock
+
+from PIL import Image
+
+from spotify_cli.core.caching import ImageBytesCache
+from spotify_cli.utils import pixelate_images
+from spotify_cli.utils.pixelate_images import AlbumArtCache, AlbumArtPrefetcher
+
+
+def _png_bytes() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (64, 64), (200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _mock_get(monkeypatch) -> MagicMock:
+    mock_get = MagicMock(return_value=MagicMock(content=_png_bytes()))
+    monkeypatch.setattr(pixelate_images, "get", mock_get)
+    return mock_get
+
+
+class TestAlbumArtCache:
+    def test_same_url_and_size_is_rendered_once(self, monkeypatch, tmp_path):
+        mock_get = _mock_get(monkeypatch)
+        render = MagicMock(wraps=AlbumArtCache._render)
+        monkeypatch.setattr(AlbumArtCache, "_render", render)
+        cache = AlbumArtCache(disk=ImageBytesCache(tmp_path))
+
+        first = cache.get("https://i.scdn.co/image/abc", (23, 23))
+        second = cache.get("https://i.scdn.co/image/abc", (23, 23))
+
+        assert first is second
+        mock_get.assert_called_once()
+        render.assert_called_once()
+
+    def test_new_size_reuses_downloaded_bytes(self, monkeypatch, tmp_path):
+        mock_get = _mock_get(monkeypatch)
+        cache = AlbumArtCache(disk=ImageBytesCache(tmp_path))
+
+        cache.get("https://i.scdn.co/image/abc", (23, 23))
+        cache.get("https://i.scdn.co/image/abc", (10, 10))
+
+        mock_get.assert_called_once()
+
+    def test_memory_miss_is_served_from_disk(self, monkeypatch, tmp_path):
+        mock_get = _mock_get(monkeypatch)
+        AlbumArtCache(disk=ImageBytesCache(tmp_path)).get("https://i.scdn.co/image/abc", (23, 23))
+
+        AlbumArtCache(disk=ImageBytesCache(tmp_path)).get("https://i.scdn.co/image/abc", (23, 23))
+
+        mock_get.assert_called_once()
+
+    def test_rendered_lru_is_bounded(self, monkeypatch, tmp_path):
+        _mock_get(monkeypatch)
+        cache = AlbumArtCache(disk=ImageBytesCache(tmp_path), max_rendered=2)
+
+        for n in range(3):
+            cache.get(f"https://i.scdn.co/image/{n}", (4, 4))
+
+        assert list(cache._rendered) == [("https://i.scdn.co/image/1", (4, 4)), ("https://i.scdn.co/image/2", (4, 4))]
+
+    def test_sizes_are_rendered_from_one_decode_and_resizes_reuse_it(self, monkeypatch, tmp_path):
+        mock_get = _mock_get(monkeypatch)
+        decode = MagicMock(wraps=AlbumArtCache._decode)
+        monkeypatch.setattr(AlbumArtCache, "_decode", decode)
+        cache = AlbumArtCache(disk=ImageBytesCache(tmp_path))
+
+        rendered = cache.get_sizes("https://i.scdn.co/image/abc", [(16, 16), (23, 23), (32, 32)])
+        resized = cache.get("https://i.scdn.co/image/abc", (46, 46))
+
+        assert list(rendered) == [(16, 16), (23, 23), (32, 32)]
+        assert rendered[(23, 23)] is cache.peek("https://i.scdn.co/image/abc", (23, 23))
+        assert resized is not None
+        decode.assert_called_once()
+        mock_get.assert_called_once()
+
+    def test_concurrent_calls_with_different_sizes_share_one_download_and_decode(self, monkeypatch, tmp_path):
+        mock_get = _mock_get(monkeypatch)
+        started, release = threading.Event(), threading.Event()
+        decode = AlbumArtCache._decode
+
+        def slow_decode(data):
+            started.set()
+            release.wait(5)
+            return decode(data)
+
+        decode_mock = MagicMock(side_effect=slow_decode)
+        monkeypatch.setattr(AlbumArtCache, "_decode", decode_mock)
+        cache = AlbumArtCache(disk=ImageBytesCache(tmp_path))
+        results = {}
+
+        def get_sizes(name, sizes):
+            results[name] = cache.get_sizes("https://i.scdn.co/image/abc", sizes)
+
+        first = threading.Thread(target=get_sizes, args=("first", [(23, 23)]))
+        second = threading.Thread(target=get_sizes, args=("second", [(16, 16), (32, 32)]))
+        first.start()
+        started.wait(5)
+        second.start()
+        # the second call is waiting on the first one's decode before it is released
+        deadline = time.monotonic() + 1
+        while not cache._single_flight.shared["https://i.scdn.co/image/abc"] and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        assert list(results["first"]) == [(23, 23)]
+        assert list(results["second"]) == [(16, 16), (32, 32)]
+        mock_get.assert_called_once()
+        decode_mock.assert_called_once()
+
+
+class TestAlbumArtPrefetcher:
+    def test_prefetched_covers_are_rendered_before_they_are_shown(self, monkeypatch, tmp_path):
+        mock_get = _mock_get(monkeypatch)
+        cache = AlbumArtCache(disk=ImageBytesCache(tmp_path))
+        prefetcher = AlbumArtPrefetcher(cache)
+
+        prefetcher.prefetch("library", ["https://i.scdn.co/image/1", None, "https://i.scdn.co/image/2"], (4, 4))
+        prefetcher._executor.shutdown(wait=True)
+
+        assert cache.peek("https://i.scdn.co/image/1", (4, 4)) is not None
+        assert cache.peek("https://i.scdn.co/image/2", (4, 4)) is not None
+        assert prefetcher.pending("library") == []
+        assert mock_get.call_count == 2
+
+    def test_moving_away_cancels_queued_covers_of_the_lane_only(self, monkeypatch, tmp_path):
+        _mock_get(monkeypatch)
+        started, release = threading.Event(), threading.Event()
+        render = AlbumArtCache._render
+
+        def slow_render(data, size):
+            started.set()
+            release.wait(5)
+            return render(data, size)
+
+        monkeypatch.setattr(AlbumArtCache, "_render", staticmethod(slow_render))
+        cache = AlbumArtCache(disk=ImageBytesCache(tmp_path))
+        prefetcher = AlbumArtPrefetcher(cache, max_workers=1)
+
+        prefetcher.prefetch("queue", ["https://i.scdn.co/image/next"], (4, 4))
+        started.wait(5)
+        prefetcher.prefetch("library", ["https://i.scdn.co/image/a", "https://i.scdn.co/image/b"], (4, 4))
+        prefetcher.prefetch("library", ["https://i.scdn.co/image/c"], (4, 4))
+
+        assert prefetcher.cancelled == 2
+        assert prefetcher.pending("library") == ["https://i.scdn.co/image/c"]
+        assert prefetcher.pending("queue") == ["https://i.scdn.co/image/next"]
+
+        release.set()
+        prefetcher._executor.shutdown(wait=True)
+        assert cache.peek("https://i.scdn.co/image/c", (4, 4)) is not None
+        assert cache.peek("https://i.scdn.co/image/a", (4, 4)) is None
@@ -0,0 +1,18 @@
+# square cover sizes in pixels, a cover is drawn one pixel per column and two per row. covers are only rendered at
+# these steps so small terminal resizes land on a size that is already rendered
+COVER_SIZES = (12, 16, 23, 32, 46, 64)
+
+
+def cover_size_for(width: int, height: int) -> tuple[int, int]:
+    """Largest cover step that fits `width` x `height` cells"""
+    fits = [size for size in COVER_SIZES if size <= width and size <= height * 2]
+    side = fits[-1] if fits else COVER_SIZES[0]
+    return side, side
+
+
+def neighbour_sizes(size: tuple[int, int]) -> list[tuple[int, int]]:
+    """`size` and the steps next to it, what a resize most likely needs next"""
+    if size[0] not in COVER_SIZES:
+        return [size]
+    i = COVER_SIZES.index(size[0])
+    return [(side, side) for side in (size[0], *COVER_SIZES[max(i - 1, 0):i], *COVER_SIZES[i + 1:i + 2])]
@@ -11,4 +11,16 @@ def parse_date(s: str) -> datetime:
             return datetime.strptime(s, fmt)
         except ValueError:
             continue
-    return datetime.min
\ No newline at end of file
+    return datetime.min
+
+
+def format_progress(progress_ms: int | None, duration_ms: int | None) -> str:
+    """Progress as `1:05 / 3:20`, empty when either is unknown"""
+    if progress_ms is None or not duration_ms:
+        return ""
+
+    def fmt(ms: int) -> str:
+        minutes, seconds = divmod(ms // 1000, 60)
+        return f"{minutes}:{seconds:02d}"
+
+    return f"{fmt(progress_ms)} / {fmt(duration_ms)}"
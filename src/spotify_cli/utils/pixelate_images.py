@@ -1,13 +1,203 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from io import BytesIO
+from typing import Iterable, Optional
 
 from PIL import Image
 from requests import get
 from rich_pixels import Pixels
 
+from spotify_cli.core.caching import ImageBytesCache, get_album_art_cache_path
+from spotify_cli.core.single_flight import SingleFlight
+
+
+class AlbumArtCache:
+    """
+    Three tier cache for album art.
+    Rendered Pixels are kept in an in-memory LRU keyed by (url, size), decoded source images in a smaller one keyed
+    by url and the downloaded bytes in a content addressed disk store keyed by url - so a cover is downloaded once,
+    decoded once while it is in use and resized once per size.
+    """
+    MAX_RENDERED = 64
+    MAX_SOURCES = 16
+
+    def __init__(self, disk: Optional[ImageBytesCache] = None, max_rendered: int = MAX_RENDERED,
+                 max_sources: int = MAX_SOURCES):
+        self.disk = disk or ImageBytesCache(get_album_art_cache_path())
+        self.max_rendered = max_rendered
+        self.max_sources = max_sources
+        self._rendered: OrderedDict[tuple[str, tuple[int, int]], Pixels] = OrderedDict()
+        self._sources: OrderedDict[str, Image.Image] = OrderedDict()
+        self._lock = threading.Lock()
+        # the size covers are shown at, set by the track details from the terminal geometry. prefetches render it
+        self.shown_size: tuple[int, int] = (23, 23)
+        # a prefetch and the track details asking for the same cover share one download and decode, whatever sizes
+        # each of them renders
+        self._single_flight = SingleFlight()
+
+    def peek(self, image_url: str, size: tuple[int, int]) -> Optional[Pixels]:
+        """The rendered cover when it is in memory, never downloads or decodes"""
+        key = (image_url, size)
+        with self._lock:
+            pixels = self._rendered.get(key)
+            if pixels is not None:
+                self._rendered.move_to_end(key)
+            return pixels
+
+    def get(self, image_url: str, size: tuple[int, int]) -> Pixels:
+        return self.get_sizes(image_url, [size])[size]
+
+    def get_sizes(self, image_url: str, sizes: Iterable[tuple[int, int]]) -> dict[tuple[int, int], Pixels]:
+        """The cover rendered at every size, the missing sizes rendered from a single decode"""
+        sizes = tuple(dict.fromkeys(sizes))
+        rendered = {size: self.peek(image_url, size) for size in sizes}
+        missing = tuple(size for size, pixels in rendered.items() if pixels is None)
+        if missing:
+            rendered.update(self._render_sizes(image_url, missing))
+        return rendered
+
+    def _render_sizes(self, image_url: str, sizes: tuple[tuple[int, int], ...]) -> dict[tuple[int, int], Pixels]:
+        source = self._get_source(image_url)
+        rendered = {size: self._render(source, size) for size in sizes}
+
+        with self._lock:
+            for size, pixels in rendered.items():
+                key = (image_url, size)
+                self._rendered[key] = pixels
+                self._rendered.move_to_end(key)
+            while len(self._rendered) > self.max_rendered:
+                self._rendered.popitem(last=False)
+        return rendered
+
+    def _get_source(self, image_url: str) -> Image.Image:
+        with self._lock:
+            source = self._sources.get(image_url)
+            if source is not None:
+                self._sources.move_to_end(image_url)
+                return source
+
+        return self._single_flight.do(image_url, self._load_source, image_url)
+
+    def _load_source(self, image_url: str) -> Image.Image:
+        source = self._decode(self._get_image_bytes(image_url))
+        with self._lock:
+            self._sources[image_url] = source
+            while len(self._sources) > self.max_sources:
+                self._sources.popitem(last=False)
+        return source
+
+    def _get_image_bytes(self, image_url: str) -> bytes:
+        data = self.disk.get(image_url)
+        if data is not None:
+            return data
+
+        resp = get(image_url, timeout=10)
+        resp.raise_for_status()
+        self.disk.put(image_url, resp.content)
+        return resp.content
+
+    @staticmethod
+    def _decode(data: bytes) -> Image.Image:
+        image = Image.open(BytesIO(data))
+        # decoded now instead of lazily on the first resize, which may happen on another thread
+        image.load()
+        return image
+
+    @staticmethod
+    def _render(image: Image.Image, size: tuple[int, int]) -> Pixels:
+        return Pixels.from_image(image.resize(size))
+
+    def clear_memory(self):
+        with self._lock:
+            self._rendered.clear()
+            self._sources.clear()
+
+
+class AlbumArtPrefetcher:
+    """
+    Downloads and renders covers before they are shown, on a small bounded pool so prefetching never competes
+    with much else. Every lane (the library cursor, the playback queue) has its own wanted covers: a new request
+    cancels the lane's queued jobs that aren't wanted anymore, so moving the cursor away drops the covers of the
+    rows it left. A job already running finishes, its cover is cached either way.
+    """
+    MAX_WORKERS = 2
+
+    def __init__(self, cache: AlbumArtCache, max_workers: int = MAX_WORKERS):
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="art-prefetch")
+        self._pending: dict[str, dict[tuple[str, tuple[int, int]], Future]] = {}
+        # re-entrant, a job that is already done runs its done callback right away on the submitting thread
+        self._lock = threading.RLock()
+        self.cancelled = 0
+
+    def prefetch(self, lane: str, image_urls: Iterable[Optional[str]], size: Optional[tuple[int, int]] = None):
+        """Replaces what `lane` wants with `image_urls`, most wanted first, at the shown cover size by default"""
+        size = size or self.cache.shown_size
+        wanted = [(url, size) for url in dict.fromkeys(image_urls) if url]
+        with self._lock:
+            pending = self._pending.setdefault(lane, {})
+            for key in [key for key in pending if key not in wanted]:
+                if pending.pop(key).cancel():
+                    self.cancelled += 1
+
+            for key in wanted:
+                if key in pending or self.cache.peek(*key) is not None:
+                    continue
+                future = self._executor.submit(self._fetch, *key)
+                pending[key] = future
+                future.add_done_callback(lambda done, lane=lane, key=key: self._forget(lane, key, done))
+
+    def pending(self, lane: str) -> list[str]:
+        with self._lock:
+            return [url for url, _ in self._pending.get(lane, {})]
+
+    def _forget(self, lane: str, key: tuple[str, tuple[int, int]], future: Future):
+        with self._lock:
+            if self._pending.get(lane, {}).get(key) is future:
+                del self._pending[lane][key]
+
+    def _fetch(self, image_url: str, size: tuple[int, int]):
+        try:
+            self.cache.get(image_url, size)
+        except Exception:
+            # only a prefetch, showing the cover fetches it again
+            pass
+
+
+_album_art_cache: AlbumArtCache | None = None
+_album_art_prefetcher: AlbumArtPrefetcher | None = None
+_album_art_executor: ThreadPoolExecutor | None = None
+
+
+def get_album_art_cache() -> AlbumArtCache:
+    global _album_art_cache
+    if _album_art_cache is None:
+        _album_art_cache = AlbumArtCache()
+    return _album_art_cache
+
+
+def get_album_art_prefetcher() -> AlbumArtPrefetcher:
+    global _album_art_prefetcher
+    if _album_art_prefetcher is None:
+        _album_art_prefetcher = AlbumArtPrefetcher(get_album_art_cache())
+    return _album_art_prefetcher
+
+
+def get_album_art_executor() -> ThreadPoolExecutor:
+    """Where the ui decodes and renders covers, a single thread keeps PIL work off the event loop and in order"""
+    global _album_art_executor
+    if _album_art_executor is None:
+        _album_art_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="art-render")
+    return _album_art_executor
+
 
 def get_image_from_url(image_url: str, size: tuple[int, int]) -> Pixels:
-    resp = get(image_url)
-    resp.raise_for_status()
+    return get_album_art_cache().get(image_url, size)
+
 
-    pill_image = Image.open(BytesIO(resp.content)).resize(size)
-    return Pixels.from_image(pill_image)
\ No newline at end of file
+async def render_cover_async(image_url: str, sizes: list[tuple[int, int]]) -> dict[tuple[int, int], Pixels]:
+    """The cover at every size, downloaded, decoded and rendered on the art executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_album_art_executor(), get_album_art_cache().get_sizes, image_url, sizes)